@@ -0,0 +1,114 @@
+# asgi.py
+"""
+Entrada de producción: la app Flet servida por FastAPI/uvicorn (flet.fastapi).
+
+    python serve.py --workers 4              # un puerto, N procesos (uvicorn --workers)
+    python serve.py --workers 4 --sticky     # N puertos detrás de nginx (deploy/nginx.conf)
+
+Cada worker, al arrancar (lifespan):
+  - inicia el app_manager de Flet (expiración de sesiones, OAuth),
+  - en un hilo: Firebase Admin + canal gRPC de Firestore, sesión HTTP de miniaturas,
+    cliente del coordinador de polling y los módulos pesados de las páginas,
+  - si PREGEN_SCHEDULER=1, el programador de recomendaciones (uno solo entre workers),
+y al apagar espera a que se vacíe (uvicorn --timeout-graceful-shutdown) y a que
+terminen las frases en segundo plano antes de cerrar sesiones Flet y el pool de fotos.
+
+Las sesiones Flet viven en memoria del proceso: el WebSocket de un cliente tiene que
+volver siempre al mismo worker (ver --sticky). FLET_SECRET_KEY debe ser la misma en
+todos los workers para que las URLs de subida firmadas por uno las acepte otro.
+"""
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# Las miniaturas se sirven desde este mismo servidor: rutas relativas
+# (/img/...), o absolutas con PUBLIC_URL. Debe fijarse antes de importar services.image_proxy.
+os.environ.setdefault("IMAGE_PROXY_URL", os.getenv("PUBLIC_URL", ""))
+
+import flet.fastapi as flet_fastapi  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+import routes  # noqa: E402
+from main import main  # noqa: E402
+from services.image_proxy import build_router  # noqa: E402
+from services.background_jobs import shutdown_jobs  # noqa: E402
+from services.photo_pipeline import UPLOAD_DIR, shutdown_pool  # noqa: E402
+from services.recommendation_pregen import start_scheduler, stop_scheduler  # noqa: E402
+from services.single_flight import get_single_flight  # noqa: E402
+
+FLET_SECRET_KEY = os.getenv("FLET_SECRET_KEY", "")
+# Una lectura de un doc inexistente abre el canal gRPC y obtiene el token antes del
+# primer usuario. Poner WARMUP_FIRESTORE=0 para saltarla (p. ej. sin credenciales).
+WARMUP_FIRESTORE = os.getenv("WARMUP_FIRESTORE", "1") != "0"
+
+
+def warm_up():
+    """Prepara clientes y módulos de este worker. Nada aquí debe tumbar el arranque."""
+    t0 = time.perf_counter()
+    pid = os.getpid()
+    try:
+        from services.firebase_service import FirebaseService
+        fb = FirebaseService()
+        if WARMUP_FIRESTORE:
+            fb.db.collection("_warmup").document("ping").get()
+    except Exception as ex:
+        print(f"[ASGI {pid}] Firestore sin calentar: {ex}")
+    try:
+        from services.image_cache import get_image_cache
+        get_image_cache()
+    except Exception as ex:
+        print(f"[ASGI {pid}] caché de imágenes sin calentar: {ex}")
+    try:
+        from services.poll_coordinator import get_poll_coordinator
+        get_poll_coordinator()
+    except Exception as ex:
+        print(f"[ASGI {pid}] coordinador de polling sin calentar: {ex}")
+    # Importa en el hilo de precarga; no esperamos a matplotlib para aceptar tráfico
+    routes.preload_heavy_modules()
+    print(f"[ASGI {pid}] listo en {time.perf_counter() - t0:.2f} s")
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    if not FLET_SECRET_KEY:
+        print("[ASGI] FLET_SECRET_KEY vacía: las subidas de fotos no funcionarán")
+    await flet_fastapi.app_manager.start()
+    await asyncio.to_thread(warm_up)
+    # Pre-generación de recomendaciones: solo si PREGEN_SCHEDULER=1, y en un solo worker
+    await asyncio.to_thread(start_scheduler)
+    try:
+        yield
+    finally:
+        # uvicorn ya dejó de aceptar conexiones y esperó a las abiertas (drain)
+        if not await asyncio.to_thread(shutdown_jobs):
+            print("[ASGI] quedaron frases sin generar; Home las vuelve a pedir")
+        stop_scheduler()
+        await flet_fastapi.app_manager.shutdown()
+        await asyncio.to_thread(shutdown_pool)
+        print(f"[ASGI {os.getpid()}] apagado")
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+@app.get("/healthz")
+def healthz():
+    # singleFlight: llamadas idénticas que se juntaron con otra en curso, por operación
+    return {"ok": True, "pid": os.getpid(), "singleFlight": get_single_flight().counters()}
+
+
+# Rutas propias antes del mount: "/" atrapa todo lo demás
+app.include_router(build_router())
+app.mount(
+    "/",
+    flet_fastapi.app(
+        main,
+        assets_dir=os.path.abspath("assets"),
+        upload_dir=os.path.abspath(UPLOAD_DIR),
+        secret_key=FLET_SECRET_KEY or None,
+    ),
+)
@@ -0,0 +1,159 @@
+# benchmarks/background_jobs.py
+"""
+Cuánto espera el usuario entre "Guardar diagnóstico" y Home, con el flujo de antes
+(add_diagnostic + Gemini + update_diagnostic en línea) y con la frase en segundo
+plano (services.background_jobs): solo add_diagnostic y la frase llega por pubsub.
+
+También revisa (Firestore/Gemini falsos, tiempos escalados por --scale):
+  - Gemini falla dos veces: la frase sale al tercer intento, tras el backoff
+  - Gemini falla siempre: se escribe y publica la frase de respaldo
+  - dos submit con la misma clave: una sola llamada a Gemini
+
+Uso (desde la raíz del repo):
+    python benchmarks/background_jobs.py [--runs 5] [--scale 0.1]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import background_jobs  # noqa: E402
+from services.background_jobs import BackgroundJobs, FALLBACK_PHRASE, phrase_topic, submit_phrase  # noqa: E402
+
+UID = "u1"
+
+
+class FakeFirebase:
+    def __init__(self, write_s: float):
+        self.write_s = write_s
+        self.docs = {}
+
+    def add_diagnostic(self, uid, data, diagnostic_id=None):
+        time.sleep(self.write_s)
+        self.docs[diagnostic_id] = dict(data)
+        return diagnostic_id
+
+    def update_diagnostic(self, uid, diagnostic_id, data):
+        time.sleep(self.write_s)
+        self.docs[diagnostic_id].update(data)
+
+    def get_diagnostic(self, uid, diagnostic_id):
+        time.sleep(self.write_s)
+        d = self.docs.get(diagnostic_id)
+        return {**d, "id": diagnostic_id} if d is not None else None
+
+
+class FakeGemini:
+    def __init__(self, latency_s: float, fail_first: int = 0):
+        self.latency_s = latency_s
+        self.fail_first = fail_first
+        self.calls = 0
+
+    def phrase_for_diagnostic(self, diagnosis, emotions, tags, note, max_chars):
+        self.calls += 1
+        time.sleep(self.latency_s)
+        if self.calls <= self.fail_first:
+            raise RuntimeError("Gemini 503 (simulado)")
+        return f"Frase para {diagnosis}"
+
+
+class FakePubSub:
+    def __init__(self):
+        self.messages = []
+        self.arrived = threading.Event()
+
+    def send_all_on_topic(self, topic, message):
+        self.messages.append((time.perf_counter(), topic, message))
+        self.arrived.set()
+
+
+class FakePage:
+    def __init__(self):
+        self.pubsub = FakePubSub()
+
+
+PAYLOAD = {"diagnosis": "Ánimo estable", "emotions": ["calma"], "dayTags": ["buen día"], "note": "", "score": 70}
+INPUTS = {k: PAYLOAD[k] for k in ("diagnosis", "emotions", "dayTags", "note")}
+
+
+async def submit_inline(fb, gem, doc_id) -> float:
+    """El flujo de antes: tres pasos antes de ir a Home."""
+    t0 = time.perf_counter()
+    await asyncio.to_thread(fb.add_diagnostic, UID, dict(PAYLOAD), doc_id)
+    phrase = await asyncio.to_thread(gem.phrase_for_diagnostic, "x", [], [], "", 120)
+    await asyncio.to_thread(fb.update_diagnostic, UID, doc_id, {"phrase": phrase})
+    return time.perf_counter() - t0
+
+
+async def submit_deferred(page, fb, gem, doc_id) -> float:
+    t0 = time.perf_counter()
+    await asyncio.to_thread(fb.add_diagnostic, UID, dict(PAYLOAD), doc_id)
+    submit_phrase(page, UID, doc_id, INPUTS, fb=fb, gem=gem)
+    return time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--scale", type=float, default=0.1, help="1 = segundos reales")
+    ap.add_argument("--write-ms", type=float, default=150)
+    ap.add_argument("--gemini-ms", type=float, default=3_000)
+    args = ap.parse_args()
+    scale = args.scale
+    write_s, gemini_s = args.write_ms / 1000 * scale, args.gemini_ms / 1000 * scale
+    jobs = background_jobs._jobs = BackgroundJobs(backoff=tuple(b * scale for b in background_jobs.RETRY_BACKOFF))
+
+    inline, deferred, to_phrase = [], [], []
+    for i in range(args.runs):
+        fb, gem = FakeFirebase(write_s), FakeGemini(gemini_s)
+        inline.append(asyncio.run(submit_inline(fb, gem, f"a{i}")))
+
+        page, fb, gem = FakePage(), FakeFirebase(write_s), FakeGemini(gemini_s)
+        t0 = time.perf_counter()
+        deferred.append(asyncio.run(submit_deferred(page, fb, gem, f"b{i}")))
+        assert page.pubsub.arrived.wait(10), "la frase no llegó por pubsub"
+        at, topic, msg = page.pubsub.messages[0]
+        to_phrase.append(at - t0)
+        assert topic == phrase_topic(UID) and msg == {"diagnosticId": f"b{i}", "phrase": "Frase para Ánimo estable"}
+        assert fb.docs[f"b{i}"]["phrase"] == msg["phrase"]
+
+    ms = lambda xs: statistics.median(xs) / scale * 1000  # noqa: E731
+    print(f"submit -> Home (mediana de {args.runs}, escritura {args.write_ms:.0f} ms, Gemini {args.gemini_ms:.0f} ms)")
+    print(f"  en línea (antes):      {ms(inline):7.0f} ms  (3 llamadas)")
+    print(f"  frase en segundo plano:{ms(deferred):7.0f} ms  (1 escritura); frase en Home a los {ms(to_phrase):.0f} ms")
+    assert ms(deferred) < ms(inline) / 5
+
+    # Reintentos: dos fallas y luego bien
+    page, fb, gem = FakePage(), FakeFirebase(write_s), FakeGemini(gemini_s, fail_first=2)
+    fb.add_diagnostic(UID, dict(PAYLOAD), "r1")
+    submit_phrase(page, UID, "r1", None, fb=fb, gem=gem)  # sin inputs: se leen del documento
+    assert jobs.drain(30) and gem.calls == 3 and fb.docs["r1"]["phrase"] == "Frase para Ánimo estable"
+    print(f"  Gemini falla 2 veces: frase al intento {gem.calls}")
+
+    # Falla siempre: frase de respaldo
+    page, fb, gem = FakePage(), FakeFirebase(write_s), FakeGemini(gemini_s, fail_first=99)
+    fb.add_diagnostic(UID, dict(PAYLOAD), "r2")
+    submit_phrase(page, UID, "r2", INPUTS, fb=fb, gem=gem)
+    assert jobs.drain(60)
+    assert fb.docs["r2"]["phrase"] == FALLBACK_PHRASE and page.pubsub.messages[0][2]["phrase"] == FALLBACK_PHRASE
+    print(f"  Gemini falla siempre: {gem.calls} intentos y frase de respaldo publicada")
+
+    # Misma clave dos veces (Home + sync de la cola): un solo trabajo
+    page, fb, gem = FakePage(), FakeFirebase(write_s), FakeGemini(gemini_s)
+    fb.add_diagnostic(UID, dict(PAYLOAD), "r3")
+    first = submit_phrase(page, UID, "r3", INPUTS, fb=fb, gem=gem)
+    second = submit_phrase(page, UID, "r3", None, fb=fb, gem=gem)
+    assert jobs.drain(10) and (first, second, gem.calls) == (True, False, 1)
+    # Y si ya tiene frase, pedirla otra vez no llama a Gemini
+    submit_phrase(page, UID, "r3", None, fb=fb, gem=gem)
+    assert jobs.drain(10) and gem.calls == 1
+    print("  submit duplicado: 1 llamada a Gemini")
+
+
+if __name__ == "__main__":
+    main()
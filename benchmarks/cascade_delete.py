@@ -0,0 +1,139 @@
+# benchmarks/cascade_delete.py
+"""
+Borrado de decenas de miles de documentos hijos sobre el Firestore falso
+(benchmarks/fake_firestore.py) con latencia simulada por RPC:
+  - un solo WriteBatch con todo (lo que hacía delete_recommendations_all)
+  - WriteBatches de 500 en serie
+  - services.account_cleanup.delete_user_data (BulkWriter, páginas + flush)
+  - corte a la mitad y segunda llamada (reanudación)
+  - después del borrado no quedan copias locales: perfil en caché, índice de
+    notas y snapshot del dispositivo
+El fake no simula la rampa de ops/s del BulkWriter real: mide la forma de enviar,
+no el techo de Firestore.
+
+Uso (desde la raíz del repo):
+    python benchmarks/cascade_delete.py [--docs 30000] [--latency-ms 20]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("NOTES_INDEX_DIR", tempfile.mkdtemp(prefix="notes_index_"))
+
+from benchmarks.fake_firestore import FakeFirestore, FakeFirebaseService  # noqa: E402
+from services import profile_cache, read_snapshot  # noqa: E402
+from services.account_cleanup import delete_user_data  # noqa: E402
+from services.notes_index import get_notes_index  # noqa: E402
+from services.journal_io import SUBCOLLECTIONS  # noqa: E402
+
+
+class FakePage:
+    def __init__(self):
+        self.client_storage = FakeStorage()
+
+
+class FakeStorage(dict):
+    def get(self, key):
+        return super().get(key)
+
+    def set(self, key, value):
+        self[key] = value
+
+    def remove(self, key):
+        self.pop(key, None)
+
+
+def seed(db: FakeFirestore, uid: str, total: int):
+    db._put(("users",), uid, {"email": f"{uid}@example.com"})
+    per = total // len(SUBCOLLECTIONS)
+    for name in SUBCOLLECTIONS:
+        for i in range(per):
+            db._put(("users", uid, name), f"{name[:1]}{i:07d}", {"i": i})
+
+
+def remaining(db: FakeFirestore, uid: str) -> int:
+    return sum(db.count(("users", uid, n)) for n in SUBCOLLECTIONS) + (1 if uid in db._coll(("users",)) else 0)
+
+
+class Crash(Exception):
+    pass
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=30_000)
+    ap.add_argument("--latency-ms", type=float, default=20)
+    args = ap.parse_args()
+
+    db = FakeFirestore(rpc_latency=args.latency_ms / 1000)
+    fb = FakeFirebaseService(db)
+    print(f"{args.docs} documentos hijos, latencia por RPC {args.latency_ms} ms")
+
+    # 1) Un solo WriteBatch
+    seed(db, "one", args.docs)
+    batch = db.batch()
+    for snap in db.collection("users").document("one").collection("notes").stream():
+        batch.delete(snap.reference)
+    try:
+        batch.commit()
+        print("un batch:        ok")
+    except ValueError as ex:
+        print(f"un batch:        falla ({ex})")
+
+    # 2) Batches de 500 en serie
+    seed(db, "serial", args.docs)
+    db.rpcs = 0
+    t0 = time.perf_counter()
+    for name in SUBCOLLECTIONS:
+        coll = db.collection("users").document("serial").collection(name)
+        while True:
+            page = list(coll.limit(500).stream())
+            if not page:
+                break
+            b = db.batch()
+            for snap in page:
+                b.delete(snap.reference)
+            b.commit()
+    secs = time.perf_counter() - t0
+    print(f"batches serie:   {secs:6.2f} s  {args.docs / secs:8.0f} docs/s  {db.rpcs:5d} RPCs")
+
+    # 3) BulkWriter
+    seed(db, "bulk", args.docs)
+    page = FakePage()
+    profile_cache.put_profile("bulk", {"email": "bulk@example.com"})
+    get_notes_index("bulk").upsert("n1", "nota", "texto de la nota")
+    read_snapshot.put(page, "bulk", "today", {"phrase": "hola"})
+    db.rpcs = 0
+    t0 = time.perf_counter()
+    delete_user_data(fb, "bulk", page=page)
+    secs = time.perf_counter() - t0
+    print(f"BulkWriter:      {secs:6.2f} s  {args.docs / secs:8.0f} docs/s  {db.rpcs:5d} RPCs  quedan {remaining(db, 'bulk')}")
+    leftovers = {
+        "perfil en caché": profile_cache.get_cached_profile("bulk") is not None,
+        "índice de notas": bool(get_notes_index("bulk").search("nota")),
+        "snapshot": read_snapshot.get(page, "bulk", "today") is not None,
+    }
+    print(f"copias locales después del borrado: {[k for k, v in leftovers.items() if v] or 'ninguna'}")
+    assert not any(leftovers.values())
+
+    # 4) Corte a la mitad + reanudación
+    seed(db, "resume", args.docs)
+
+    def crash_halfway(name, deleted):
+        if name == SUBCOLLECTIONS[1]:
+            raise Crash()
+
+    try:
+        delete_user_data(fb, "resume", on_progress=crash_halfway)
+    except Crash:
+        pass
+    left = remaining(db, "resume")
+    delete_user_data(fb, "resume")
+    print(f"reanudar:        {left} documentos tras el corte, {remaining(db, 'resume')} al terminar")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+# benchmarks/compress_dist.py
+"""
+Transferencia de la primera carga de dist/ contra tools/serve_dist.py:
+  - dist/ tal cual, sin comprimir
+  - tras tools/compress_dist.py con Accept-Encoding: gzip (y br si hay `brotli`)
+y una segunda visita solo con la caché HTTP del navegador (sin service worker):
+los nombres con hash no se piden (immutable), el resto se revalida (304).
+
+Tiempo = medido contra el servidor local + bytes / --mbps (el local no tiene red real).
+
+Uso (desde la raíz del repo):
+    python benchmarks/compress_dist.py [--mbps 10]
+"""
+import argparse
+import http.client
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tools import compress_dist, precache_manifest  # noqa: E402
+from tools.serve_dist import make_server  # noqa: E402
+
+
+def site_paths(dist: str) -> list[str]:
+    """Lo que pide una primera carga: todo dist/ menos las variantes y los SW de Flutter."""
+    manifest = precache_manifest.build_manifest(dist)
+    return ["/"] + [p for p in manifest["files"] if p != "/index.html"]
+
+
+def load(port: int, paths: list[str], encoding: str | None, http_cache: dict | None = None) -> tuple[int, int, float]:
+    """(peticiones, bytes en el cable, segundos). http_cache simula la caché del navegador."""
+    conn = http.client.HTTPConnection("127.0.0.1", port)
+    requests = wire = 0
+    t0 = time.perf_counter()
+    for path in paths:
+        headers = {"Accept-Encoding": encoding} if encoding else {}
+        cached = http_cache.get(path) if http_cache is not None else None
+        if cached:
+            if "immutable" in cached["cc"]:
+                continue
+            headers["If-None-Match"] = cached["etag"]
+        conn.request("GET", path, headers=headers)
+        r = conn.getresponse()
+        body = r.read()
+        requests += 1
+        wire += len(body) + sum(len(k) + len(v) + 4 for k, v in r.getheaders())
+        if http_cache is not None and r.status == 200:
+            http_cache[path] = {"cc": r.getheader("Cache-Control") or "", "etag": r.getheader("ETag") or ""}
+    conn.close()
+    return requests, wire, time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mbps", type=float, default=10)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        plain = os.path.join(tmp, "plain")
+        shutil.copytree(os.path.join(ROOT, "dist"), plain)
+        packed = os.path.join(tmp, "packed")
+        shutil.copytree(os.path.join(ROOT, "dist"), packed)
+        compress_dist.build(packed, verbose=False)
+        precache_manifest.build(packed, verbose=False)
+
+        runs = [("sin comprimir", plain, None, False)]
+        runs.append(("gzip", packed, "gzip", True))
+        if compress_dist.brotli is not None:
+            runs.append(("brotli", packed, "br, gzip", True))
+
+        print(f"{args.mbps:.0f} Mbps simulados")
+        for label, dist, encoding, compress in runs:
+            server = make_server(dist, port=0, quiet=True, compress=compress)
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            port = server.server_address[1]
+            paths = site_paths(dist)
+            cache = {}
+            n1, b1, s1 = load(port, paths, encoding, cache)
+            n2, b2, s2 = load(port, paths, encoding, cache)
+            server.shutdown()
+            server.server_close()
+            t1 = s1 + b1 * 8 / (args.mbps * 1_000_000)
+            t2 = s2 + b2 * 8 / (args.mbps * 1_000_000)
+            print(
+                f"{label:14s} 1a carga {n1:3d} peticiones {b1 / 1024:8.1f} KB ~{t1 * 1000:7.1f} ms   "
+                f"2a (caché HTTP) {n2:3d} peticiones {b2 / 1024:6.1f} KB ~{t2 * 1000:6.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
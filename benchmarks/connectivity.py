@@ -0,0 +1,150 @@
+# benchmarks/connectivity.py
+"""
+Cuánto espera el usuario al guardar cuando se cae la red, con el timeout fijo de
+antes (asyncio.wait_for(..., 8)) y con services.connectivity.ConnectivityMonitor.
+
+Fases (Firestore falso, tiempos escalados por --scale para que corra rápido):
+  1. red sana: --saves guardados de --ok-ms cada uno (el monitor aprende la latencia)
+  2. red caída: --saves guardados; la llamada se cuelga --hang-ms y falla
+  3. red lenta pero viva (--slow-ms por llamada): no debe declararse offline
+  4. vuelve la red: cuánto tarda la sonda en devolver el estado a online
+  5. red rápida que se vuelve lenta de golpe (la sonda sí llega): el primer
+     guardado se corta con el timeout aprendido, pero el estado no pasa a offline
+     y el siguiente espera el base completo
+
+Uso (desde la raíz del repo):
+    python benchmarks/connectivity.py [--saves 5] [--scale 0.1]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import connectivity  # noqa: E402
+from services.connectivity import ConnectivityMonitor, OfflineError  # noqa: E402
+
+BASE_TIMEOUT = 8.0  # el de diagnostic_page / note_editor
+
+
+class FakeNetwork:
+    def __init__(self, scale: float, ok: float, hang: float, slow: float):
+        self.scale, self.ok, self.hang, self.slow = scale, ok, hang, slow
+        self.mode = "up"
+
+    def write(self):
+        if self.mode == "down":
+            time.sleep(self.hang * self.scale)
+            raise ConnectionError("sin red (simulado)")
+        time.sleep((self.slow if self.mode == "slow" else self.ok) * self.scale)
+        return "ok"
+
+    def probe(self):
+        return self.mode != "down"
+
+
+async def save_fixed(net: FakeNetwork, scale: float) -> tuple[float, str]:
+    """Lo de antes: esperar hasta 8 s cada vez."""
+    t0 = time.perf_counter()
+    try:
+        await asyncio.wait_for(asyncio.to_thread(net.write), timeout=BASE_TIMEOUT * scale)
+        result = "ok"
+    except Exception:
+        result = "cola"
+    return (time.perf_counter() - t0) / scale, result
+
+
+async def save_monitor(net: FakeNetwork, monitor: ConnectivityMonitor, scale: float) -> tuple[float, str]:
+    t0 = time.perf_counter()
+    try:
+        await monitor.run(net.write, base_timeout=BASE_TIMEOUT * scale)
+        result = "ok"
+    except OfflineError:
+        result = "cola"
+    return (time.perf_counter() - t0) / scale, result
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--saves", type=int, default=5)
+    ap.add_argument("--scale", type=float, default=0.1, help="1 = segundos reales")
+    ap.add_argument("--ok-ms", type=float, default=150)
+    ap.add_argument("--hang-ms", type=float, default=20_000, help="lo que tarda gRPC en rendirse")
+    ap.add_argument("--slow-ms", type=float, default=3_000)
+    args = ap.parse_args()
+    scale = args.scale
+    # Los umbrales de latencia del monitor también se escalan
+    connectivity.SLOW_RPC *= scale
+
+    async def scenario():
+        rows = []
+        for label in ("timeout fijo 8 s", "monitor"):
+            net = FakeNetwork(scale, args.ok_ms / 1000, args.hang_ms / 1000, args.slow_ms / 1000)
+            monitor = ConnectivityMonitor(probe=net.probe, backoff=tuple(b * scale for b in (2, 4, 8, 15, 30)))
+            changes = []
+            monitor.on_change(lambda old, new: changes.append((time.perf_counter(), new)))
+
+            async def save():
+                if label == "monitor":
+                    return await save_monitor(net, monitor, scale)
+                return await save_fixed(net, scale)
+
+            for _ in range(args.saves):
+                await save()
+            net.mode = "down"
+            down = [await save() for _ in range(args.saves)]
+
+            # Vuelve la red lenta: el monitor se entera por la sonda
+            net.mode = "slow"
+            t_back = time.perf_counter()
+            recovered = None
+            if label == "monitor":
+                while monitor.state == connectivity.OFFLINE and time.perf_counter() - t_back < 60 * scale:
+                    await asyncio.sleep(0.01)
+                recovered = (time.perf_counter() - t_back) / scale
+            slow = [await save() for _ in range(args.saves)]
+            monitor.close()
+            rows.append((label, down, slow, recovered, monitor.state))
+        return rows
+
+    rows = asyncio.run(scenario())
+    print(f"{args.saves} guardados con la red caída (se cuelga {args.hang_ms / 1000:.0f} s), luego con red lenta "
+          f"({args.slow_ms / 1000:.1f} s por llamada)")
+    for label, down, slow, recovered, state in rows:
+        waits = " ".join(f"{w:4.1f}" for w, _ in down)
+        print(f"{label:17s} caída: espera total {sum(w for w, _ in down):5.1f} s  [{waits}] -> "
+              f"{sum(r == 'cola' for _, r in down)} a la cola")
+        slow_ok = sum(r == "ok" for _, r in slow)
+        extra = f", estado {state}" if label == "monitor" else ""
+        back = f"  sonda: online de nuevo en {recovered:.1f} s" if recovered is not None else ""
+        print(f"{'':17s} lenta: {slow_ok}/{len(slow)} guardados en línea{extra}{back}")
+
+    async def sudden_slowness():
+        net = FakeNetwork(scale, 0.05, args.hang_ms / 1000, args.slow_ms / 1000)
+        monitor = ConnectivityMonitor(probe=net.probe)
+        states = []
+        monitor.on_change(lambda old, new: states.append(new))
+        for _ in range(5):
+            await save_monitor(net, monitor, scale)
+        learned = monitor.timeout(BASE_TIMEOUT * scale) / scale
+        net.mode = "slow"
+        saves = [await save_monitor(net, monitor, scale) for _ in range(2)]
+        await asyncio.sleep(0.05)  # la sonda de confirmación
+        monitor.close()
+        return learned, saves, states, monitor.timeout(BASE_TIMEOUT * scale) / scale
+
+    learned, saves, states, after = asyncio.run(sudden_slowness())
+    print(f"red lenta de golpe (timeout aprendido {learned:.1f} s): "
+          f"{' '.join(f'{w:.1f} s {r}' for w, r in saves)}; estados {states}, timeout ahora {after:.1f} s")
+    assert connectivity.OFFLINE not in states and saves[-1][1] == "ok" and after == BASE_TIMEOUT
+
+    fixed_down = sum(w for w, _ in rows[0][1])
+    mon_down = sum(w for w, _ in rows[1][1])
+    assert mon_down < fixed_down / 2
+    assert all(r == "ok" for _, r in rows[1][2]), "la red lenta no debe mandar a la cola"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+# benchmarks/fake_firestore.py
+"""
+Firestore falso en memoria para los benchmarks (sin emulador ni credenciales).
+Implementa solo lo que usan services.journal_io y services.account_cleanup:
+collection/document, order_by("__name__"), limit, start_after, select, stream,
+set/update/delete, batch() (con el límite real de 500 operaciones) y bulk_writer().
+
+Cada "RPC" (una página leída, un commit, un flush) puede llevar una latencia simulada
+para que el número de viajes al servidor se note en los tiempos.
+"""
+import bisect
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+
+class FakeFirestore:
+    def __init__(self, rpc_latency: float = 0.0):
+        self.rpc_latency = rpc_latency
+        self.collections: dict[tuple, dict[str, dict]] = {}
+        self._sorted: dict[tuple, list[str]] = {}
+        self.rpcs = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+
+    # ---------- API tipo firestore.Client ----------
+    def collection(self, name: str):
+        return FakeCollection(self, (name,))
+
+    def batch(self):
+        return FakeBatch(self)
+
+    def bulk_writer(self, options=None):
+        return FakeBulkWriter(self)
+
+    # ---------- internos ----------
+    def _rpc(self):
+        with self._lock:
+            self.rpcs += 1
+        if self.rpc_latency:
+            time.sleep(self.rpc_latency)
+
+    def _coll(self, path: tuple) -> dict:
+        return self.collections.setdefault(path, {})
+
+    def _keys(self, path: tuple) -> list[str]:
+        keys = self._sorted.get(path)
+        if keys is None:
+            keys = self._sorted[path] = sorted(self._coll(path))
+        return keys
+
+    def _put(self, path: tuple, doc_id: str, data: dict):
+        with self._lock:
+            coll = self._coll(path)
+            if doc_id not in coll and path in self._sorted:
+                bisect.insort(self._sorted[path], doc_id)
+            coll[doc_id] = dict(data)
+            self.writes += 1
+
+    def _delete(self, path: tuple, doc_id: str):
+        with self._lock:
+            coll = self._coll(path)
+            if coll.pop(doc_id, None) is not None and path in self._sorted:
+                keys = self._sorted[path]
+                i = bisect.bisect_left(keys, doc_id)
+                if i < len(keys) and keys[i] == doc_id:
+                    keys.pop(i)
+            self.writes += 1
+
+    def count(self, path: tuple) -> int:
+        return len(self._coll(path))
+
+
+class FakeSnapshot:
+    def __init__(self, ref, data):
+        self.reference = ref
+        self.id = ref.id
+        self._data = data
+
+    @property
+    def exists(self) -> bool:
+        return self._data is not None
+
+    def to_dict(self):
+        return dict(self._data) if self._data is not None else None
+
+
+class FakeDocument:
+    def __init__(self, db: FakeFirestore, parent: tuple, doc_id: str):
+        self._db = db
+        self.parent_path = parent
+        self.id = doc_id
+
+    @property
+    def path(self) -> str:
+        return "/".join(self.parent_path + (self.id,))
+
+    def collection(self, name: str):
+        return FakeCollection(self._db, self.parent_path + (self.id, name))
+
+    def collections(self):
+        prefix = self.parent_path + (self.id,)
+        return [
+            FakeCollection(self._db, p) for p, docs in list(self._db.collections.items())
+            if p[:-1] == prefix and docs
+        ]
+
+    def get(self):
+        self._db._rpc()
+        return FakeSnapshot(self, self._db._coll(self.parent_path).get(self.id))
+
+    def set(self, data: dict, merge: bool = False):
+        self._db._rpc()
+        self._db._put(self.parent_path, self.id, data)
+
+    def update(self, data: dict):
+        self._db._rpc()
+        cur = self._db._coll(self.parent_path).get(self.id) or {}
+        self._db._put(self.parent_path, self.id, {**cur, **data})
+
+    def delete(self):
+        self._db._rpc()
+        self._db._delete(self.parent_path, self.id)
+
+
+class FakeQuery:
+    def __init__(self, db: FakeFirestore, path: tuple, limit=None, after=None):
+        self._db = db
+        self._path = path
+        self._limit = limit
+        self._after = after
+
+    def order_by(self, field, direction=None):
+        if field != "__name__":
+            raise NotImplementedError("El fake solo ordena por __name__")
+        return self
+
+    def select(self, fields):
+        return self
+
+    def limit(self, n: int):
+        return FakeQuery(self._db, self._path, n, self._after)
+
+    def start_after(self, snapshot):
+        doc_id = snapshot.id if hasattr(snapshot, "id") else snapshot["__name__"]
+        return FakeQuery(self._db, self._path, self._limit, doc_id)
+
+    def stream(self):
+        self._db._rpc()
+        keys = self._db._keys(self._path)
+        start = bisect.bisect_right(keys, self._after) if self._after is not None else 0
+        end = len(keys) if self._limit is None else start + self._limit
+        coll = self._db._coll(self._path)
+        for doc_id in keys[start:end]:
+            ref = FakeDocument(self._db, self._path, doc_id)
+            yield FakeSnapshot(ref, coll.get(doc_id))
+
+
+class FakeCollection(FakeQuery):
+    def __init__(self, db: FakeFirestore, path: tuple):
+        super().__init__(db, path)
+        self.id = path[-1]
+
+    def document(self, doc_id: str | None = None):
+        return FakeDocument(self._db, self._path, doc_id or uuid.uuid4().hex[:20])
+
+    def add(self, data: dict):
+        ref = self.document()
+        ref.set(data)
+        return None, ref
+
+
+class FakeBatch:
+    MAX_OPS = 500
+
+    def __init__(self, db: FakeFirestore):
+        self._db = db
+        self._ops = []
+
+    def __len__(self):
+        return len(self._ops)
+
+    def set(self, ref, data, merge=False):
+        self._ops.append(("set", ref, data))
+
+    def delete(self, ref):
+        self._ops.append(("del", ref, None))
+
+    def commit(self):
+        if len(self._ops) > self.MAX_OPS:
+            raise ValueError(f"maximum {self.MAX_OPS} writes allowed per request")
+        self._db._rpc()
+        for op, ref, data in self._ops:
+            if op == "set":
+                self._db._put(ref.parent_path, ref.id, data)
+            else:
+                self._db._delete(ref.parent_path, ref.id)
+        self._ops = []
+
+
+class FakeBulkWriter:
+    """
+    Como el BulkWriter real: junta escrituras en lotes de 20 y los manda en segundo
+    plano en cuanto se llenan (varios en vuelo a la vez); flush() espera a que terminen.
+    """
+
+    BATCH = 20
+    MAX_IN_FLIGHT = 32
+
+    def __init__(self, db: FakeFirestore):
+        self._db = db
+        self._pending = []
+        self._futures = []
+        self._pool = ThreadPoolExecutor(max_workers=self.MAX_IN_FLIGHT)
+        self._on_success = None
+        self._on_error = None
+
+    def on_write_result(self, cb):
+        self._on_success = cb
+
+    def on_write_error(self, cb):
+        self._on_error = cb
+
+    def delete(self, ref):
+        self._enqueue(("del", ref, None))
+
+    def set(self, ref, data, merge=False):
+        self._enqueue(("set", ref, data))
+
+    def _enqueue(self, op):
+        self._pending.append(op)
+        if len(self._pending) >= self.BATCH:
+            self._send()
+
+    def _send(self):
+        chunk, self._pending = self._pending, []
+        if chunk:
+            self._futures.append(self._pool.submit(self._apply, chunk))
+
+    def _apply(self, chunk):
+        self._db._rpc()
+        for op, ref, data in chunk:
+            if op == "set":
+                self._db._put(ref.parent_path, ref.id, data)
+            else:
+                self._db._delete(ref.parent_path, ref.id)
+            if self._on_success:
+                self._on_success(ref, None, self)
+
+    def flush(self):
+        self._send()
+        futures, self._futures = self._futures, []
+        for f in futures:
+            f.result()
+
+    def close(self):
+        self.flush()
+        self._pool.shutdown()
+
+
+class FakeFirebaseService:
+    """Lo mínimo de FirebaseService que usan los servicios de export/import/borrado."""
+
+    def __init__(self, db: FakeFirestore):
+        self.db = db
+
+    def notes_collection(self, uid: str):
+        return self.db.collection("users").document(uid).collection("notes")
+
+    def get_user_profile(self, uid: str):
+        return self.db.collection("users").document(uid).get().to_dict()
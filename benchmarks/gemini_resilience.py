@@ -0,0 +1,192 @@
+# benchmarks/gemini_resilience.py
+"""
+services.gemini_resilience contra un Gemini falso local (http.server) que mete
+latencia y errores. Tiempos escalados por --scale (presupuestos, latencias y el
+tiempo que el circuito queda abierto).
+
+Escenarios:
+  1. caída (el servidor se cuelga): espera total de N mensajes del chat con el
+     timeout fijo de antes y con el circuito; luego el servidor vuelve y la
+     llamada de prueba (half-open) cierra el circuito
+  2. cola larga (10 % de respuestas lentas): p50/p95/p99 sin y con cobertura
+     (hedge al p95) y cuántas peticiones extra cuesta
+  3. 503 intermitente (15 %): mensajes que terminan en respaldo sin y con el
+     intento extra
+  4. un 400 no abre el circuito
+
+El cliente es urllib (mismo contrato que GeminiService._post con requests); si
+requests está instalado, además se prueba GeminiService.chat_reply de punta a punta.
+
+Uso (desde la raíz del repo):
+    python benchmarks/gemini_resilience.py [--scale 0.05] [--messages 10]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import gemini_resilience  # noqa: E402
+from services.gemini_resilience import BUDGETS, CircuitBreaker, GeminiGuard, GeminiUnavailable  # noqa: E402
+
+REPLY = {"candidates": [{"content": {"parts": [{"text": "Aquí estoy contigo."}]}}]}
+
+
+class FakeGemini(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        delay, status = self.server.behave()
+        self.server.hits += 1
+        time.sleep(delay)
+        body = json.dumps(REPLY if status == 200 else {"error": {"code": status}}).encode()
+        try:
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except OSError:
+            pass  # el cliente ya se fue (timeout)
+
+    def log_message(self, *_):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeGemini)
+    server.daemon_threads = True
+    server.hits = 0
+    server.behave = lambda: (0.0, 200)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1beta/models/fake:generateContent"
+
+
+def urllib_send(url):
+    def send(timeout):
+        req = urllib.request.Request(url, data=json.dumps({"contents": []}).encode(),
+                                     headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            return json.loads(r.read())
+    return send
+
+
+def plain_call(url, timeout):
+    """Lo de antes: una petición con timeout fijo, sin circuito."""
+    try:
+        return urllib_send(url)(timeout)
+    except Exception as ex:
+        raise GeminiUnavailable(str(ex)) from ex
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    try:
+        fn()
+        ok = True
+    except GeminiUnavailable:
+        ok = False
+    return time.perf_counter() - t0, ok
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--scale", type=float, default=0.05, help="1 = segundos reales")
+    ap.add_argument("--messages", type=int, default=10)
+    ap.add_argument("--tail-calls", type=int, default=200)
+    ap.add_argument("--seed", type=int, default=5)
+    args = ap.parse_args()
+    scale = args.scale
+    budgets = {k: v * scale for k, v in BUDGETS.items()}
+    rng = random.Random(args.seed)
+    rng_lock = threading.Lock()
+    server, url = start_server()
+    send = urllib_send(url)
+
+    def guard(hedge=True, open_seconds=gemini_resilience.OPEN_SECONDS):
+        return GeminiGuard(CircuitBreaker(open_seconds=open_seconds * scale), budgets, hedge=hedge)
+
+    # --- 1. caída: el servidor se cuelga más que el presupuesto ---
+    server.behave = lambda: (40 * scale, 200)
+    before = [timed(lambda: plain_call(url, 25 * scale)) for _ in range(args.messages)]
+    g = guard()
+    after = [timed(lambda: g.call("chat", send)) for _ in range(args.messages)]
+    s = lambda xs: sum(w for w, _ in xs) / scale  # noqa: E731
+    print(f"1. Gemini colgado, {args.messages} mensajes del chat")
+    print(f"   timeout fijo 25 s: espera total {s(before):6.1f} s")
+    print(f"   con circuito:      espera total {s(after):6.1f} s  ({g.short_circuited} respaldos al instante)")
+    assert s(after) < s(before) / 2 and g.breaker.state == gemini_resilience.OPEN
+
+    server.behave = lambda: (0.3 * scale, 200)
+    time.sleep(gemini_resilience.OPEN_SECONDS * scale)
+    wait_trial, ok = timed(lambda: g.call("chat", send))
+    print(f"   servidor de vuelta: prueba half-open ok={ok}, circuito {g.breaker.state}")
+    assert ok and g.breaker.state == gemini_resilience.CLOSED
+
+    # --- 2. cola larga: 10 % de respuestas de 9 s ---
+    def tail():
+        with rng_lock:
+            slow = rng.random() < 0.10
+        return ((9.0 if slow else rng.uniform(0.6, 1.2)) * scale, 200)
+
+    server.behave = tail
+    print(f"2. cola larga ({args.tail_calls} mensajes, 10 % tardan 9 s)")
+    rows = {}
+    for hedge in (False, True):
+        g = guard(hedge=hedge)
+        hits0 = server.hits
+        waits = sorted(timed(lambda: g.call("chat", send))[0] / scale for _ in range(args.tail_calls))
+        extra = server.hits - hits0 - args.tail_calls
+        p = lambda q: waits[min(len(waits) - 1, int(len(waits) * q))]  # noqa: E731
+        label = "con hedge al p95" if hedge else "sin hedge"
+        print(f"   {label:17s} p50 {p(0.5):4.1f} s  p95 {p(0.95):4.1f} s  p99 {p(0.99):4.1f} s  "
+              f"media {statistics.mean(waits):4.2f} s  peticiones extra {extra} ({g.hedge_wins} ganaron)")
+        rows[hedge] = (statistics.mean(waits), p(0.99), extra)
+    assert rows[True][0] < rows[False][0] and rows[True][2] <= args.tail_calls * 0.25
+
+    # --- 3. 503 intermitente ---
+    def flaky():
+        with rng_lock:
+            return (rng.uniform(0.3, 0.6) * scale, 503 if rng.random() < 0.15 else 200)
+
+    server.behave = flaky
+    print(f"3. 503 en el 15 % de las respuestas ({args.tail_calls} mensajes)")
+    for hedge in (False, True):
+        g = guard(hedge=hedge)
+        failed = sum(not timed(lambda: g.call("chat", send))[1] for _ in range(args.tail_calls))
+        label = "un intento" if not hedge else "con intento extra"
+        print(f"   {label:17s} respaldo en {failed}/{args.tail_calls}, circuito {g.breaker.state}")
+
+    # --- 4. un 400 sube tal cual y no abre el circuito ---
+    server.behave = lambda: (0.0, 400)
+    g = guard()
+    for _ in range(5):
+        try:
+            g.call("phrase", send)
+        except urllib.error.HTTPError as ex:
+            assert ex.code == 400
+    assert g.breaker.state == gemini_resilience.CLOSED
+    print("4. HTTP 400 x5: el error sube tal cual, circuito cerrado")
+
+    # --- punta a punta con GeminiService, si hay requests ---
+    try:
+        from services.gemini_service import GeminiService
+    except ImportError as ex:
+        print(f"(GeminiService no probado de punta a punta: {ex})")
+        return
+    server.behave = lambda: (0.05, 200)
+    gemini_resilience._guard = guard()
+    reply = GeminiService(api_key="x", model_url=url).chat_reply([("user", "hola")], "hola")
+    assert reply == "Aquí estoy contigo."
+    print("GeminiService.chat_reply contra el servidor falso: ok")
+
+
+if __name__ == "__main__":
+    main()
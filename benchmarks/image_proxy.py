@@ -0,0 +1,210 @@
+# benchmarks/image_proxy.py
+"""
+services.image_cache / services.image_proxy contra un origen de fotos falso
+(http.server local) que cuenta cuántas veces se le pide cada foto.
+
+  1. frío vs. caliente: primera miniatura de cada foto (descarga + Pillow) contra
+     los aciertos siguientes; las 4 medidas de una foto cuestan una sola descarga
+  2. desalojo: con un tope chico los originales se van primero; las miniaturas
+     que quedaron se sirven sin volver a descargar, y solo una medida nueva (o
+     una miniatura desalojada) vuelve al origen
+  3. orígenes rechazados: host fuera de la lista, metadatos (169.254.169.254),
+     host permitido que resuelve a una red privada, el propio origen en loopback
+     con la política de producción y una redirección a otro host; ninguno llega
+     a descargar nada. Con fastapi instalado, además por HTTP (403)
+  4. DNS rebinding: el nombre se resuelve una sola vez, en la revisión, y la
+     descarga se conecta a esa dirección (un segundo lookup que apunte a otra
+     red no se usa; el host "fotos.invalid" ni siquiera existe en el DNS real)
+
+El origen falso vive en 127.0.0.1, así que para descargar de él se usa una
+política con allow_private=True; los rechazos usan la revisión de producción.
+
+Uso (desde la raíz del repo, con Pillow y requests instalados):
+    python benchmarks/image_proxy.py [--photos 12]
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image  # noqa: E402
+
+from services.image_cache import THUMB_SIZES, ImageCache  # noqa: E402
+from services.image_proxy import SourcePolicy, SourceRejected  # noqa: E402
+
+
+def photo_jpeg(seed: int, size=(1600, 1200)) -> bytes:
+    noise = Image.effect_noise(size, 30 + seed % 20).convert("RGB")
+    grad = Image.linear_gradient("L").resize(size).convert("RGB")
+    buf = io.BytesIO()
+    Image.blend(noise, grad, 0.5).save(buf, "JPEG", quality=90)
+    return buf.getvalue()
+
+
+class FakeOrigin(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.hits[self.path] += 1
+        if self.path == "/redirect":
+            self.send_response(302)
+            self.send_header("Location", "http://169.254.169.254/latest/meta-data/")
+            self.end_headers()
+            return
+        body = self.server.photos.get(self.path)
+        if body is None:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_):
+        pass
+
+
+def start_origin(photos: dict[str, bytes]):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOrigin)
+    server.daemon_threads = True
+    server.hits = Counter()
+    server.photos = photos
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def ms(seconds: float) -> str:
+    return f"{seconds * 1000:.1f} ms"
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--photos", type=int, default=12)
+    args = ap.parse_args()
+
+    photos = {f"/p/{i}.jpg": photo_jpeg(i) for i in range(args.photos)}
+    server, base = start_origin(photos)
+    urls = [base + path for path in photos]
+    local = SourcePolicy(origins=[base], allow_private=True)
+
+    # --- 1. frío vs. caliente ---
+    with tempfile.TemporaryDirectory() as root:
+        cache = ImageCache(root, max_bytes=512 * 1024 * 1024, policy=local)
+        cold, hot = [], []
+        for url in urls:
+            t0 = time.perf_counter()
+            cache.thumbnail(url, "card")
+            cold.append(time.perf_counter() - t0)
+            for size in THUMB_SIZES:
+                cache.thumbnail(url, size)
+            for _ in range(5):
+                t0 = time.perf_counter()
+                cache.thumbnail(url, "card")
+                hot.append(time.perf_counter() - t0)
+        fetches = sum(server.hits.values())
+        print(f"1. {args.photos} fotos x {len(THUMB_SIZES)} medidas: {fetches} descargas; "
+              f"primera miniatura {ms(statistics.median(cold))}, acierto {ms(statistics.median(hot))} (medianas)")
+        assert fetches == args.photos
+
+    # --- 2. desalojo ---
+    server.hits.clear()
+    with tempfile.TemporaryDirectory() as root:
+        cache = ImageCache(root, max_bytes=512 * 1024 * 1024, policy=local)
+        for url in urls:
+            cache.thumbnail(url, "card")
+        time.sleep(0.01)
+        for url in urls:
+            cache.thumbnail(url, "card")  # aciertos: tocan la miniatura, no el original
+        thumbs = sum(os.path.getsize(os.path.join(root, "thumbs", n)) for n in os.listdir(os.path.join(root, "thumbs")))
+        # Tope justo por encima de las miniaturas: para entrar hay que tirar los originales
+        cache.max_bytes = int(thumbs / 0.9) + 1
+        cache.evict()
+        left = len(os.listdir(os.path.join(root, "src")))
+        before = sum(server.hits.values())
+        for url in urls:
+            cache.thumbnail(url, "card")
+        again = sum(server.hits.values()) - before
+        print(f"2. tras desalojar: {left} originales en disco, {again} descargas al volver a pedir las miniaturas")
+        assert left == 0 and again == 0
+
+        cache.max_bytes = 512 * 1024 * 1024
+        cache.thumbnail(urls[0], "panel")
+        os.remove(cache.thumbnail(urls[1], "card"))
+        cache.thumbnail(urls[1], "card")
+        refetched = sum(server.hits.values()) - before
+        print(f"   medida nueva + miniatura desalojada: {refetched} descargas (una por foto)")
+        assert refetched == 2
+
+    # --- 3. orígenes rechazados ---
+    server.hits.clear()
+    production = SourcePolicy(origins=[base, "https://fotos.example"],
+                              resolve=lambda host, port: {"10.0.0.7"} if host == "fotos.example" else {"127.0.0.1"})
+    redirecting = SourcePolicy(origins=[base], allow_private=True)
+    cases = [
+        ("host fuera de la lista", production, "https://evil.example/a.jpg"),
+        ("metadatos de la nube", production, "http://169.254.169.254/latest/meta-data/"),
+        ("permitido pero resuelve a 10.0.0.7", production, "https://fotos.example/a.jpg"),
+        ("el origen en loopback", production, urls[0]),
+        ("credenciales en la URL", production, base.replace("http://", "http://x:y@") + "/p/0.jpg"),
+        ("redirección a metadatos", redirecting, base + "/redirect"),
+    ]
+    with tempfile.TemporaryDirectory() as root:
+        for label, policy, url in cases:
+            cache = ImageCache(root, policy=policy)
+            try:
+                cache.thumbnail(url, "card")
+            except SourceRejected as ex:
+                print(f"3. rechazado ({label}): {ex}")
+            else:
+                raise AssertionError(f"{label}: debió rechazarse")
+        photo_hits = sum(n for path, n in server.hits.items() if path != "/redirect")
+        assert photo_hits == 0 and not os.listdir(os.path.join(root, "src"))
+
+    # --- 4. DNS rebinding ---
+    server.hits.clear()
+    port = server.server_address[1]
+    answers = iter([{"127.0.0.1"}, {"10.0.0.9"}])  # la 2a sería la de un lookup posterior
+    lookups = []
+
+    def rebinding(host, port):
+        lookups.append(host)
+        return next(answers)
+
+    pinned = SourcePolicy(origins=[f"http://fotos.invalid:{port}"], allow_private=True, resolve=rebinding)
+    with tempfile.TemporaryDirectory() as root:
+        ImageCache(root, policy=pinned).thumbnail(f"http://fotos.invalid:{port}/p/0.jpg", "card")
+    print(f"4. rebinding: {len(lookups)} resolución, descarga a la dirección revisada ({server.hits['/p/0.jpg']} en el origen)")
+    assert lookups == ["fotos.invalid"] and server.hits["/p/0.jpg"] == 1
+
+    try:
+        from fastapi import FastAPI
+        from fastapi.testclient import TestClient
+    except ImportError:
+        print("   (sin fastapi: se omite la prueba por HTTP)")
+        return
+    from services import image_cache, image_proxy
+
+    app = FastAPI()
+    app.include_router(image_proxy.build_router())
+    client = TestClient(app)
+    with tempfile.TemporaryDirectory() as root:
+        image_cache._cache = ImageCache(root, policy=production)
+        codes = [client.get("/img/card", params={"src": url}).status_code for _, _, url in cases[:5]]
+        unknown = client.get("/img/small", params={"src": urls[0]}).status_code
+        image_cache._cache = ImageCache(root, policy=local)
+        ok = client.get("/img/card", params={"src": urls[0]})
+        image_cache._cache = None
+    print(f"   por HTTP: rechazos {codes}, tamaño desconocido {unknown}, permitido {ok.status_code} "
+          f"({ok.headers.get('cache-control')})")
+    assert codes == [403] * 5 and unknown == 404 and ok.status_code == 200
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# benchmarks/import_time.py
+"""
+Mide el costo de importación hasta el primer paint del splash usando
+`python -X importtime`.
+
+"Primer paint" = importar main + routes y resolver la fábrica de /splash,
+que es todo lo que el proceso necesita antes de mandar el primer frame.
+Como referencia también mide el import de todas las páginas (lo que hacía
+main.py antes del registro de rutas diferido).
+
+Uso (desde la raíz del repo):
+    python benchmarks/import_time.py [--runs 5] [--top 15]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "splash (lazy routes)": (
+        "import main, routes; routes.load_factory(routes.resolve('/splash'))"
+    ),
+    "todas las páginas (eager)": (
+        "import main, routes\n"
+        "for _, _, t in routes.ROUTES: routes.load_factory(t)"
+    ),
+}
+
+LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def run_once(code: str):
+    """Devuelve (total_us, [(cumulativo_us, modulo)]) de una corrida en frío."""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "falló")
+    top_level = []
+    for line in proc.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if not m:
+            continue
+        cumulative, indent, name = int(m.group(2)), len(m.group(3)), m.group(4)
+        if indent <= 1:  # solo imports de primer nivel, el resto ya está en su acumulado
+            top_level.append((cumulative, name))
+    return sum(c for c, _ in top_level), top_level
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--top", type=int, default=15)
+    args = ap.parse_args()
+
+    for label, code in SCENARIOS.items():
+        totals, last = [], []
+        for _ in range(args.runs):
+            total, last = run_once(code)
+            totals.append(total)
+        print(f"\n== {label} ==")
+        print(f"  mediana: {statistics.median(totals) / 1000:.1f} ms  "
+              f"(min {min(totals) / 1000:.1f} ms, {args.runs} corridas)")
+        for cumulative, name in sorted(last, reverse=True)[: args.top]:
+            print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
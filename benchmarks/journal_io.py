@@ -0,0 +1,107 @@
+# benchmarks/journal_io.py
+"""
+Throughput de services.journal_io con 50k documentos sobre el Firestore falso en memoria
+(benchmarks/fake_firestore.py), con latencia simulada por RPC:
+  - export a JSONL y a zip (docs/s, RPCs, pico de memoria con tracemalloc)
+  - import en batches + reanudación tras un corte a la mitad
+    (el pico de memoria del import incluye lo que se guarda en el Firestore falso)
+
+Uso (desde la raíz del repo):
+    python benchmarks/journal_io.py [--docs 50000] [--latency-ms 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("NOTES_INDEX_DIR", tempfile.mkdtemp(prefix="notes_index_"))
+
+from benchmarks.fake_firestore import FakeFirestore, FakeFirebaseService  # noqa: E402
+from services import journal_io  # noqa: E402
+
+
+def seed(db: FakeFirestore, uid: str, total: int):
+    user = db.collection("users").document(uid)
+    base = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    split = {"notes": int(total * 0.6), "diagnostics": int(total * 0.3)}
+    split["recommendations"] = total - sum(split.values())
+    for name, n in split.items():
+        coll = user.collection(name)
+        for i in range(n):
+            ts = base + timedelta(minutes=37 * i)
+            if name == "notes":
+                data = {"title": f"Nota {i}", "content": "Hoy me sentí tranquilo. " * 20, "createdAt": ts, "updatedAt": ts}
+            elif name == "diagnostics":
+                data = {"mood": i % 5, "sleep": 6 + i % 3, "answers": {"q1": "a", "q2": "b"}, "createdAt": ts}
+            else:
+                data = {"date": ts.strftime("%Y-%m-%d"), "text": "Respira profundo. " * 30, "meta": {}, "createdAt": ts}
+            db._put(coll._path, f"{name[:1]}{i:07d}", data)
+    return split
+
+
+def timed(fn, *args, **kwargs):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+class Crash(Exception):
+    pass
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--docs", type=int, default=50_000)
+    ap.add_argument("--latency-ms", type=float, default=5)
+    args = ap.parse_args()
+
+    db = FakeFirestore(rpc_latency=args.latency_ms / 1000)
+    fb = FakeFirebaseService(db)
+    split = seed(db, "src", args.docs)
+    print(f"Sembrado: {split}  (latencia por RPC {args.latency_ms} ms)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in ("jsonl", "zip"):
+            out = os.path.join(tmp, f"export.{fmt}")
+            db.rpcs = 0
+            counts, secs, peak = timed(journal_io.export_journal, fb, "src", out)
+            print(
+                f"export {fmt:5s} {sum(counts.values()) / secs:9.0f} docs/s  {db.rpcs:4d} RPCs  "
+                f"{os.path.getsize(out) / 1024 / 1024:6.1f} MB  pico mem {peak / 1024 / 1024:5.1f} MB"
+            )
+
+        src = os.path.join(tmp, "export.jsonl")
+        db.rpcs = 0
+        counts, secs, peak = timed(journal_io.import_journal, fb, "dst", src)
+        print(f"import        {sum(counts.values()) / secs:9.0f} docs/s  {db.rpcs:4d} RPCs  pico mem {peak / 1024 / 1024:5.1f} MB")
+
+        # Reanudación: se corta a la mitad y se vuelve a llamar
+        commits = {"n": 0}
+
+        def crash_halfway(line, _counts):
+            commits["n"] += 1
+            if line >= args.docs // 2 and commits["n"] < 10_000:
+                commits["n"] = 10_000
+                raise Crash()
+
+        try:
+            journal_io.import_journal(fb, "resume", src, on_progress=crash_halfway)
+        except Crash:
+            pass
+        before = sum(db.count(("users", "resume", n)) for n in journal_io.SUBCOLLECTIONS)
+        db.rpcs = 0
+        journal_io.import_journal(fb, "resume", src)
+        after = sum(db.count(("users", "resume", n)) for n in journal_io.SUBCOLLECTIONS)
+        print(f"reanudar: {before} docs antes del corte, {after} al terminar, {db.rpcs} RPCs en la segunda pasada")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+# benchmarks/keyed_list.py
+"""
+Churn de controles y tamaño aproximado del payload al refrescar una lista de 200 tarjetas,
+reconstruyendo todo (como antes) vs. reconciliando con ui_helpers.KeyedList.
+
+El payload se aproxima serializando las propiedades de los controles NUEVOS: Flet compara
+los hijos por identidad, así que un control reutilizado sin cambios no viaja.
+
+Uso (desde la raíz del repo, con flet instalado):
+    python benchmarks/keyed_list.py [--items 200]
+"""
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import flet as ft  # noqa: E402
+from ui_helpers import KeyedList  # noqa: E402
+
+
+def card(note):
+    return ft.Container(
+        content=ft.Column(
+            [
+                ft.Text(note["title"], size=16, weight=ft.FontWeight.W_600),
+                ft.Text(note["content"][:300], size=12),
+                ft.Row([ft.IconButton(icon=ft.Icons.EDIT), ft.IconButton(icon=ft.Icons.DELETE_OUTLINE)]),
+            ],
+            spacing=6,
+        ),
+        padding=14,
+        bgcolor="#EDE7FF",
+        border_radius=16,
+    )
+
+
+def walk(ctrl):
+    """(n_controles, bytes) del subárbol, serializando sus atributos."""
+    attrs = getattr(ctrl, "_Control__attrs", {}) or {}
+    size = len(json.dumps({"t": type(ctrl).__name__, **{k: str(v[0]) for k, v in attrs.items()}}))
+    count = 1
+    for child in ctrl._get_children():
+        c, b = walk(child)
+        count += c
+        size += b
+    return count, size
+
+
+def scenarios(n):
+    base = [{"id": f"n{i}", "title": f"Nota {i}", "content": "texto " * 40} for i in range(n)]
+    yield "borrar 1", base, base[:10] + base[11:]
+    edited = [dict(x) for x in base]
+    edited[5]["title"] = "Editada"
+    yield "editar 1", base, edited
+    yield "insertar 1 arriba", base, [{"id": "nuevo", "title": "Nueva", "content": "x"}] + base
+    yield "mover 1", base, base[1:] + base[:1]
+    yield "sin cambios", base, base
+
+
+def measure_naive(before, after):
+    col = ft.Column([card(x) for x in before])
+    col.controls = [card(x) for x in after]
+    totals = [walk(c) for c in col.controls]
+    return sum(c for c, _ in totals), sum(b for _, b in totals)
+
+
+def measure_keyed(before, after):
+    col = ft.Column()
+    kl = KeyedList(col, key_fn=lambda x: x["id"], build_fn=card,
+                   signature_fn=lambda x: (x["title"], x["content"]))
+    kl.render(before)
+    old = {id(c) for c in col.controls}
+    kl.render(after)
+    totals = [walk(c) for c in col.controls if id(c) not in old]
+    return sum(c for c, _ in totals), sum(b for _, b in totals)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--items", type=int, default=200)
+    args = ap.parse_args()
+    print(f"{'escenario':<20}{'naive ctrls':>12}{'naive KB':>10}{'keyed ctrls':>13}{'keyed KB':>10}")
+    for name, before, after in scenarios(args.items):
+        nc, nb = measure_naive(before, after)
+        kc, kb = measure_keyed(before, after)
+        print(f"{name:<20}{nc:>12}{nb / 1024:>10.1f}{kc:>13}{kb / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
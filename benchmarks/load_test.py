@@ -0,0 +1,157 @@
+# benchmarks/load_test.py
+"""
+Throughput del servidor de producción (serve.py / asgi:app) contra el número de workers.
+
+Para cada valor de --workers levanta `python serve.py --workers N` en un puerto libre,
+espera a /healthz y lo satura durante --seconds con varios procesos cliente (cada
+uno con varios hilos y conexiones keep-alive), para que el cliente no sea el cuello
+de botella por el GIL. Reporta peticiones/s, p50/p95 y cuántos pids distintos
+respondieron /healthz (para confirmar que el reparto llega a todos los workers).
+
+Rutas útiles:
+    /                       index de Flet (estático)
+    /img/card?src=<url>     miniatura ya en caché (disco + FileResponse); <url> de un
+                            origen permitido, codificada (tamaños: THUMB_SIZES)
+    /healthz                sin trabajo: techo del servidor
+
+Uso (desde la raíz del repo, con requirements.txt instalado):
+    python benchmarks/load_test.py [--workers 1,2,4] [--path /] [--seconds 10]
+    python benchmarks/load_test.py --url http://host:80 --path /   # servidor ya levantado
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(base: str, timeout: float = 60) -> bool:
+    u = urlsplit(base)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            c = http.client.HTTPConnection(u.hostname, u.port, timeout=2)
+            c.request("GET", "/healthz")
+            if c.getresponse().status == 200:
+                return True
+        except OSError:
+            pass
+        time.sleep(0.3)
+    return False
+
+
+def client_proc(base: str, path: str, threads: int, seconds: float, out):
+    """Un proceso cliente: `threads` hilos, cada uno con su conexión keep-alive."""
+    u = urlsplit(base)
+    lat, errors, pids = [], [0], set()
+    lock = threading.Lock()
+    stop_at = time.monotonic() + seconds
+
+    def worker():
+        conn = http.client.HTTPConnection(u.hostname, u.port, timeout=10)
+        mine = []
+        while time.monotonic() < stop_at:
+            t0 = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                r = conn.getresponse()
+                body = r.read()
+                if r.status >= 400:
+                    raise OSError(r.status)
+                mine.append(time.perf_counter() - t0)
+                if path == "/healthz":
+                    pids.add(json.loads(body)["pid"])
+            except Exception:
+                with lock:
+                    errors[0] += 1
+                conn.close()
+                conn = http.client.HTTPConnection(u.hostname, u.port, timeout=10)
+        with lock:
+            lat.extend(mine)
+
+    ts = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in ts:
+        t.start()
+    for t in ts:
+        t.join()
+    out.put((lat, errors[0], list(pids)))
+
+
+def run_load(base: str, path: str, procs: int, threads: int, seconds: float) -> dict:
+    q = multiprocessing.Queue()
+    ps = [multiprocessing.Process(target=client_proc, args=(base, path, threads, seconds, q)) for _ in range(procs)]
+    for p in ps:
+        p.start()
+    lat, errors, pids = [], 0, set()
+    for _ in ps:
+        l, e, pp = q.get()
+        lat.extend(l)
+        errors += e
+        pids.update(pp)
+    for p in ps:
+        p.join()
+    lat.sort()
+    pick = lambda f: lat[min(len(lat) - 1, int(len(lat) * f))] * 1000 if lat else 0.0  # noqa: E731
+    return {"rps": len(lat) / seconds, "p50": pick(0.5), "p95": pick(0.95), "errors": errors, "pids": len(pids)}
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", default="1,2,4")
+    ap.add_argument("--path", default="/")
+    ap.add_argument("--seconds", type=float, default=10)
+    ap.add_argument("--client-procs", type=int, default=max(2, (os.cpu_count() or 2) // 2))
+    ap.add_argument("--threads", type=int, default=16, help="hilos por proceso cliente")
+    ap.add_argument("--url", help="servidor ya levantado (no se arranca serve.py)")
+    args = ap.parse_args()
+
+    print(f"ruta {args.path}  {args.client_procs}x{args.threads} conexiones  {args.seconds:.0f} s por corrida")
+    if args.url:
+        r = run_load(args.url.rstrip("/"), args.path, args.client_procs, args.threads, args.seconds)
+        print(f"externo:    {r['rps']:8.0f} req/s  p50 {r['p50']:6.1f} ms  p95 {r['p95']:6.1f} ms  errores {r['errors']}")
+        return
+
+    env = dict(os.environ, WARMUP_FIRESTORE=os.getenv("WARMUP_FIRESTORE", "0"))
+    for n in [int(x) for x in args.workers.split(",") if x.strip()]:
+        port = free_port()
+        base = f"http://127.0.0.1:{port}"
+        server = subprocess.Popen(
+            [sys.executable, "serve.py", "--workers", str(n), "--host", "127.0.0.1", "--port", str(port)],
+            cwd=ROOT, env=env,
+        )
+        try:
+            if not wait_ready(base):
+                print(f"{n} workers:  no arrancó")
+                continue
+            run_load(base, args.path, 1, 2, 1)  # calentar
+            r = run_load(base, args.path, args.client_procs, args.threads, args.seconds)
+            seen = run_load(base, "/healthz", args.client_procs, args.threads, 2)["pids"]
+            print(
+                f"{n} workers:  {r['rps']:8.0f} req/s  p50 {r['p50']:6.1f} ms  p95 {r['p95']:6.1f} ms  "
+                f"errores {r['errors']}  pids vistos {seen}"
+            )
+        finally:
+            server.terminate()
+            try:
+                server.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+
+if __name__ == "__main__":
+    main()
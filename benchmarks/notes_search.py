@@ -0,0 +1,171 @@
+# benchmarks/notes_search.py
+"""
+Búsqueda de notas con services.notes_index sobre 10k notas sintéticas en español:
+tiempo de construcción, de guardado/carga del índice y latencia por consulta,
+comparado con recorrer todas las notas (lo que haría una búsqueda ingenua
+después de traerlas de Firestore).
+
+Al final, --workers procesos escriben a la vez sobre el mismo índice en disco (como
+serve.py --workers N), compactando seguido: ninguna nota de otro proceso se pierde
+y cada uno ve lo que escribieron los demás. Y con el índice ya construido, un
+notesIndexGen nuevo en el perfil (import en otro host) hace que sync lo reconstruya
+sin quedarse esperando su propio candado.
+
+Uso (desde la raíz del repo):
+    python benchmarks/notes_search.py [--notes 10000] [--queries 200] [--workers 4]
+"""
+import argparse
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import notes_index  # noqa: E402
+from services.notes_index import NotesIndex, fold  # noqa: E402
+from fake_firestore import FakeFirebaseService, FakeFirestore  # noqa: E402
+
+WORDS = (
+    "ansiedad tristeza alegría calma respiración ejercicio trabajo escuela familia amigos sueño "
+    "insomnio cansancio energía música canción caminata terapia psicóloga meditación gratitud "
+    "enojo miedo esperanza logro examen proyecto viaje lluvia sol mañana noche café comida "
+    "ánimo estrés pendiente reunión llamada mamá papá hermano pareja perro gato lectura libro "
+    "película serie descanso dolor cabeza corazón paciencia cambio decisión objetivo hábito"
+).split()
+FILLER = "hoy me sentí un poco con mucho de la el que por para pero muy también ya".split()
+SYLLABLES = "ma me mi mo lu la ta te ti ro ra ca co ce sa so pe pa ni na ga go ve va ri du".split()
+
+
+def vocabulary(rng: random.Random, size: int = 6000) -> list[str]:
+    """Palabras poco frecuentes (nombres, lugares, temas): el vocabulario real es amplio."""
+    return ["".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))) for _ in range(size)]
+
+
+def fake_note(rng: random.Random, vocab: list[str]) -> tuple[str, str]:
+    title = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))).capitalize()
+    words = [
+        rng.choice(WORDS if r < 0.25 else vocab if r < 0.55 else FILLER)
+        for r in (rng.random() for _ in range(rng.randint(30, 220)))
+    ]
+    return title, " ".join(words) + "."
+
+
+def pct(values, p):
+    return sorted(values)[min(len(values) - 1, int(len(values) * p))]
+
+
+def writer(root: str, worker: int, count: int):
+    notes_index.COMPACT_EVERY = 25  # compactar seguido: es cuando antes se perdían notas ajenas
+    idx = NotesIndex("shared-user", root=root)
+    for i in range(count):
+        idx.upsert(f"w{worker}-{i:04d}", f"nota {i}", f"palabra{worker} texto comun", created=time.time())
+        if i % 40 == 39:
+            idx.save()
+    idx.delete(f"w{worker}-0000")
+    # Lo de los demás procesos aparece al buscar, sin reiniciar
+    return len(idx.search("comun", limit=100_000))
+
+
+def concurrent_writers(workers: int, count: int = 200):
+    with tempfile.TemporaryDirectory() as root:
+        ctx = multiprocessing.get_context("spawn")
+        with ctx.Pool(workers) as pool:
+            seen = pool.starmap(writer, [(root, w, count) for w in range(workers)])
+        fresh = NotesIndex("shared-user", root=root)
+        expected = workers * (count - 1)
+        print(f"{workers} procesos x {count} notas (compactando cada 25 ops): al reabrir {len(fresh.docs)}/{expected}; "
+              f"cada proceso al terminar veía {min(seen)}-{max(seen)}")
+        assert len(fresh.docs) == expected
+        assert all(len(fresh.search(f"palabra{w}", limit=100_000)) == count - 1 for w in range(workers))
+
+
+def generation_change():
+    fb = FakeFirebaseService(FakeFirestore())
+    users = fb.db.collection("users")
+    now = datetime.now(timezone.utc)
+
+    def add(i):
+        fb.notes_collection("gen-user").document(f"g{i}").set(
+            {"title": f"nota {i}", "content": "caminata al sol", "createdAt": now, "updatedAt": now})
+
+    for i in range(3):
+        add(i)
+    users.document("gen-user").set({"notesIndexGen": "g1"}, merge=True)
+    with tempfile.TemporaryDirectory() as root:
+        idx = NotesIndex("gen-user", root=root)
+        idx.sync(fb)
+        add(3)
+        users.document("gen-user").set({"notesIndexGen": "g2"}, merge=True)
+        result = {}
+        worker = threading.Thread(target=lambda: result.setdefault("n", idx.sync(fb)), daemon=True)
+        worker.start()
+        worker.join(10)
+        assert not worker.is_alive(), "sync se quedó esperando su propio candado"
+        print(f"notesIndexGen nuevo con el índice construido: reconstruido con {result['n']} notas "
+              f"(generación {idx.generation})")
+        assert result["n"] == 4 and idx.generation == "g2" and len(idx.search("caminata")) == 4
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--notes", type=int, default=10_000)
+    ap.add_argument("--queries", type=int, default=200)
+    ap.add_argument("--workers", type=int, default=4)
+    args = ap.parse_args()
+
+    rng = random.Random(7)
+    vocab = vocabulary(rng)
+    notes = {f"n{i:05d}": fake_note(rng, vocab) for i in range(args.notes)}
+    # Mezcla de palabras completas y prefijos (lo que se escribe mientras se teclea)
+    queries = [
+        " ".join(rng.choice(WORDS + vocab)[: rng.choice((3, 4, 20))] for _ in range(rng.randint(1, 2)))
+        for _ in range(args.queries)
+    ]
+
+    with tempfile.TemporaryDirectory() as root:
+        idx = NotesIndex("bench-user", root=root)
+        t0 = time.perf_counter()
+        for nid, (title, content) in notes.items():
+            idx.upsert(nid, title, content, created=time.time(), log=False)
+        build = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        idx.save()
+        save = time.perf_counter() - t0
+        size_mb = os.path.getsize(idx.snapshot_path) / 1024 / 1024
+
+        t0 = time.perf_counter()
+        idx = NotesIndex("bench-user", root=root)
+        load = time.perf_counter() - t0
+
+        lat = []
+        hits = 0
+        for q in queries:
+            t0 = time.perf_counter()
+            hits += len(idx.search(q))
+            lat.append((time.perf_counter() - t0) * 1000)
+
+        naive = []
+        folded = {nid: fold(t + " " + c) for nid, (t, c) in notes.items()}
+        for q in queries[:20]:
+            terms = fold(q).split()
+            t0 = time.perf_counter()
+            [nid for nid, text in folded.items() if all(t in text for t in terms)]
+            naive.append((time.perf_counter() - t0) * 1000)
+
+    print(f"Notas: {args.notes}  términos distintos: {len(idx.postings)}")
+    print(f"Construcción: {build:.2f} s   guardar: {save:.2f} s ({size_mb:.1f} MB)   cargar: {load:.2f} s")
+    print(f"Índice   p50 {statistics.median(lat):6.2f} ms   p95 {pct(lat, 0.95):6.2f} ms   ({hits / len(queries):.0f} resultados/consulta)")
+    print(f"Recorrido p50 {statistics.median(naive):6.2f} ms   p95 {pct(naive, 0.95):6.2f} ms   (sin ranking, ya con el texto en memoria)")
+    concurrent_writers(args.workers)
+    generation_change()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+# benchmarks/offline_queue.py
+"""
+Escrituras a Firestore al reconectar después de una sesión sin conexión, con la
+cola anterior (una acción por guardado, las ediciones como notas nuevas) y con la
+cola que junta operaciones por documento (services.offline_queue.coalesce).
+
+La página es falsa (client_storage = dict) y el FirebaseService también: solo
+cuenta llamadas y espera --latency-ms por escritura. Cada escenario verifica con
+assert cuántas escrituras deben salir.
+
+Uso (desde la raíz del repo):
+    python benchmarks/offline_queue.py [--edits 50] [--notes 40] [--latency-ms 40]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import offline_queue  # noqa: E402
+from services.sync_offline import sync_offline_actions  # noqa: E402
+
+UID = "u1"
+
+
+class FakeStorage(dict):
+    def set(self, key, value):
+        self[key] = value
+
+
+class FakePage:
+    def __init__(self):
+        self.client_storage = FakeStorage()
+
+
+class CountingFirebase:
+    """Mismos métodos de escritura que FirebaseService; cuenta y duerme."""
+
+    def __init__(self, latency: float = 0.0, fail_after: int | None = None):
+        self.latency, self.fail_after = latency, fail_after
+        self.calls = Counter()
+        self.docs: dict[tuple, dict] = {}
+
+    def _write(self, name: str):
+        if self.fail_after is not None and sum(self.calls.values()) >= self.fail_after:
+            raise ConnectionError("sin red (simulado)")
+        self.calls[name] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def add_note(self, uid, title, content, note_id=None):
+        self._write("add_note")
+        doc_id = note_id or f"n{len(self.docs)}"
+        self.docs[("note", doc_id)] = {"title": title, "content": content}
+        return doc_id
+
+    def update_note(self, uid, note_id, title, content):
+        self._write("update_note")
+        self.docs[("note", note_id)] = {"title": title, "content": content}
+
+    def delete_note(self, uid, note_id):
+        self._write("delete_note")
+        self.docs.pop(("note", note_id), None)
+
+    def add_diagnostic(self, uid, data, diagnostic_id=None):
+        self._write("add_diagnostic")
+        return diagnostic_id or "d0"
+
+    def update_diagnostic(self, uid, diagnostic_id, data):
+        self._write("update_diagnostic")
+
+    def delete_diagnostic(self, uid, diagnostic_id):
+        self._write("delete_diagnostic")
+
+    def upsert_recommendation_for_date(self, uid, date_key, text, meta=None):
+        self._write("upsert_recommendation")
+
+    def delete_recommendation(self, uid, date_key):
+        self._write("delete_recommendation")
+
+
+def legacy_writes(ops: list[tuple]) -> int:
+    """La cola anterior: cada guardado offline era un add (los delete no se encolaban)."""
+    return sum(1 for op, _kind, _doc, _payload in ops if op in ("create", "update"))
+
+
+def run(ops: list[tuple], latency: float) -> tuple[int, float, CountingFirebase]:
+    """
+    ops = [(op, kind, clave, payload)]. Un create de nota recibe un id local nuevo y
+    las operaciones siguientes con la misma clave lo usan (como hace el editor).
+    """
+    page = FakePage()
+    ids = {}
+    for op, kind, key, payload in ops:
+        if op == "create" and kind == "note":
+            ids[key] = offline_queue.enqueue(page, kind, op, UID, payload=payload)
+        else:
+            offline_queue.enqueue(page, kind, op, UID, ids.get(key, key), payload)
+    fb = CountingFirebase(latency)
+    t0 = time.perf_counter()
+    writes = asyncio.run(sync_offline_actions(page, fb))
+    assert not offline_queue.has_pending(page)
+    return writes, time.perf_counter() - t0, fb
+
+
+def note(i: int) -> dict:
+    return {"title": f"Nota {i}", "content": "x" * (i % 200)}
+
+
+def scenarios(edits: int, notes: int, seed: int) -> list[tuple[str, list, int]]:
+    """(nombre, operaciones, escrituras esperadas con la cola nueva)"""
+    out = []
+    # Nota nueva sin conexión y editada N veces: un solo add con el texto final
+    out.append((f"create + {edits} ediciones",
+                [("create", "note", "a", note(0))] + [("update", "note", "a", note(i)) for i in range(1, edits + 1)],
+                1))
+    # ...y al final borrada: nunca llegó al servidor, no se escribe nada
+    out.append((f"create + {edits} ediciones + delete",
+                [("create", "note", "a", note(0))] + [("update", "note", "a", note(i)) for i in range(1, edits + 1)]
+                + [("delete", "note", "a", None)],
+                0))
+    # Nota que ya existía: N ediciones = un update con la última versión
+    out.append((f"{edits} ediciones de nota existente",
+                [("update", "note", "srv1", note(i)) for i in range(edits)],
+                1))
+    out.append((f"{edits} ediciones + delete de existente",
+                [("update", "note", "srv1", note(i)) for i in range(edits)] + [("delete", "note", "srv1", None)],
+                1))
+    # Diagnóstico + frase + recomendación regenerada varias veces el mismo día
+    out.append(("diagnóstico+frase, 5 recomendaciones",
+                [("create", "diagnostic", "d", {"score": 3}), ("update", "diagnostic", "d", {"phrase": "hola"})]
+                + [("create", "recommendation", "2026-10-19", {"text": f"r{i}"}) for i in range(5)],
+                2))
+
+    # Sesión mezclada: notas con ediciones al azar, algunas borradas, intercaladas
+    rng = random.Random(seed)
+    per_doc, expected = [], 0
+    for n in range(notes):
+        existing = rng.random() < 0.5
+        key = f"srv{n}" if existing else f"new{n}"
+        doc_ops = [] if existing else [("create", "note", key, note(n))]
+        doc_ops += [("update", "note", key, note(n + i)) for i in range(rng.randint(1, max(1, edits // 5)))]
+        deleted = rng.random() < 0.25
+        if deleted:
+            doc_ops.append(("delete", "note", key, None))
+        per_doc.append(doc_ops)
+        if existing or not deleted:
+            expected += 1
+    mixed = []
+    while any(per_doc):
+        mixed.append(rng.choice([q for q in per_doc if q]).pop(0))
+    out.append((f"sesión mezclada ({notes} notas)", mixed, expected))
+    return out
+
+
+def check_retry(latency: float):
+    """Falla la red a media sincronización: lo que faltó se reencola y sale después, sin duplicar."""
+    page = FakePage()
+    for n in range(6):
+        doc = offline_queue.enqueue(page, "note", "create", UID, payload=note(n))
+        for i in range(5):
+            offline_queue.enqueue(page, "note", "update", UID, doc, note(n + i))
+    fb = CountingFirebase(latency, fail_after=2)
+    first = asyncio.run(sync_offline_actions(page, fb))
+    left = len(offline_queue.peek_all(page))
+    # Mientras tanto el usuario edita una de las pendientes
+    pending_doc = offline_queue.peek_all(page)[0]["doc_id"]
+    offline_queue.enqueue(page, "note", "update", UID, pending_doc, {"title": "final", "content": "final"})
+    fb.fail_after = None
+    second = asyncio.run(sync_offline_actions(page, fb))
+    assert (first, left, second) == (2, 4, 4), (first, left, second)
+    assert sum(fb.calls.values()) == 6
+    assert any(d["title"] == "final" for d in fb.docs.values())
+    print(f"reintento: {first} escrituras, {left} reencoladas, {second} al reconectar (6 en total, sin duplicados)")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--edits", type=int, default=50)
+    ap.add_argument("--notes", type=int, default=40)
+    ap.add_argument("--latency-ms", type=float, default=40)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    latency = args.latency_ms / 1000
+
+    print(f"{'escenario':40s} {'ops':>5s} {'antes':>6s} {'ahora':>6s} {'sync':>9s}")
+    for name, ops, expected in scenarios(args.edits, args.notes, args.seed):
+        writes, secs, fb = run(ops, latency)
+        assert writes == expected, f"{name}: {writes} escrituras, se esperaban {expected}"
+        assert sum(fb.calls.values()) == writes
+        print(f"{name:40s} {len(ops):5d} {legacy_writes(ops):6d} {writes:6d} {secs * 1000:7.0f} ms")
+    check_retry(0)
+
+
+if __name__ == "__main__":
+    main()
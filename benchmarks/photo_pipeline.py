@@ -0,0 +1,61 @@
+# benchmarks/photo_pipeline.py
+"""
+Tiempo de services.photo_pipeline.process_photo con fotos de cámara (~24 MP, JPEG
+con ruido para que no se compriman de forma trivial), en serie y en el pool de procesos.
+
+Uso (desde la raíz del repo, con Pillow instalado):
+    python benchmarks/photo_pipeline.py [--photos 8] [--workers 2]
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image  # noqa: E402
+from services.photo_pipeline import process_photo  # noqa: E402
+
+
+def camera_jpeg(seed: int, size=(6000, 4000)) -> bytes:
+    """JPEG de 24 MP: ruido sobre un degradado, con rotación EXIF como los celulares."""
+    noise = Image.effect_noise(size, 40 + seed % 20).convert("RGB")
+    grad = Image.linear_gradient("L").resize(size).convert("RGB")
+    im = Image.blend(noise, grad, 0.5)
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: girar 90°
+    buf = io.BytesIO()
+    im.save(buf, "JPEG", quality=92, exif=exif)
+    return buf.getvalue()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--photos", type=int, default=8)
+    ap.add_argument("--workers", type=int, default=2)
+    args = ap.parse_args()
+
+    print(f"Generando {args.photos} fotos de 24 MP…")
+    photos = [camera_jpeg(i) for i in range(args.photos)]
+    avg_mb = sum(map(len, photos)) / len(photos) / 1024 / 1024
+    print(f"Tamaño medio de entrada: {avg_mb:.1f} MB")
+
+    t0 = time.perf_counter()
+    results = [process_photo(p) for p in photos]
+    serial = time.perf_counter() - t0
+    out_kb = sum(len(r[1]) for r in results) / len(results) / 1024
+    print(f"Serie:  {serial:.2f} s total, {serial / len(photos) * 1000:.0f} ms/foto, salida media {out_kb:.0f} KB")
+
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        list(pool.map(process_photo, photos[:1]))  # calentar workers
+        t0 = time.perf_counter()
+        list(pool.map(process_photo, photos))
+        pooled = time.perf_counter() - t0
+    print(f"Pool({args.workers}): {pooled:.2f} s total, {pooled / len(photos) * 1000:.0f} ms/foto")
+
+
+if __name__ == "__main__":
+    main()
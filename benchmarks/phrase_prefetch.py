@@ -0,0 +1,106 @@
+# benchmarks/phrase_prefetch.py
+"""
+Frase especulativa del diagnóstico (services.phrase_prefetch): cuánto tarda la
+frase en estar lista después de "Guardar" y cuántas llamadas extra a Gemini cuesta.
+
+Cada sesión simulada cambia el formulario varias veces (ráfagas cortas y pausas
+largas de lectura), a veces escribe la nota al final, y guarda. Sin especulación
+la frase tarda lo que tarde Gemini desde el submit; con ella, si las entradas
+coinciden, solo lo que falte de la llamada que ya estaba en curso.
+Las sesiones corren en paralelo (hilos) con los tiempos escalados por --scale.
+
+Uso (desde la raíz del repo):
+    python benchmarks/phrase_prefetch.py [--sessions 40] [--scale 0.05]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.phrase_prefetch import DEBOUNCE, MAX_CALLS, SpeculativePhrase  # noqa: E402
+
+
+def session_script(rng: random.Random) -> list[tuple[float, dict]]:
+    """[(espera antes del evento, entradas)]; el último evento es el submit (entradas None)."""
+    steps, step = [], 0
+    for _ in range(rng.randint(3, 10)):
+        gap = rng.uniform(0.2, 1.2) if rng.random() < 0.7 else rng.uniform(2, 6)
+        step += 1
+        steps.append((gap, {"step": step}))
+    if rng.random() < 0.3:
+        # Escribe la nota al final: una tecla cada ~150 ms
+        steps.append((rng.uniform(0.5, 2), {"step": step, "note": ""}))
+        for n in range(rng.randint(10, 40)):
+            steps.append((0.15, {"step": step, "note": "x" * (n + 1)}))
+    steps.append((rng.uniform(0.5, 4), None))
+    return steps
+
+
+def run_session(script, gemini_s: float, scale: float, debounce: float | None, out: list):
+    calls = [0]
+
+    def generate(_inputs):
+        calls[0] += 1
+        time.sleep(gemini_s * scale)
+        return "frase"
+
+    prefetch = SpeculativePhrase(generate, debounce=debounce * scale) if debounce else None
+    last = None
+    for gap, inputs in script:
+        time.sleep(gap * scale)
+        if inputs is None:
+            break
+        last = inputs
+        if prefetch:
+            prefetch.update(inputs)
+
+    t0 = time.perf_counter()
+    future = prefetch.take(last) if prefetch else None
+    if future is not None:
+        future.result()
+    else:
+        generate(last)  # el trabajo en segundo plano llama a Gemini
+    out.append(((time.perf_counter() - t0) / scale, calls[0] - 1, future is not None))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, default=40)
+    ap.add_argument("--scale", type=float, default=0.05, help="1 = segundos reales")
+    ap.add_argument("--gemini-ms", type=float, default=3_000)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+    gemini_s = args.gemini_ms / 1000
+
+    rng = random.Random(args.seed)
+    scripts = [session_script(rng) for _ in range(args.sessions)]
+    print(f"{args.sessions} sesiones, Gemini {args.gemini_ms:.0f} ms, tope {MAX_CALLS} llamadas especulativas por sesión")
+    print(f"{'':22s} frase lista tras guardar (media / p50 / p90)   aciertos   llamadas extra por sesión")
+    results = {}
+    for debounce in (None, 0.75, DEBOUNCE, 3.0):
+        out = []
+        threads = [threading.Thread(target=run_session, args=(s, gemini_s, args.scale, debounce, out)) for s in scripts]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        waits = sorted(w for w, _, _ in out)
+        mean, p50, p90 = statistics.mean(waits), statistics.median(waits), waits[int(len(waits) * 0.9)]
+        hits = sum(h for _, _, h in out)
+        extra = statistics.mean(e for _, e, _ in out)
+        label = "sin especulación" if debounce is None else f"debounce {debounce:.2f} s"
+        print(f"{label:22s} {mean * 1000:6.0f} / {p50 * 1000:6.0f} / {p90 * 1000:6.0f} ms {'':16s}"
+              f"{hits:3d}/{len(out)}   {extra:.2f}")
+        results[debounce] = (mean, extra)
+        assert max(e for _, e, _ in out) <= MAX_CALLS
+
+    assert results[DEBOUNCE][0] < results[None][0] * 0.9, "la especulación debe acortar la espera"
+
+
+if __name__ == "__main__":
+    main()
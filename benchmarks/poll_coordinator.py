@@ -0,0 +1,129 @@
+# benchmarks/poll_coordinator.py
+"""
+Peticiones salientes e hilos para N sesiones esperando el handshake de notificaciones:
+un hilo + requests.get por sesión cada segundo (como antes) vs. PollCoordinator.
+
+Levanta un servidor local falso que confirma cada sesión tras `--ready-after` segundos.
+Con --no-batch el servidor no tiene endpoint batch (el coordinador cae a polls
+individuales con tope de QPS).
+
+Uso (desde la raíz del repo, con requests y httpx instalados):
+    python benchmarks/poll_coordinator.py [--sessions 200] [--ready-after 5] [--no-batch]
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+from services.poll_coordinator import PollCoordinator  # noqa: E402
+
+
+def fake_service(ready_after: float, batch: bool):
+    stats = {"requests": 0, "connections": set()}
+    t0 = time.monotonic()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *args):
+            pass
+
+        def _reply(self, code, payload=None):
+            body = json.dumps(payload or {}).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _count(self):
+            stats["requests"] += 1
+            stats["connections"].add(self.client_address)
+
+        def do_GET(self):
+            self._count()
+            self._reply(200, {"ready": time.monotonic() - t0 >= ready_after})
+
+        def do_POST(self):
+            self._count()
+            if not batch:
+                return self._reply(404)
+            data = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            ready = data["sessions"] if time.monotonic() - t0 >= ready_after else []
+            self._reply(200, {"ready": ready})
+
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv, stats
+
+
+def run_threads(url: str, n: int, done: threading.Event):
+    """Patrón anterior: un hilo por sesión, requests.get nuevo cada segundo."""
+    left = {"n": n}
+    lock = threading.Lock()
+
+    def poll(sid):
+        for _ in range(60):
+            try:
+                r = requests.get(f"{url}/notify/poll", params={"session": sid}, timeout=5)
+                if r.ok and r.json().get("ready"):
+                    break
+            except Exception:
+                pass
+            time.sleep(1)
+        with lock:
+            left["n"] -= 1
+            if not left["n"]:
+                done.set()
+
+    for i in range(n):
+        threading.Thread(target=poll, args=(f"s{i}",), daemon=True).start()
+
+
+def run_coordinator(url: str, n: int, done: threading.Event):
+    pc = PollCoordinator(base_url=url)
+    left = {"n": n}
+    lock = threading.Lock()
+
+    def finished():
+        with lock:
+            left["n"] -= 1
+            if not left["n"]:
+                done.set()
+
+    for i in range(n):
+        pc.watch(f"s{i}", on_ready=finished, on_timeout=finished, ttl=60)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sessions", type=int, default=200)
+    ap.add_argument("--ready-after", type=float, default=5.0)
+    ap.add_argument("--no-batch", action="store_true")
+    args = ap.parse_args()
+
+    for name, runner in (("hilo por sesión", run_threads), ("PollCoordinator", run_coordinator)):
+        srv, stats = fake_service(args.ready_after, batch=not args.no_batch)
+        url = f"http://127.0.0.1:{srv.server_port}"
+        threads_before = threading.active_count()
+        done = threading.Event()
+        t0 = time.perf_counter()
+        runner(url, args.sessions, done)
+        peak_threads = threading.active_count() - threads_before
+        done.wait(90)
+        elapsed = time.perf_counter() - t0
+        srv.shutdown()
+        print(
+            f"{name:16s} {stats['requests']:6d} peticiones  {len(stats['connections']):5d} conexiones  "
+            f"{peak_threads:4d} hilos  {stats['requests'] / elapsed:7.1f} req/s  ({elapsed:.1f} s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+# benchmarks/precache.py
+"""
+Peticiones de red por visita con el service worker anterior (mindful-cache-v5) y con
+el precache por hash (tools/precache_manifest.py), contra tools/serve_dist.py.
+
+No hay navegador aquí: cada estrategia se modela en Python siguiendo su service
+worker (qué rutas salen de caché y cuáles van a la red) y las que van a la red se
+piden de verdad al servidor local, que es quien las cuenta (/__stats).
+Una "visita" pide todos los archivos de dist/ (lo que carga el arranque de Flutter
++ Pyodide), primero en frío, luego repetida, y luego tras un build que cambia un archivo.
+
+Uso (desde la raíz del repo):
+    python benchmarks/precache.py
+"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tools import precache_manifest  # noqa: E402
+from tools.serve_dist import make_server  # noqa: E402
+
+OLD_CORE = ["/", "/index.html", "/manifest.json", "/assets/logo.png"]
+OLD_CACHE_FIRST = (".js", ".css", ".png", ".jpg", ".webp", ".ico")
+
+
+class Net:
+    def __init__(self, base: str):
+        self.base = base
+
+    def get(self, path: str) -> bytes:
+        with urllib.request.urlopen(self.base + path) as r:
+            return r.read()
+
+    def stats(self, reset: bool = False) -> dict:
+        return json.loads(self.get("/__stats" + ("?reset=1" if reset else "")))
+
+
+class OldWorker:
+    """web/service_worker.js anterior: CORE_ASSETS + cache-first por extensión."""
+
+    def __init__(self, net: Net):
+        self.net, self.cache, self.installed = net, {}, False
+
+    def install(self, _manifest):
+        # versión nueva a mano = se borra todo. cache.addAll es todo o nada: si falta
+        # un archivo (p. ej. /assets/logo.png en dist/) el SW no se instala y no intercepta
+        self.cache = {}
+        try:
+            self.cache = {p: self.net.get(p) for p in OLD_CORE}
+            self.installed = True
+        except OSError:
+            self.installed = False
+
+    def fetch(self, path: str):
+        if not self.installed:
+            self.net.get(path)
+            return
+        if path.startswith("/assets/") or path.endswith(OLD_CACHE_FIRST):
+            if path not in self.cache:
+                self.cache[path] = self.net.get(path)
+            return
+        try:
+            self.cache[path] = self.net.get(path)  # network-first
+        except OSError:
+            pass
+
+
+class PrecacheWorker:
+    """web/service_worker.js nuevo: precache por hash, solo baja lo que cambió."""
+
+    def __init__(self, net: Net):
+        self.net, self.cache, self.index = net, {}, {}
+
+    def install(self, manifest):
+        files = manifest["files"]
+        for p, h in files.items():
+            if self.index.get(p) != h:
+                self.cache[p] = self.net.get(p)
+                self.index[p] = h
+        for p in [p for p in self.index if p not in files]:
+            self.cache.pop(p, None)
+            self.index.pop(p)
+
+    def fetch(self, path: str):
+        path = "/index.html" if path == "/" else path
+        if path not in self.cache:
+            self.cache[path] = self.net.get(path)
+        # app.tar.gz: stale-while-revalidate, pero no más de una vez por hora
+
+
+def visit(worker, paths):
+    for p in paths:
+        worker.fetch(p)
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        dist = os.path.join(tmp, "dist")
+        shutil.copytree(os.path.join(ROOT, "dist"), dist)
+        manifest = precache_manifest.build(dist, verbose=False)["manifest"]
+
+        server = make_server(dist, port=0, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        net = Net(f"http://127.0.0.1:{server.server_address[1]}")
+        paths = ["/"] + [p for p in manifest["files"] if p != "/index.html"]
+        print(f"{len(paths)} archivos por visita")
+        missing = [p for p in OLD_CORE if not os.path.exists(os.path.join(dist, p.lstrip("/") or "index.html"))]
+        if missing:
+            print(f"CORE_ASSETS del SW anterior que no están en dist/: {', '.join(missing)}")
+
+        for label, cls in (("anterior (v5)", OldWorker), ("precache hash", PrecacheWorker)):
+            worker = cls(net)
+            net.stats(reset=True)
+            worker.install(manifest)
+            visit(worker, paths)
+            cold = net.stats(reset=True)["total"]
+            visit(worker, paths)
+            repeat = net.stats(reset=True)
+
+            # Build nuevo: cambia un archivo (python.js) y se regenera el manifiesto
+            with open(os.path.join(dist, "python.js"), "a", encoding="utf-8") as f:
+                f.write("\n// cambio\n")
+            new_manifest = precache_manifest.build(dist, verbose=False)["manifest"]
+            worker.install(new_manifest)
+            update = net.stats(reset=True)["total"]
+            shutil.rmtree(dist)
+            shutil.copytree(os.path.join(ROOT, "dist"), dist)
+            precache_manifest.build(dist, verbose=False)
+
+            print(
+                f"{label:14s} primera visita {cold:3d} peticiones  repetida {repeat['total']:3d}  "
+                f"build con 1 cambio {update:3d}"
+            )
+            if repeat["total"]:
+                shown = sorted(repeat["paths"])
+                print(f"{'':14s} repetida va a la red: {', '.join(shown[:6])}{' …' if len(shown) > 6 else ''}")
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
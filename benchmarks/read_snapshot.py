@@ -0,0 +1,183 @@
+# benchmarks/read_snapshot.py
+"""
+Tiempo hasta la primera pintura con datos (no un spinner) de Notas, Recomendaciones,
+Home y Estadísticas con un backend lento, sin snapshot y con el snapshot de
+services/read_snapshot.py, y qué ve cada vista con el backend caído.
+
+Cada vista se reduce a lo que hace al abrir: read_snapshot.cached_then_fresh con
+sus secciones reales y un fetch que tarda --latency-ms por consulta a Firestore
+(Notas 1, Home 1, Recomendaciones 2, Estadísticas 2). El client_storage es un dict
+con --storage-ms por llamada (en web cada get/set es un viaje al navegador).
+
+Uso (desde la raíz del repo):
+    python benchmarks/read_snapshot.py [--latency-ms 1500] [--storage-ms 15]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import read_snapshot  # noqa: E402
+
+UID = "u1"
+TODAY = date(2026, 10, 19)
+
+
+class SlowStorage(dict):
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+
+    def get(self, key):
+        time.sleep(self.latency)
+        return super().get(key)
+
+    def set(self, key, value):
+        time.sleep(self.latency)
+        self[key] = value
+
+    def remove(self, key):
+        self.pop(key, None)
+
+
+class FakePage:
+    def __init__(self, storage_latency: float):
+        self.client_storage = SlowStorage(storage_latency)
+
+
+def day(i: int) -> str:
+    return (TODAY - timedelta(days=i)).isoformat()
+
+
+# ---------- datos del "servidor" ----------
+def server_notes(day_key: str) -> list:
+    return [
+        {"id": f"n{i}", "title": f"Nota {i}", "content": "Hoy me sentí " + "bastante tranquila " * 40,
+         "createdKey": day_key, "updatedKey": day_key}
+        for i in range(6)
+    ]
+
+
+def server_recommendations() -> dict:
+    history = [{"date": day(i), "text": "Respira profundo y sal a caminar. " * 25} for i in range(60)]
+    return {"today": history[0]["text"], "history": history}
+
+
+def server_today() -> dict:
+    return {"dateKey": TODAY.isoformat(), "diagnosticId": "d1", "diagnosis": "estable", "score": 4,
+            "phrase": "Cada paso cuenta.", "phraseStatus": "ready"}
+
+
+def server_stats() -> dict:
+    notes_daily = {day(i): i % 4 for i in range(60)}
+    diags = [{"date": day(i // 2), "mood": ["feliz", "bien", "triste"][i % 3]} for i in range(150)]
+    return {"notesDaily": notes_daily, "diagnostics": diags}
+
+
+def stats_to_cache(raw: dict) -> dict:
+    return read_snapshot.compact_stats(raw["notesDaily"], raw["diagnostics"])
+
+
+# (sección, consultas, fetch, to_cache, from_cache)
+VIEWS = {
+    "Notas": ("notes", 1, lambda: server_notes(TODAY.isoformat()),
+              lambda notes: read_snapshot.merge_notes([], TODAY.isoformat(), notes),
+              lambda cached: [n for n in cached if n["updatedKey"] == TODAY.isoformat()] or None),
+    "Recomendaciones": ("recommendations", 2, server_recommendations,
+                        lambda d: read_snapshot.compact_recommendations(d["history"]),
+                        lambda cached: {"today": cached[0]["text"], "history": cached}),
+    "Home": ("today", 1, server_today, read_snapshot.compact_today, None),
+    "Estadísticas": ("stats", 2, server_stats, stats_to_cache, None),
+}
+
+
+async def open_view(page, name: str, latency: float, offline: bool) -> tuple[float | None, bool, str]:
+    """(ms hasta la primera pintura o None, llegó lo del servidor, qué quedó en pantalla)."""
+    section, queries, fetch, to_cache, from_cache = VIEWS[name]
+    t0 = time.perf_counter()
+    first = {}
+
+    def paint(value, stale):
+        first.setdefault("t", time.perf_counter() - t0)
+        first["what"] = "snapshot" if stale else "servidor"
+
+    def slow_fetch():
+        time.sleep(latency * queries)
+        if offline:
+            raise ConnectionError("backend caído (simulado)")
+        return fetch()
+
+    try:
+        fresh = await read_snapshot.cached_then_fresh(page, UID, section, paint, slow_fetch, to_cache, from_cache)
+    except ConnectionError:
+        return None, False, "error"
+    return first["t"] * 1000, fresh, first["what"]
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--latency-ms", type=float, default=1500, help="por consulta a Firestore")
+    ap.add_argument("--storage-ms", type=float, default=15, help="por llamada a client_storage")
+    args = ap.parse_args()
+    latency = args.latency_ms / 1000
+
+    page = FakePage(args.storage_ms / 1000)
+    print(f"backend {args.latency_ms:.0f} ms/consulta, client_storage {args.storage_ms:.0f} ms/llamada")
+    print(f"{'vista':16s} {'sin snapshot':>13s} {'con snapshot':>13s} {'backend caído':>16s}")
+    for name in VIEWS:
+        cold, _, _ = asyncio.run(open_view(page, name, latency, offline=False))
+        warm, fresh, _ = asyncio.run(open_view(page, name, latency, offline=False))
+        down, _, shown = asyncio.run(open_view(page, name, latency, offline=True))
+        assert fresh and warm < cold and shown == "snapshot"
+        print(f"{name:16s} {cold:10.0f} ms {warm:10.0f} ms   {shown} ({down:.0f} ms)")
+
+    fresh_page = FakePage(0)
+    down, _, shown = asyncio.run(open_view(fresh_page, "Notas", latency, offline=True))
+    print(f"backend caído sin snapshot: {shown}")
+
+    raw = page.client_storage[read_snapshot.KEY_PREFIX + UID]
+    print(f"snapshot: {len(raw.encode('utf-8')) / 1024:.1f} KB (tope {read_snapshot.MAX_BYTES / 1024:.0f} KB)")
+
+    # Las gráficas pintan todo lo leído; solo la copia del snapshot va compacta y
+    # recortada (encode no debe tocar lo que se pinta)
+    painted = []
+    small = FakePage(0)
+    read_snapshot.MAX_BYTES, max_bytes = 2048, read_snapshot.MAX_BYTES
+    try:
+        asyncio.run(read_snapshot.cached_then_fresh(
+            small, UID, "stats", lambda v, stale: painted.append(v), server_stats, stats_to_cache))
+    finally:
+        read_snapshot.MAX_BYTES = max_bytes
+    cached = read_snapshot.get(small, UID, "stats")
+    shown = painted[-1]
+    assert len(shown["diagnostics"]) == 150 and len(shown["notesDaily"]) == 60
+    assert len(cached["diagnostics"]) + len(cached["notesDaily"]) < 150 + 60
+    print(f"Estadísticas: pintados {len(shown['diagnostics'])} diagnósticos y {len(shown['notesDaily'])} días; "
+          f"snapshot {len(cached['diagnostics'])} y {len(cached['notesDaily'])}")
+
+    # Tope de tamaño: 200 notas largas tienen que caber recortando
+    big = FakePage(0)
+    notes = [{"id": f"n{i}", "title": "t", "content": "x" * 4000, "createdKey": day(i % 30), "updatedKey": day(i % 30)}
+             for i in range(200)]
+    read_snapshot.put(big, UID, "notes", [read_snapshot.compact_note(n) for n in notes])
+    read_snapshot.put(big, UID, "stats", stats_to_cache(server_stats()))
+    stored = big.client_storage[read_snapshot.KEY_PREFIX + UID]
+    kept = len(read_snapshot.get(big, UID, "notes"))
+    assert len(stored.encode("utf-8")) <= read_snapshot.MAX_BYTES and kept > 0
+    print(f"tope: 200 notas de 4000 caracteres -> {kept} guardadas, {len(stored) / 1024:.1f} KB")
+
+    # Otra versión de esquema = se ignora
+    snap = json.loads(stored)
+    snap["v"] = read_snapshot.SCHEMA_VERSION + 1
+    big.client_storage.set(read_snapshot.KEY_PREFIX + UID, json.dumps(snap))
+    assert read_snapshot.get(big, UID, "notes") is None
+    print("versión de esquema distinta: snapshot descartado")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+# benchmarks/recommendation_pregen.py
+"""
+services.recommendation_pregen con Firestore y Gemini falsos (tiempos escalados
+por --scale): rendimiento de la pasada según el número de hilos, respeto del
+límite de llamadas por minuto, tasa de omisión cuando nada cambió o cambió poco,
+y qué tan seguido el botón "Generar" encuentra la recomendación ya lista.
+
+Uso (desde la raíz del repo):
+    python benchmarks/recommendation_pregen.py [--users 200] [--scale 0.02]
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import recommendation_pregen as pregen  # noqa: E402
+
+DATE = "2026-10-19"
+BOUNDS = ("inicio", "fin")  # el Firestore falso no filtra por fecha
+
+
+class FakeFirebase:
+    def __init__(self, users: int, read_s: float, rng: random.Random):
+        self.read_s = read_s
+        self.reads = 0
+        self.writes = 0
+        self.profiles, self.notes, self.diagnostics, self.recommendations = {}, {}, {}, {}
+        for i in range(users):
+            uid = f"u{i:04d}"
+            self.profiles[uid] = {"username": f"user{i}"}
+            active = rng.random() < 0.85
+            self.notes[uid] = [self._note(uid, n) for n in range(rng.randint(0, 4) if active else 0)]
+            self.diagnostics[uid] = [
+                {"id": f"{uid}-d{n}", "diagnosis": "Ánimo estable", "mood": 3, "emotions": ["calma"], "dayTags": []}
+                for n in range(rng.randint(0, 2) if active else 0)
+            ]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _note(uid, n):
+        return {"id": f"{uid}-n{n}", "title": f"nota {n}", "content": "hoy fue un día tranquilo " * 5}
+
+    def _read(self):
+        with self._lock:
+            self.reads += 1
+        time.sleep(self.read_s)
+
+    def active_user_ids_between(self, start_utc, end_utc, limit=5000):
+        self._read()
+        uids = sorted(self.profiles)  # incluye inactivos: la pasada debe omitirlos
+        return uids[:limit], len(uids) > limit
+
+    def list_notes_between(self, uid, start_utc, end_utc, limit=30):
+        self._read()
+        return [dict(n) for n in self.notes[uid][:limit]]
+
+    def list_diagnostics_between(self, uid, start_utc, end_utc, limit=3):
+        self._read()
+        return [dict(d) for d in self.diagnostics[uid][:limit]]
+
+    def get_user_profile(self, uid):
+        self._read()
+        return dict(self.profiles[uid])
+
+    def get_recommendation_for_date(self, uid, date_key):
+        self._read()
+        rec = self.recommendations.get((uid, date_key))
+        return dict(rec) if rec else None
+
+    def upsert_recommendation_for_date(self, uid, date_key, text, meta=None):
+        self._read()
+        with self._lock:
+            self.writes += 1
+            self.recommendations[(uid, date_key)] = {"text": text, "meta": meta or {}}
+
+
+class FakeGemini:
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+        self.stamps = []
+        self._lock = threading.Lock()
+
+    def generate_professional_recommendation(self, notes, diags, name, *_):
+        with self._lock:
+            self.stamps.append(time.monotonic())
+        time.sleep(self.latency_s)
+        return f"Hola, soy la asistente de Mindful, {name}."
+
+
+def max_per_minute(stamps: list[float], minute: float) -> int:
+    stamps = sorted(stamps)
+    best, lo = 0, 0
+    for hi, t in enumerate(stamps):
+        while t - stamps[lo] >= minute:
+            lo += 1
+        best = max(best, hi - lo + 1)
+    return best
+
+
+def button_hits(fb: FakeFirebase) -> tuple[int, int]:
+    """Lo que hace RecommendationsView.produce al presionar "Generar", sin latencias."""
+    hits = active = 0
+    for uid in fb.profiles:
+        notes, diags = fb.notes[uid], fb.diagnostics[uid]
+        if not notes and not diags:
+            continue
+        active += 1
+        digest = pregen.inputs_hash(notes, diags, pregen.display_name_of(fb.profiles[uid]))
+        hits += pregen.is_current(fb.recommendations.get((uid, DATE)), digest)
+    return hits, active
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--users", type=int, default=200)
+    ap.add_argument("--scale", type=float, default=0.02, help="1 = segundos reales")
+    ap.add_argument("--read-ms", type=float, default=60)
+    ap.add_argument("--gemini-ms", type=float, default=6_000)
+    ap.add_argument("--rpm", type=float, default=60)
+    ap.add_argument("--seed", type=int, default=11)
+    args = ap.parse_args()
+    scale = args.scale
+    read_s, gemini_s = args.read_ms / 1000 * scale, args.gemini_ms / 1000 * scale
+
+    def run(fb, gem, workers, rpm=10_000):
+        return pregen.run_batch(fb, gem, DATE, None, workers, rpm / scale, BOUNDS)
+
+    print(f"{args.users} usuarios, lectura {args.read_ms:.0f} ms, Gemini {args.gemini_ms:.0f} ms")
+    # --- rendimiento según hilos (sin límite de RPM) ---
+    for workers in (1, 4, 16):
+        fb, gem = FakeFirebase(args.users, read_s, random.Random(args.seed)), FakeGemini(gemini_s)
+        r = run(fb, gem, workers)
+        print(f"  {workers:2d} hilos: {r['users'] / (r['seconds'] / scale):5.2f} usuarios/s, "
+              f"{r['generated']} generadas, {r['empty']} sin datos")
+
+    # --- límite global de RPM ---
+    fb, gem = FakeFirebase(args.users, read_s, random.Random(args.seed)), FakeGemini(gemini_s)
+    first = run(fb, gem, 16, args.rpm)
+    peak = max_per_minute(gem.stamps, 60 * scale)
+    print(f"  16 hilos, límite {args.rpm:.0f}/min: pico observado {peak} llamadas en un minuto, "
+          f"{first['generated'] / (first['seconds'] / scale) * 60:.0f}/min en promedio")
+    assert peak <= args.rpm + 1
+
+    hits, active = button_hits(fb)
+    print(f"  botón Generar después de la pasada: {hits}/{active} ya listas (sin Gemini ni escritura)")
+    assert hits == active
+
+    # --- nada cambió: todo se omite ---
+    calls = len(gem.stamps)
+    second = run(fb, gem, 16, args.rpm)
+    print(f"  segunda pasada sin cambios: omitidos {second['skipRate']:.0%}, llamadas a Gemini {len(gem.stamps) - calls}")
+    assert second["generated"] == 0 and len(gem.stamps) == calls
+
+    # --- 10 % de los activos escribe otra nota ---
+    rng = random.Random(args.seed + 1)
+    changed = [u for u in fb.profiles if fb.notes[u] or fb.diagnostics[u]]
+    changed = rng.sample(changed, max(1, len(changed) // 10))
+    for uid in changed:
+        fb.notes[uid].append(fb._note(uid, len(fb.notes[uid])))
+    hits, active = button_hits(fb)
+    third = run(fb, gem, 16, args.rpm)
+    print(f"  {len(changed)} usuarios con una nota nueva: antes de la pasada {hits}/{active} listas; "
+          f"la pasada regenera {third['generated']}, omite {third['skipRate']:.0%}")
+    assert third["generated"] == len(changed)
+    assert button_hits(fb)[0] == button_hits(fb)[1]
+
+    # --- más activos que el tope: el reporte lo dice ---
+    limit, pregen.ACTIVE_USERS_LIMIT = pregen.ACTIVE_USERS_LIMIT, args.users // 2
+    try:
+        capped = run(FakeFirebase(args.users, 0, random.Random(args.seed)), FakeGemini(0), 16)
+    finally:
+        pregen.ACTIVE_USERS_LIMIT = limit
+    print(f"  tope de {args.users // 2} usuarios: {capped['users']} en la pasada, truncated={capped['truncated']}")
+    assert capped["truncated"] and capped["users"] == args.users // 2
+    assert not third["truncated"]
+
+
+if __name__ == "__main__":
+    main()
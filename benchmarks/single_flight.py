@@ -0,0 +1,156 @@
+# benchmarks/single_flight.py
+"""
+services.single_flight: cuántas llamadas se ahorran en los casos de la app, con
+Firestore/Gemini falsos (tiempos escalados por --scale).
+
+  1. refresh de Home presionado --clicks veces seguidas (lectura del perfil)
+  2. doble clic en "Generar recomendación": Gemini + upsert_recommendation_for_date
+  3. 50 hilos con la misma clave: una ejecución, el error llega a todos y cada
+     quien recibe su propia copia del resultado
+
+Uso (desde la raíz del repo):
+    python benchmarks/single_flight.py [--clicks 5] [--scale 0.1]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import single_flight  # noqa: E402
+from services.single_flight import SingleFlight, shared  # noqa: E402
+
+UID = "u1"
+
+
+class FakeFirebase:
+    def __init__(self, read_s: float):
+        self.read_s = read_s
+        self.reads = 0
+        self.writes = 0
+
+    def _get_user_profile(self, uid):
+        self.reads += 1
+        time.sleep(self.read_s)
+        return {"today": {"dateKey": "2026-10-19", "phrase": "hola"}}
+
+    get_user_profile = shared("get_user_profile")(_get_user_profile)
+
+    def upsert_recommendation_for_date(self, uid, dkey, text, meta):
+        self.writes += 1
+        time.sleep(self.read_s)
+
+
+def clicks(n: int, gap: float, target):
+    threads = []
+    for _ in range(n):
+        t = threading.Thread(target=target)
+        t.start()
+        threads.append(t)
+        time.sleep(gap)
+    for t in threads:
+        t.join()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clicks", type=int, default=5)
+    ap.add_argument("--scale", type=float, default=0.1, help="1 = segundos reales")
+    ap.add_argument("--read-ms", type=float, default=400)
+    ap.add_argument("--gemini-ms", type=float, default=6_000)
+    args = ap.parse_args()
+    scale = args.scale
+    read_s, gemini_s, gap = args.read_ms / 1000 * scale, args.gemini_ms / 1000 * scale, 0.15 * scale
+
+    # --- 1. refresh de Home ---
+    single_flight._flight = SingleFlight()
+    fb = FakeFirebase(read_s)
+    clicks(args.clicks, gap, lambda: fb._get_user_profile(UID))
+    before = fb.reads
+    fb = FakeFirebase(read_s)
+    clicks(args.clicks, gap, lambda: fb.get_user_profile(UID))
+    print(f"1. refresh de Home x{args.clicks} (clic cada 150 ms, lectura {args.read_ms:.0f} ms): "
+          f"{before} lecturas -> {fb.reads}")
+    assert fb.reads < before
+
+    # --- 2. doble clic en "Generar recomendación" ---
+    def run_generate(use_single_flight: bool) -> tuple[int, int]:
+        flight = SingleFlight()
+        fb = FakeFirebase(read_s)
+        gemini_calls = [0]
+
+        async def produce(dkey):
+            gemini_calls[0] += 1
+            await asyncio.sleep(gemini_s)
+            await asyncio.to_thread(fb.upsert_recommendation_for_date, UID, dkey, "texto", {})
+            return "saved", "texto", True
+
+        async def generate_today():
+            if use_single_flight:
+                return await flight.do_async(("recommendation:generate", UID, "2026-10-19"), produce, "2026-10-19")
+            return await produce("2026-10-19")
+
+        async def double_click():
+            first = asyncio.create_task(generate_today())
+            await asyncio.sleep(gap)
+            second = asyncio.create_task(generate_today())
+            results = await asyncio.gather(first, second)
+            assert results[0] == results[1]
+
+        asyncio.run(double_click())
+        return gemini_calls[0], fb.writes
+
+    plain, joined = run_generate(False), run_generate(True)
+    print(f"2. doble clic en Generar: Gemini {plain[0]} -> {joined[0]}, escrituras {plain[1]} -> {joined[1]}")
+    assert joined == (1, 1)
+
+    # --- 3. 50 hilos, misma clave ---
+    flight = SingleFlight()
+    executed = [0]
+    barrier = threading.Barrier(50)
+    results, errors = [], []
+
+    def slow_list():
+        executed[0] += 1
+        time.sleep(0.2)
+        return [{"id": "n1", "title": "a"}]
+
+    def caller():
+        barrier.wait()
+        results.append(flight.do(("list_notes", UID, 100), slow_list))
+
+    threads = [threading.Thread(target=caller) for _ in range(50)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    results[0][0]["title"] = "modificado"
+    assert all(r[0]["title"] == "a" for r in results[1:]), "cada quien debe recibir su copia"
+
+    def failing():
+        time.sleep(0.1)
+        raise TimeoutError("deadline")
+
+    def failing_caller():
+        try:
+            flight.do(("get_note", UID, "n1"), failing)
+        except TimeoutError as ex:
+            errors.append(ex)
+
+    threads = [threading.Thread(target=failing_caller) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    counters = flight.counters()
+    print(f"3. 50 hilos, misma lectura: {executed[0]} ejecución; error compartido por {len(errors)}/10; "
+          f"contadores {counters}")
+    assert executed[0] == 1 and len(errors) == 10
+    assert counters["list_notes"] == {"calls": 50, "executed": 1, "collapsed": 49}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# benchmarks/splash_messages.py
+"""
+Cuenta los mensajes servidor -> cliente por segundo de una sesión parada en el splash.
+
+Cada page.update() con cambios es un mensaje por websocket. Se simula un backend
+lento (la precarga tarda --idle segundos) para medir el splash "en reposo".
+Con el parpadeo anterior (page.update() cada 0.42 s) daban ~2.4 msg/s.
+
+Uso (desde la raíz del repo, con flet instalado):
+    python benchmarks/splash_messages.py [--idle 5] [--sessions 50]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class FakeSession(dict):
+    def set(self, k, v):
+        self[k] = v
+
+    def remove(self, k):
+        self.pop(k, None)
+
+
+class FakePage:
+    """Lo mínimo de ft.Page que usa SplashView, contando updates."""
+
+    def __init__(self):
+        self.width, self.height = 1280, 800
+        self.on_resized = None
+        self.session = FakeSession()
+        self.client_storage = FakeSession()
+        self.route = "/splash"
+        self.updates = 0
+        self.navigated_to = None
+        self.tasks = []
+
+    def update(self, *controls):
+        self.updates += 1
+
+    def run_task(self, fn, *args):
+        self.tasks.append(asyncio.get_running_loop().create_task(fn(*args)))
+
+    def go(self, route):
+        self.navigated_to = route
+
+
+async def run(idle: float, sessions: int):
+    os.environ["SPLASH_MAX_WAIT"] = str(idle + 1)
+    import pages.splash_view as splash
+
+    async def slow_prefetch(page):
+        await asyncio.sleep(idle)
+        return {"uid": None}
+
+    splash.prefetch_session = slow_prefetch
+
+    pages = [FakePage() for _ in range(sessions)]
+    started = time.perf_counter()
+    for p in pages:
+        splash.SplashView(p)
+    await asyncio.gather(*[t for p in pages for t in p.tasks])
+    elapsed = time.perf_counter() - started
+
+    total = sum(p.updates for p in pages)
+    print(f"sesiones: {sessions}, splash visible: {elapsed:.2f} s")
+    print(f"updates por sesión: {total / sessions:.1f}")
+    print(f"mensajes/s por sesión en reposo: {total / sessions / elapsed:.2f}")
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--idle", type=float, default=5.0)
+    ap.add_argument("--sessions", type=int, default=50)
+    args = ap.parse_args()
+    asyncio.run(run(args.idle, args.sessions))
@@ -0,0 +1,183 @@
+# benchmarks/update_scheduler.py
+"""
+Mensajes de actualización y bytes por flujo con page.update() en cada paso (como
+antes) vs. ui_helpers.schedule_update (un flush por tick, dirigido al subárbol).
+
+Cada flujo reproduce los pasos de su vista sobre una página de Flet real con una
+conexión falsa que serializa cada lote como lo hace el servidor de sockets de
+Flet (ClientMessage PAGE_CONTROLS_BATCH en JSON): lo medido es lo que viajaría
+por el websocket. Las esperas de red se simulan con --net-ms. Un update sin
+cambios no manda nada; en flet 0.28 `page.snack_bar` ya no es propiedad de Page,
+así que el toast de las vistas solo cuenta por el update completo que dispara.
+
+  diagnóstico  set_loading(True) -> guardar -> toast + set_loading(False)
+  notas        set_status("Cargando…") -> leer -> lista del día + set_status("")
+  Cuéntame     add_message + deshabilitar entrada -> Gemini -> respuesta + habilitar
+
+Uso (desde la raíz del repo, con flet instalado):
+    python benchmarks/update_scheduler.py [--net-ms 40]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import flet as ft  # noqa: E402
+from flet.core.local_connection import LocalConnection  # noqa: E402
+from flet.core.protocol import (  # noqa: E402
+    ClientActions,
+    ClientMessage,
+    CommandEncoder,
+    PageCommandsBatchResponsePayload,
+)
+
+from ui_helpers import UPDATE_TICK, get_scheduler, schedule_update  # noqa: E402
+
+
+class WireConnection(LocalConnection):
+    """Como FletSocketServer.send_commands, pero cuenta en lugar de enviar."""
+
+    def __init__(self):
+        super().__init__()
+        self.messages = 0
+        self.bytes = 0
+
+    def send_commands(self, session_id, commands):
+        results, messages = [], []
+        for command in commands:
+            result, message = self._process_command(command)
+            if command.name in ("add", "get"):
+                results.append(result)
+            if message:
+                messages.append(message)
+        if messages:
+            wire = json.dumps(ClientMessage(ClientActions.PAGE_CONTROLS_BATCH, messages),
+                              cls=CommandEncoder, separators=(",", ":"))
+            self.messages += 1
+            self.bytes += len(wire.encode("utf-8"))
+        return PageCommandsBatchResponsePayload(results=results, error="")
+
+
+def new_page(*controls):
+    conn = WireConnection()
+    page = ft.Page(conn, "bench", asyncio.get_running_loop())
+    page.add(ft.Column([ft.Text("Mindful+", size=22), ft.Text("Encabezado de la vista")]), *controls)
+    conn.messages = conn.bytes = 0  # solo cuenta lo que hace el flujo
+    return page, conn
+
+
+def toast(page, update, msg):
+    page.snack_bar = ft.SnackBar(ft.Text(msg), bgcolor="#2ECC71")
+    page.snack_bar.open = True
+    update(page)
+
+
+# ---------- flujos (update(page, *controles) = cómo se manda cada paso) ----------
+async def diagnostic_flow(update, net):
+    emotions = [ft.Checkbox(label=f"emoción {i}") for i in range(12)]
+    tags = [ft.Checkbox(label=f"etiqueta {i}") for i in range(12)]
+    mood = ft.RadioGroup(content=ft.Row([ft.Radio(value=str(i), label=str(i)) for i in range(1, 6)]), value="3")
+    note = ft.TextField(multiline=True)
+    spinner = ft.ProgressRing(visible=False)
+    status = ft.Text("")
+    body = ft.Column([ft.Row(emotions, wrap=True), ft.Row(tags, wrap=True), mood, note,
+                      ft.Row([spinner, status])])
+    page, conn = new_page(body)
+
+    def set_loading(is_loading, msg=""):
+        for cb in emotions + tags:
+            cb.disabled = is_loading
+        mood.disabled = note.disabled = is_loading
+        spinner.visible = is_loading
+        status.value = msg
+        update(page, body)
+
+    set_loading(True, "Guardando…")
+    await asyncio.sleep(net)  # fb.add_diagnostic
+    toast(page, update, "Diagnóstico guardado ✅")
+    set_loading(False, "¡Listo!")
+    return page, conn
+
+
+async def notes_flow(update, net):
+    status = ft.Text("")
+    list_col = ft.Column()
+    page, conn = new_page(status, list_col)
+
+    def set_status(txt=""):
+        status.value = txt
+        update(page, status)
+
+    set_status("Cargando notas…")
+    await asyncio.sleep(net)  # consulta del día
+    list_col.controls = [
+        ft.Container(ft.Column([ft.Text(f"Nota {i}", weight=ft.FontWeight.W_600), ft.Text("texto " * 40)]),
+                     padding=14, bgcolor="#EDE7FF", border_radius=16)
+        for i in range(6)
+    ]
+    update(page, list_col)
+    set_status("")
+    return page, conn
+
+
+async def tellme_flow(update, net):
+    chat = ft.ListView(spacing=12, padding=12, auto_scroll=True)
+    input_field = ft.TextField(hint_text="Escribe aquí…")
+    send_btn = ft.IconButton(icon=ft.Icons.SEND_ROUNDED)
+    typing_row = ft.Row([ft.ProgressRing(width=14, height=14), ft.Text("escribiendo…")])
+    page, conn = new_page(chat, ft.Row([input_field, send_btn]))
+
+    def add_message(text, is_user=False):
+        bubble = ft.Container(ft.Text(text, selectable=True), bgcolor="#5B4BDB" if is_user else "#EDE7FF",
+                              padding=ft.padding.symmetric(horizontal=14, vertical=10), border_radius=20)
+        chat.controls.append(ft.Row([bubble]))
+        update(page, chat)
+
+    add_message("Hoy me sentí un poco ansiosa en el trabajo", is_user=True)
+    input_field.value = ""
+    input_field.disabled = send_btn.disabled = True
+    chat.controls.append(typing_row)
+    update(page, chat, input_field, send_btn)
+    await asyncio.sleep(net)  # Gemini
+    chat.controls.remove(typing_row)
+    add_message("Gracias por contármelo. ¿Qué fue lo que más te inquietó? " * 3)
+    input_field.disabled = send_btn.disabled = False
+    update(page, chat, input_field, send_btn)
+    return page, conn
+
+
+FLOWS = {"diagnóstico": diagnostic_flow, "notas del día": notes_flow, "Cuéntame": tellme_flow}
+
+
+def before(page, *_controls):
+    page.update()
+
+
+async def run(flow, update, net):
+    page, conn = await flow(update, net)
+    await asyncio.sleep(UPDATE_TICK * 3)  # deja salir el último flush
+    return conn.messages, conn.bytes, page
+
+
+async def main_async(net):
+    print(f"{'flujo':<16}{'antes msgs':>11}{'antes B':>9}{'después msgs':>14}{'después B':>11}")
+    for name, flow in FLOWS.items():
+        n0, b0, _ = await run(flow, before, net)
+        n1, b1, page = await run(flow, schedule_update, net)
+        sched = get_scheduler(page)
+        print(f"{name:<16}{n0:>11}{b0:>9}{n1:>14}{b1:>11}   ({sched.requested} pedidos -> {sched.flushed} flushes)")
+        assert n1 <= n0 and sched.flushed == n1
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--net-ms", type=float, default=40, help="espera simulada por viaje a la red")
+    args = ap.parse_args()
+    asyncio.run(main_async(args.net_ms / 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# benchmarks/web_bundle.py
+"""
+Tamaño y tiempo hasta el primer frame (estimado) del bundle del cliente Pyodide:
+  - dist/app.tar.gz actual (todo el repo, .pyc de 3.13 que Pyodide no puede usar)
+  - tools/web_bundle.py con fuente (.py)
+  - tools/web_bundle.py con bytecode (.pyc sin fuente, compilado con este intérprete)
+
+TTFF estimado = descarga (tamaño / ancho de banda)
+              + desempaquetar el tar.gz
+              + compilar los .py (o deserializar los .pyc) de los módulos del arranque
+El trabajo de CPU se mide aquí y se multiplica por --wasm-factor (Pyodide corre
+varias veces más lento que CPython nativo). No incluye bajar Pyodide ni flet.
+
+Uso (desde la raíz del repo):
+    python benchmarks/web_bundle.py [--mbps 10] [--wasm-factor 3]
+"""
+import argparse
+import io
+import marshal
+import os
+import sys
+import tarfile
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tools import web_bundle  # noqa: E402
+
+# Lo que main.py necesita para pintar /splash
+STARTUP = ("main", "routes", "theme", "ui_helpers", "pages/splash_view")
+
+
+def cpu_cost(path: str) -> tuple[float, float, int]:
+    """(s desempaquetar, s compilar/cargar módulos del arranque, miembros)."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    t0 = time.perf_counter()
+    with tarfile.open(fileobj=io.BytesIO(raw), mode="r:gz") as tar:
+        members = {m.name.lstrip("/"): tar.extractfile(m).read() for m in tar.getmembers() if m.isfile()}
+    unpack = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for name in STARTUP:
+        if name + ".pyc" in members:
+            marshal.loads(members[name + ".pyc"][16:])  # cabecera de 16 bytes
+        elif name + ".py" in members:
+            compile(members[name + ".py"], name + ".py", "exec")
+    load = time.perf_counter() - t0
+    return unpack, load, len(members)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mbps", type=float, default=10, help="ancho de banda del cliente")
+    ap.add_argument("--wasm-factor", type=float, default=3)
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        variants = [("actual", os.path.join(ROOT, "dist", "app.tar.gz"))]
+        src = os.path.join(tmp, "src.tar.gz")
+        web_bundle.build(src, verbose=False)
+        variants.append(("slim .py", src))
+        pyc = os.path.join(tmp, "pyc.tar.gz")
+        web_bundle.build(pyc, bytecode=True, python=sys.executable, verbose=False)
+        variants.append(("slim .pyc", pyc))
+
+        print(f"{args.mbps:.0f} Mbps, CPU x{args.wasm_factor:.0f} (wasm), módulos de arranque: {', '.join(STARTUP)}")
+        for label, path in variants:
+            if not os.path.exists(path):
+                print(f"{label:10s} (no existe)")
+                continue
+            size = os.path.getsize(path)
+            runs = [cpu_cost(path) for _ in range(args.repeat)]
+            unpack = min(r[0] for r in runs)
+            load = min(r[1] for r in runs)
+            download = size * 8 / (args.mbps * 1_000_000)
+            ttff = download + (unpack + load) * args.wasm_factor
+            print(
+                f"{label:10s} {size / 1024:7.1f} KB  {runs[0][2]:3d} archivos  descarga {download * 1000:6.1f} ms  "
+                f"unpack {unpack * 1000:5.1f} ms  compilar/cargar {load * 1000:5.1f} ms  TTFF ~{ttff * 1000:6.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
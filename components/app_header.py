@@ -1,14 +1,10 @@
 # components/app_header.py
-import os
 import uuid
-import time
-import threading
-import requests
 import flet as ft
 from theme import INK, BG
-
-# URL del microservicio (Render/local). Cambia si lo tienes en otro dominio.
-UPLOADER_URL = os.getenv("UPLOADER_URL", "https://mindful-imagenes.onrender.com")
+from ui_helpers import schedule_update
+from services.poll_coordinator import UPLOADER_URL, get_poll_coordinator
+from services import read_snapshot
 
 
 def AppHeader(page: ft.Page, active_route: str):
@@ -40,7 +36,7 @@ def AppHeader(page: ft.Page, active_route: str):
     def toast(msg: str):
         page.snack_bar = ft.SnackBar(ft.Text(msg))
         page.snack_bar.open = True
-        page.update()
+        schedule_update(page)
 
     # ---------- botón: activar notificaciones ----------
     def _push_button():
@@ -65,29 +61,20 @@ def AppHeader(page: ft.Page, active_route: str):
                 page.launch_url(f"{UPLOADER_URL}/notify?session={session_id}&uid={uid}&role={role}")
                 toast("Abre la pestaña y acepta notificaciones. Estoy esperando confirmación…")
 
-                def poll():
-                    for _ in range(60):  # 60s
-                        try:
-                            r = requests.get(f"{UPLOADER_URL}/notify/poll", params={"session": session_id}, timeout=5)
-                            if r.ok and r.json().get("ready"):
-                                def ok():
-                                    toast("Notificaciones activadas ✅")
-                                try:
-                                    page.invoke_later(ok)
-                                except Exception:
-                                    ok()
-                                return
-                        except Exception:
-                            pass
-                        time.sleep(1)
-                    def ko():
-                        toast("No se confirmó la activación (tiempo agotado).")
+                def on_page(fn):
+                    # El coordinador llama desde su hilo: regreso al de la página
                     try:
-                        page.invoke_later(ko)
+                        page.invoke_later(fn)
                     except Exception:
-                        ko()
-
-                threading.Thread(target=poll, daemon=True).start()
+                        fn()
+
+                # Un solo poller por proceso consulta todas las sesiones pendientes juntas
+                get_poll_coordinator().watch(
+                    session_id,
+                    on_ready=lambda: on_page(lambda: toast("Notificaciones activadas ✅")),
+                    on_timeout=lambda: on_page(lambda: toast("No se confirmó la activación (tiempo agotado).")),
+                    ttl=60,
+                )
             except Exception as ex:
                 toast(f"No pude iniciar la activación: {ex}")
 
@@ -132,6 +119,10 @@ def AppHeader(page: ft.Page, active_route: str):
             close_menu()
 
     def logout(_):
+        user = page.session.get("user")
+        if isinstance(user, dict) and user.get("uid"):
+            # Lo leído por este usuario no se queda en el dispositivo
+            read_snapshot.clear(page, user["uid"])
         page.session.clear()
         page.client_storage.remove("user")
         close_menu()
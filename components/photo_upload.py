@@ -0,0 +1,82 @@
+# components/photo_upload.py
+import os
+import uuid
+import flet as ft
+
+_PICKER_KEY = "__mindful_photo_picker__"
+
+
+def _get_picker(page: ft.Page) -> ft.FilePicker:
+    """Un solo FilePicker por sesión (se reutiliza entre vistas)."""
+    picker = getattr(page, _PICKER_KEY, None)
+    if picker is None:
+        picker = ft.FilePicker()
+        setattr(page, _PICKER_KEY, picker)
+    _attach(page, picker)
+    return picker
+
+
+def _attach(page: ft.Page, picker: ft.FilePicker):
+    # Otras vistas hacen page.overlay.clear(): si se lo llevaron, se vuelve a montar
+    if picker not in page.overlay:
+        page.overlay.append(picker)
+        page.update()
+
+
+def photo_upload_button(page: ft.Page, text: str, on_uploaded, on_error=None, on_start=None, icon=None):
+    """
+    Botón que elige una imagen, la sube al endpoint de uploads de Flet y la
+    procesa (validar, quitar EXIF, redimensionar) con services.photo_pipeline.
+    on_uploaded(url) se llama una sola vez, sin hilos de polling.
+    """
+    from services.photo_pipeline import UPLOAD_DIR, ingest_photo, PhotoRejected
+
+    state = {"name": None}
+
+    async def finish(path: str, remove_source: bool):
+        try:
+            url = await ingest_photo(path, remove_source=remove_source)
+        except PhotoRejected as ex:
+            if on_error:
+                on_error(str(ex))
+            return
+        except Exception as ex:
+            print(f"[PhotoUpload] {ex}")
+            if on_error:
+                on_error("No se pudo procesar la imagen.")
+            return
+        on_uploaded(url)
+
+    def on_result(e: ft.FilePickerResultEvent):
+        if not e.files:
+            return
+        f = e.files[0]
+        if on_start:
+            on_start()
+        if f.path:
+            # Escritorio: el archivo ya está en disco, no hay que subirlo
+            page.run_task(finish, f.path, False)
+            return
+        ext = os.path.splitext(f.name)[1].lower()[:8]
+        state["name"] = f"{uuid.uuid4().hex}{ext}"
+        _attach(page, picker)
+        picker.upload([ft.FilePickerUploadFile(f.name, upload_url=page.get_upload_url(state["name"], 600))])
+
+    def on_upload(e: ft.FilePickerUploadEvent):
+        if e.error:
+            if on_error:
+                on_error(f"Falló la subida: {e.error}")
+            return
+        if e.progress is not None and e.progress >= 1.0 and state["name"]:
+            name, state["name"] = state["name"], None
+            page.run_task(finish, os.path.join(UPLOAD_DIR, name), True)
+
+    def pick(_):
+        _attach(page, picker)
+        # La vista activa se queda con los callbacks del picker compartido
+        picker.on_result = on_result
+        picker.on_upload = on_upload
+        picker.pick_files(allow_multiple=False, file_type=ft.FilePickerFileType.IMAGE)
+
+    picker = _get_picker(page)
+    return ft.TextButton(text, icon=icon, on_click=pick)
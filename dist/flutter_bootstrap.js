@@ -15,7 +15,8 @@ _flutter.loader.load({
         renderer: webRenderer
     },
     serviceWorkerSettings: {
-        serviceWorkerVersion: "2601907023",
+        serviceWorkerVersion: "3854d63b729a2df3",
+        serviceWorkerUrl: "service_worker.js?v=3854d63b729a2df3",
     },
     onEntrypointLoaded: async function (engineInitializer) {
         loading.classList.add('main_done');
@@ -15,7 +15,7 @@ self.initPyodide = async function () {
     import micropip
     import os
     from pyodide.http import pyfetch
-    response = await pyfetch("app.tar.gz")
+    response = await pyfetch("app.ac32a1818b.tar.gz")
     await response.unpack_archive()
     if os.path.exists("requirements.txt"):
         with open("requirements.txt", "r") as f:
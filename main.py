@@ -1,23 +1,9 @@
 # main.py
 import flet as ft
-from services.sync_offline import sync_offline_actions
-from services import offline_queue
 import json
 from dotenv import load_dotenv
-from pages.splash_view import SplashView
-from pages.welcome_page import WelcomeView
-from pages.register_page import RegisterView
-from pages.login_page import LoginView
-from pages.home_page import HomeView
-from pages.diagnostic_page import DiagnosticView
-from pages.notes_page import NotesView
-from pages.note_editor_page import NoteEditorView
-from pages.recommendations_page import RecommendationsView
-from pages.tellme_page import TellMeView
-from pages.stats_page import StatsView
-from pages.pro_panel_page import ProPanelView
-from pages.pro_edit_profile_page import ProEditProfileView
-from pages.help_page import HelpView
+import routes
+from services.connectivity import get_connectivity, ONLINE
 
 
 load_dotenv()
@@ -47,47 +33,36 @@ def main(page: ft.Page):
             pass
 
 
+    connectivity = get_connectivity(page)
+
+    async def sync_pending():
+        # Import diferido: arrastra firebase_admin y no debe frenar el arranque.
+        from services.sync_offline import sync_offline_actions
+        await sync_offline_actions(page)
+
     async def on_connect(e):
         # Se llama cuando se reconecta el cliente web.
-        await sync_offline_actions(page)
+        connectivity.set_connected(True)
+        await sync_pending()
+
+    def on_disconnect(e):
+        connectivity.set_connected(False)
+
+    def on_connectivity_change(old, new):
+        # Volvió la red (sonda o llamada exitosa): subimos lo que quedó en la cola
+        if new == ONLINE and old != ONLINE:
+            page.run_task(sync_pending)
 
+    connectivity.on_change(on_connectivity_change)
     page.on_connect = on_connect
+    page.on_disconnect = on_disconnect
 
     def route_change(_):
         page.views.clear()
-        r = page.route or "/splash"
-
-        if r == "/splash":
-            page.views.append(SplashView(page))
-        elif r == "/":
-            page.views.append(WelcomeView(page))
-        elif r == "/register":
-            page.views.append(RegisterView(page))
-        elif r == "/login":
-            page.views.append(LoginView(page))
-        elif r == "/home":
-            page.views.append(HomeView(page))
-        elif r == "/diagnostic":
-            page.views.append(DiagnosticView(page))
-        elif r.startswith("/notes"):
-            page.views.append(NotesView(page))
-        elif r.startswith("/note_new") or r.startswith("/note_edit"):
-            page.views.append(NoteEditorView(page))
-        elif r.startswith("/recommendations"):
-            page.views.append(RecommendationsView(page))
-        elif r.startswith("/tellme"):
-            page.views.append(TellMeView(page))
-        elif r.startswith("/pro/edit"):
-            page.views.append(ProEditProfileView(page))
-        elif r.startswith("/pro"):
-            page.views.append(ProPanelView(page))
-        elif r.startswith("/help"):
-            page.views.append(HelpView(page))
-        elif r.startswith("/stats"):
-            page.views.append(StatsView(page))
-        else:
-            page.views.append(WelcomeView(page))
+        page.views.append(routes.build_view(page, page.route or "/splash"))
         page.update()
+        # Tras el primer frame, calentamos en segundo plano los módulos pesados
+        routes.preload_heavy_modules()
 
     def view_pop(_):
         page.views.pop()
@@ -99,5 +74,8 @@ def main(page: ft.Page):
     page.go("/splash")
 
 if __name__ == "__main__":
-    ft.app(target=main, assets_dir="assets")
+    from services.image_proxy import start_image_proxy
+    from services.photo_pipeline import UPLOAD_DIR
+    start_image_proxy()  # escritorio: miniaturas en loopback; en web las sirve asgi.py
+    ft.app(target=main, assets_dir="assets", upload_dir=UPLOAD_DIR)
 
@@ -7,14 +7,17 @@ from theme import BG, INK, MUTED, rounded_card, primary_button
 from services.firebase_service import FirebaseService
 from services.diagnostic_utils import EMOTIONS, DAY_TAGS, compute_score_and_diagnosis
 from services.gemini_service import GeminiService
-from services import offline_queue
-from ui_helpers import scroll_view, shell_header, two_col_grid
+from services import background_jobs, offline_queue
+from services.connectivity import get_connectivity
+from services.phrase_prefetch import get_phrase_prefetch
+from ui_helpers import scroll_view, shell_header, two_col_grid, schedule_update
 
 DEBUG = True
 
 def DiagnosticView(page: ft.Page):
     fb = FirebaseService()
     gem = GeminiService()
+    connectivity = get_connectivity(page)
 
     sess_user = page.session.get("user")
     if not isinstance(sess_user, dict) or not sess_user.get("uid"):
@@ -27,7 +30,7 @@ def DiagnosticView(page: ft.Page):
     def toast(msg: str, error: bool = False):
         page.snack_bar = ft.SnackBar(ft.Text(msg), bgcolor="#E5484D" if error else "#2ECC71")
         page.snack_bar.open = True
-        page.update()
+        schedule_update(page)
 
     header = shell_header("Diagnóstico diario", "Cuéntame cómo estás para acompañarte")
 
@@ -76,7 +79,41 @@ def DiagnosticView(page: ft.Page):
         note.disabled = is_loading
         spinner.visible = is_loading
         status.value = msg
-        page.update()
+        # Un solo diff del formulario, agrupado con el toast si llega en el mismo tick
+        schedule_update(page, body)
+
+    def read_form():
+        try:
+            sel_mood = int(mood_group.value or "3")
+        except Exception:
+            sel_mood = 3
+        sel_emotions = [cb.label for cb in emotions_boxes if cb.value]
+        sel_tags = [cb.label for cb in tags_boxes if cb.value]
+        sel_note = (note.value or "").strip()
+        sel_sleep = int(round(sleep.value))
+        return sel_mood, sel_emotions, sel_tags, sel_note, sel_sleep
+
+    def phrase_inputs(diagnosis, sel_emotions, sel_tags, sel_note) -> dict:
+        return {"diagnosis": diagnosis, "emotions": sel_emotions, "dayTags": sel_tags, "note": sel_note}
+
+    # --- Frase especulativa: se pide mientras el formulario está quieto ---
+    prefetch = get_phrase_prefetch(
+        page,
+        lambda i: gem.phrase_for_diagnostic(i["diagnosis"], i["emotions"], i["dayTags"], i["note"], 120),
+    )
+
+    def on_form_change(_):
+        if connectivity.is_offline:
+            return
+        sel_mood, sel_emotions, sel_tags, sel_note, sel_sleep = read_form()
+        _, diagnosis = compute_score_and_diagnosis(sel_mood, sel_emotions, sel_sleep)
+        prefetch.update(phrase_inputs(diagnosis, sel_emotions, sel_tags, sel_note))
+
+    mood_group.on_change = on_form_change
+    for cb in emotions_boxes + tags_boxes:
+        cb.on_change = on_form_change
+    note.on_change = on_form_change
+    sleep.on_change_end = on_form_change
 
     async def run_flow():
         try:
@@ -84,15 +121,7 @@ def DiagnosticView(page: ft.Page):
             log("Flow start")
 
             # --- Leer valores de la UI ---
-            try:
-                sel_mood = int(mood_group.value or "3")
-            except Exception:
-                sel_mood = 3
-
-            sel_emotions = [cb.label for cb in emotions_boxes if cb.value]
-            sel_tags = [cb.label for cb in tags_boxes if cb.value]
-            sel_note = (note.value or "").strip()
-            sel_sleep = int(round(sleep.value))
+            sel_mood, sel_emotions, sel_tags, sel_note, sel_sleep = read_form()
 
             log(f"Inputs -> mood={sel_mood}, emotions={sel_emotions}, tags={sel_tags}, note='{sel_note}', sleep={sel_sleep}")
 
@@ -112,71 +141,34 @@ def DiagnosticView(page: ft.Page):
             }
 
             # --- Paso 1: guardar diagnóstico en Firestore ---
+            # Si ya se sabe que no hay red, va directo a la cola; si no, el timeout
+            # lo decide el monitor de conectividad (corto si la red suele ir rápido)
+            # El id se genera aquí: si el intento expira pero sí se escribió, el
+            # create encolado escribe el mismo documento en lugar de duplicarlo
+            doc_id = fb.new_doc_id()
             try:
-                # Le ponemos un timeout para no quedarnos colgados 60s
-                doc_id = await asyncio.wait_for(
-                    asyncio.to_thread(fb.add_diagnostic, uid, payload),
-                    timeout=8.0,  # segundos, ajústalo si quieres
-                )
+                await connectivity.run(fb.add_diagnostic, uid, payload, doc_id, base_timeout=8.0)
                 log(f"Firestore OK -> doc_id={doc_id}")
 
-            except asyncio.TimeoutError as ex:
-                # Timeout -> lo tomamos como offline y encolamos
-                log(f"Firestore TIMEOUT (OFFLINE) -> {ex}")
-                offline_queue.queue_action(page, {
-                    "type": "diagnostic",
-                    "uid": uid,
-                    "payload": payload,
-                })
-                set_loading(False, "")
-                toast("Sin conexión: tu diagnóstico se guardó offline y se sincronizará después ✅")
-                page.go("/home")
-                return
-
             except Exception as ex:
-                # CUALQUIER otro error al guardar lo tratamos como offline
+                # CUALQUIER error al guardar lo tratamos como offline
                 log(f"Firestore OFFLINE/ERROR (queue) -> {ex}")
-                offline_queue.queue_action(page, {
-                    "type": "diagnostic",
-                    "uid": uid,
-                    "payload": payload,
-                })
+                offline_queue.enqueue(page, "diagnostic", "create", uid, doc_id, payload)
+                prefetch.cancel()
                 set_loading(False, "")
                 toast("Sin conexión: tu diagnóstico se guardó offline y se sincronizará después ✅")
                 page.go("/home")
                 return
 
 
-            # --- Paso 2: frase del día con Gemini (solo online, no se reintenta offline) ---
-            set_loading(True, "Generando frase del día…")
-            try:
-                phrase = await asyncio.to_thread(
-                    gem.phrase_for_diagnostic,
-                    diagnosis,
-                    sel_emotions,
-                    sel_tags,
-                    sel_note,
-                    120,
-                )
-                log(f"Gemini OK -> '{phrase}'")
-            except Exception as ex:
-                phrase = "Sigue adelante: cada paso cuenta."
-                log(f"Gemini ERROR -> {ex}")
-                toast(f"Gemini: {ex}", error=False)
-
-            # --- Paso 3: actualizar el diagnóstico con la frase ---
-            set_loading(True, "Actualizando…")
-            try:
-                await asyncio.to_thread(
-                    fb.update_diagnostic,
-                    uid,
-                    doc_id,
-                    {"phrase": phrase, "phraseChars": len(phrase), "model": "gemini-2.0-flash"},
-                )
-                log("Firestore update OK")
-            except Exception as ex:
-                log(f"Firestore update ERROR -> {ex}")
-                # El diagnóstico base ya está guardado; solo falló la actualización
+            # --- Paso 2: la frase del día se genera en segundo plano ---
+            # Gemini tarda varios segundos; el diagnóstico ya está guardado, así que
+            # se va a Home de inmediato y la frase llega por pubsub cuando esté lista.
+            # Si ya se pidió con estas mismas entradas, se reutiliza esa respuesta
+            inputs = phrase_inputs(diagnosis, sel_emotions, sel_tags, sel_note)
+            speculative = prefetch.take(inputs)
+            log(f"Frase especulativa -> {'reutilizada' if speculative else 'no'}")
+            background_jobs.submit_phrase(page, uid, doc_id, inputs, fb=fb, gem=gem, speculative=speculative)
 
             toast("Diagnóstico guardado ✅")
             set_loading(False, "¡Listo!")
@@ -9,6 +9,8 @@ from typing import Dict, List, Optional, Any
 from components.app_header import AppHeader
 from theme import BG, INK, MUTED, rounded_card, primary_button, ghost_button
 from services.firebase_service import FirebaseService
+from services.image_proxy import thumb_url
+from ui_helpers import schedule_update, flush_updates, KeyedList
 
 LEVEL_ABBR = {
     "Licenciatura": "Lic.",
@@ -147,7 +149,7 @@ def HelpView(page: ft.Page):
         opts = estados_map.get(sel, [])
         muni_dd.options = [ft.dropdown.Option(m) for m in opts]
         _force_rerender(muni_dd)
-        page.update()
+        schedule_update(page, muni_dd)
 
     def _clear_state(_=None):
         state_dd.value = None
@@ -247,6 +249,7 @@ def HelpView(page: ft.Page):
         d = doc.to_dict() or {}
         pro = d.get("professional") or {}
         pro["_username"] = d.get("username") or d.get("email")
+        pro["_uid"] = doc.id
         return pro
 
     def _apply_filters(data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -286,7 +289,7 @@ def HelpView(page: ft.Page):
             ft.Container(
                 width=92, height=92, border_radius=60, bgcolor="#EEE7FF",
                 clip_behavior=ft.ClipBehavior.ANTI_ALIAS,
-                content=ft.Image(src=photo, fit=ft.ImageFit.COVER),
+                content=ft.Image(src=thumb_url(photo, "detail"), fit=ft.ImageFit.COVER),
             )
             if photo else
             ft.Container(
@@ -366,7 +369,7 @@ def HelpView(page: ft.Page):
             ft.Container(
                 width=64, height=64, border_radius=40, bgcolor="#EEE7FF",
                 clip_behavior=ft.ClipBehavior.ANTI_ALIAS,
-                content=ft.Image(src=photo, fit=ft.ImageFit.COVER),
+                content=ft.Image(src=thumb_url(photo, "card"), fit=ft.ImageFit.COVER),
             )
             if photo else
             ft.Container(
@@ -445,12 +448,22 @@ def HelpView(page: ft.Page):
         # Click para ver detalle en dialog
         return ft.GestureDetector(content=base_card, on_tap=lambda e, p=pro: _open_detail(p))
 
+    # Tarjetas por uid del profesional: al cambiar filtros solo viajan altas y bajas
+    pros_list = KeyedList(
+        list_col,
+        key_fn=lambda p: p["_uid"],
+        build_fn=_pro_card,
+        signature_fn=lambda p: json.dumps(p, sort_keys=True, default=str),
+    )
+    loading_row = ft.Container(padding=12, content=ft.Row([ft.ProgressRing()], alignment=ft.MainAxisAlignment.CENTER))
+
     def _fetch_and_render(_=None):
-        list_col.controls.clear()
-        list_col.controls.append(
-            ft.Container(padding=12, content=ft.Row([ft.ProgressRing()], alignment=ft.MainAxisAlignment.CENTER))
-        )
-        page.update()
+        # El spinner va arriba sin tirar las tarjetas actuales (se reutilizan al reconciliar)
+        if loading_row not in list_col.controls:
+            list_col.controls.insert(0, loading_row)
+        # La consulta de abajo es bloqueante: el spinner debe salir antes
+        schedule_update(page, list_col)
+        flush_updates(page)
 
         try:
             q = fb.db.collection("users").where("professional.type", "==", "profesional")
@@ -467,28 +480,23 @@ def HelpView(page: ft.Page):
 
         pros = _apply_filters(pros)
 
-        list_col.controls.clear()
-        if not pros:
-            list_col.controls.append(
-                ft.Container(
-                    padding=20,
-                    border_radius=14,
-                    bgcolor="#F8F8FF",
-                    border=ft.border.all(1, "#ECEBFF"),
-                    content=ft.Row(
-                        [
-                            ft.Icon(ft.Icons.SEARCH_OFF, color="#7D7AA8"),
-                            ft.Text("No encontramos resultados con esos filtros.", color="#7D7AA8"),
-                        ],
-                        spacing=8,
-                    ),
-                )
-            )
-        else:
-            for p in pros:
-                list_col.controls.append(_pro_card(p))
-
-        page.update()
+        pros_list.render(
+            pros,
+            empty=ft.Container(
+                padding=20,
+                border_radius=14,
+                bgcolor="#F8F8FF",
+                border=ft.border.all(1, "#ECEBFF"),
+                content=ft.Row(
+                    [
+                        ft.Icon(ft.Icons.SEARCH_OFF, color="#7D7AA8"),
+                        ft.Text("No encontramos resultados con esos filtros.", color="#7D7AA8"),
+                    ],
+                    spacing=8,
+                ),
+            ),
+        )
+        schedule_update(page, list_col)
 
     # filtros reactivos
     state_dd.on_change = lambda e: (_reload_municipios(), _fetch_and_render())
@@ -1,12 +1,12 @@
 from components.app_header import AppHeader
 import flet as ft
-from datetime import datetime, timedelta
-import pytz
-from google.cloud import firestore as gcfirestore
 
 from theme import BG, INK, MUTED, rounded_card
 from services.firebase_service import FirebaseService
-from ui_helpers import scroll_view, shell_header, two_col_grid
+from services.session_prefetch import take_prefetch
+from services.day_utils import today_key
+from services import background_jobs, read_snapshot
+from ui_helpers import scroll_view, shell_header, two_col_grid, schedule_update
 
 
 def HomeView(page: ft.Page):
@@ -39,39 +39,60 @@ def HomeView(page: ft.Page):
     def set_phrase(text: str, loading: bool):
         phrase_text.value = text
         spinner.visible = loading
-        page.update()
-
-    async def load_phrase_for_today():
+        schedule_update(page, phrase_text, spinner)
+
+    def phrase_for(today) -> str:
+        if not today or not today.get("diagnosticId"):
+            return "Aún no haces un diagnóstico hoy. Hazlo para obtener tu frase."
+        return today.get("phrase") or "Guardaste tu diagnóstico hoy. La frase está en proceso…"
+
+    def ensure_phrase(today):
+        # Diagnóstico de hoy sin frase (el worker se reinició, o se subió desde la
+        # cola offline): se pide de nuevo; si ya hay un trabajo con esa clave no pasa nada
+        if uid and today and today.get("diagnosticId") and today.get("phraseStatus") == "pending":
+            background_jobs.submit_phrase(page, uid, today["diagnosticId"], fb=fb)
+
+    def on_phrase(_topic, msg):
+        # La frase llegó desde el trabajo en segundo plano
+        set_phrase(msg["phrase"], loading=False)
+        cached = read_snapshot.get(page, uid, "today")
+        if cached and cached.get("diagnosticId") == msg.get("diagnosticId"):
+            read_snapshot.put(page, uid, "today", {**cached, "phrase": msg["phrase"], "phraseStatus": "ready"})
+
+    if uid:
+        topic = background_jobs.phrase_topic(uid)
+        page.pubsub.unsubscribe_topic(topic)  # una sola suscripción aunque Home se construya varias veces
+        page.pubsub.subscribe_topic(topic, on_phrase)
+
+    async def load_phrase_for_today(profile_known: bool = False):
         if not uid:
             set_phrase("Inicia sesión para ver tu frase del día.", loading=False)
             return
+
+        def fetch():
+            # Lectura puntual del perfil; la consulta por rango solo si aún no hay resumen de hoy
+            today = None if profile_known else fb.get_today_summary(uid)
+            return today if today is not None else fb.backfill_today_summary(uid)
+
+        def paint(today, stale):
+            set_phrase(phrase_for(today), loading=stale)
+            if not stale:
+                ensure_phrase(today)
+
         try:
-            tz = pytz.timezone("America/Mexico_City")
-            now_local = datetime.now(tz)
-            start_local = tz.localize(datetime(now_local.year, now_local.month, now_local.day, 0, 0, 0))
-            end_local = start_local + timedelta(days=1)
-            start_utc = start_local.astimezone(pytz.utc)
-            end_utc = end_local.astimezone(pytz.utc)
-
-            ref = fb.db.collection("users").document(uid).collection("diagnostics")
-            q = (
-                ref.where("createdAt", ">=", start_utc)
-                .where("createdAt", "<", end_utc)
-                .order_by("createdAt", direction=gcfirestore.Query.DESCENDING)
-                .limit(1)
+            # La frase guardada en el dispositivo se pinta ya; el spinner sigue hasta confirmar
+            await read_snapshot.cached_then_fresh(
+                page, uid, "today",
+                paint=paint,
+                fetch=fetch,
+                to_cache=read_snapshot.compact_today,
+                from_cache=lambda t: t if t.get("dateKey") == today_key() else None,
             )
-            docs = list(q.stream())
-            if not docs:
-                set_phrase("Aún no haces un diagnóstico hoy. Hazlo para obtener tu frase.", loading=False)
-                return
-            doc = docs[0].to_dict() or {}
-            phrase = doc.get("phrase")
-            if phrase:
-                set_phrase(phrase, loading=False)
-            else:
-                set_phrase("Guardaste tu diagnóstico hoy. La frase está en proceso…", loading=False)
         except Exception as ex:
             set_phrase(f"No se pudo cargar la frase: {ex}", loading=False)
+        finally:
+            spinner.visible = False
+            schedule_update(page, spinner)
 
     def on_refresh(_):
         try:
@@ -129,8 +150,19 @@ def HomeView(page: ft.Page):
         )
     )
 
-    # Cargar frase automáticamente al abrir
-    on_refresh(None)
+    # Cargar frase al abrir: si el splash ya trajo el perfil con el resumen de hoy,
+    # se pinta sin otra lectura
+    prefetched = take_prefetch(page, uid) if uid else None
+    if prefetched and prefetched.get("today"):
+        phrase_text.value = phrase_for(prefetched["today"])
+        spinner.visible = False
+        read_snapshot.put(page, uid, "today", read_snapshot.compact_today(prefetched["today"]))
+        ensure_phrase(prefetched["today"])
+    elif prefetched and "profile" in prefetched:
+        # Perfil ya leído pero sin resumen de hoy: directo al backfill
+        page.run_task(load_phrase_for_today, True)
+    else:
+        on_refresh(None)
 
     return ft.View(
         route="/home",
@@ -1,11 +1,14 @@
 # pages/login_page.py
 import re
 import json
+import asyncio
 import flet as ft
 from dataclasses import asdict
 from urllib.parse import urlparse, parse_qs
 
 from services.firebase_service import FirebaseService
+from services.session_prefetch import is_professional, stash_profile
+from services.profile_cache import load_profile
 from models.user_model import User
 from theme import BG, INK, MUTED, rounded_card, primary_button, ghost_button
 from firebase_admin import auth as admin_auth
@@ -246,9 +249,9 @@ class LoginView(ft.View):
         self.password.disabled = busy
         page.update()
 
-    def _submit_from_field(self, e: ft.ControlEvent):
+    async def _submit_from_field(self, e: ft.ControlEvent):
         if not self._busy:
-            self.on_login(e)
+            await self.on_login(e)
 
     # ---------- validación ----------
     def _validate(self) -> bool:
@@ -287,7 +290,7 @@ class LoginView(ft.View):
         return "UNKNOWN"
 
     # ---------- login ----------
-    def on_login(self, e: ft.ControlEvent):
+    async def on_login(self, e: ft.ControlEvent):
         page = e.page
         if self._busy:
             return
@@ -301,14 +304,16 @@ class LoginView(ft.View):
 
         try:
             print(f"[Login] Autenticando email={email} ...")
-            id_token, uid = self.fb.sign_in(email, password)
+            # Red en hilos: el loop sigue libre (spinner y otras sesiones)
+            id_token, uid = await asyncio.to_thread(self.fb.sign_in, email, password)
             print(f"[Login] OK uid={uid}")
 
-            profile = self.fb.get_user_profile(uid) or {}
+            # Lectura fresca que además llena la caché de perfiles (/pro y /pro/edit la usan)
+            profile = await load_profile(self.fb, uid, force=True)
             print(f"[Login] Perfil leído: {profile}")
 
             # Decide destino: /pro si es profesional o si viene forzado por querystring
-            is_pro = (profile.get("type") == "profesional") or bool(profile.get("professional"))
+            is_pro = is_professional(profile)
             dest = "/pro" if (is_pro or self.force_pro) else "/home"
             print(f"[Login] is_pro={is_pro}, force_pro={self.force_pro}, dest={dest}")
 
@@ -319,6 +324,8 @@ class LoginView(ft.View):
             page.session.set("user", user_dict)
             # Guardar también en el storage del cliente (sobrevive recargas / offline)
             page.client_storage.set("user", json.dumps(user_dict))
+            # El perfil ya trae el resumen de hoy: Home lo pinta sin otra lectura
+            stash_profile(page, uid, profile)
 
             self._toast(page, f"Bienvenid@, {user.username or user.email} 🌿")
             page.go(dest)
@@ -336,7 +343,7 @@ class LoginView(ft.View):
             if code in ("INVALID_LOGIN_CREDENTIALS", "INVALID_PASSWORD"):
                 # Distinguir: correo existe o no
                 try:
-                    admin_auth.get_user_by_email(email)
+                    await asyncio.to_thread(admin_auth.get_user_by_email, email)
                     self.pass_err.value = "Contraseña incorrecta."
                     self.pass_err.visible = True
                     self._toast(page, "Contraseña incorrecta.", error=True)
@@ -4,14 +4,15 @@ import pytz
 from datetime import datetime
 from firebase_admin import firestore
 from services.firebase_service import FirebaseService
-from services import offline_queue
-import requests
+from services import offline_queue, read_snapshot
+from services.connectivity import get_connectivity
 from theme import BG, MUTED, rounded_card, primary_button
-from ui_helpers import shell_header
+from ui_helpers import shell_header, schedule_update
 
     
 def NoteEditorView(page: ft.Page):
     fb = FirebaseService()
+    connectivity = get_connectivity(page)
     sess_user = page.session.get("user")
     if not isinstance(sess_user, dict) or not sess_user.get("uid"):
         return ft.View(route="/note_editor", controls=[ft.Text("Inicia sesión para continuar")], bgcolor=BG)
@@ -44,17 +45,27 @@ def NoteEditorView(page: ft.Page):
     def toast(msg: str, error: bool = False):
         page.snack_bar = ft.SnackBar(ft.Text(msg), bgcolor="#E5484D" if error else "#2ECC71")
         page.snack_bar.open = True
-        page.update()
+        schedule_update(page)
 
     def set_status(s=""):
         status.value = s
-        page.update()
+        schedule_update(page, status)
 
     async def load_existing():
         if not note_id:
             return True  # creando nueva → permitido
+        pending = offline_queue.pending_for(page, uid, "note").get(note_id)
+        if offline_queue.is_local_id(note_id) or (pending and pending["op"] == "create"):
+            # Nota creada sin conexión: todavía solo existe en la cola
+            if not pending:
+                toast("Nota no encontrada.", error=True)
+                return False
+            title.value = pending["payload"].get("title") or ""
+            content.value = pending["payload"].get("content") or ""
+            page.update()
+            return True
         try:
-            d = await asyncio.to_thread(fb.get_note, uid, note_id)
+            d = await connectivity.run(fb.get_note, uid, note_id, base_timeout=10.0)
             if not d:
                 toast("Nota no encontrada.", error=True)
                 return False
@@ -68,6 +79,9 @@ def NoteEditorView(page: ft.Page):
                 created_key = created_at.astimezone(tz).strftime("%Y-%m-%d")
                 editable = (created_key == today_key)
 
+            # Una edición offline pendiente manda sobre lo que hay en el servidor
+            if pending and pending["op"] == "update":
+                d = {**d, **pending["payload"]}
             title.value = d.get("title") or ""
             content.value = d.get("content") or ""
             title.disabled = not editable
@@ -78,6 +92,17 @@ def NoteEditorView(page: ft.Page):
             page.update()
             return editable
         except Exception as ex:
+            cached = next((n for n in read_snapshot.get(page, uid, "notes", []) if n["id"] == note_id), None)
+            # La copia del snapshot puede venir recortada: solo se edita si está completa
+            complete = cached and len(cached["content"]) < read_snapshot.NOTE_TEXT_CHARS
+            if offline_queue.is_offline_error(ex) and complete and cached["createdKey"] == today_key:
+                # Sin red: se edita lo guardado en el dispositivo y el cambio va a la cola
+                d = {**cached, **(pending["payload"] if pending and pending["op"] == "update" else {})}
+                title.value = d.get("title") or ""
+                content.value = d.get("content") or ""
+                toast("Sin conexión: editando la copia guardada en este dispositivo.")
+                page.update()
+                return True
             toast(f"Error cargando nota: {ex}", error=True)
             return False
 
@@ -89,33 +114,39 @@ def NoteEditorView(page: ft.Page):
             return
 
         set_status("Guardando…")
+        data = {"title": ttl, "content": body}
+        pending = offline_queue.pending_for(page, uid, "note").get(note_id) if note_id else None
+        if pending and pending["op"] == "create":
+            # Sigue sin subirse: la edición se junta con el create pendiente
+            offline_queue.enqueue(page, "note", "update", uid, note_id, data)
+            set_status("")
+            toast("Nota guardada offline; se subirá al reconectar ✅")
+            page.go("/notes")
+            return
+
+        # Nota nueva: el id se genera aquí para que un reintento no la duplique
+        target_id = note_id or fb.new_doc_id()
         try:
-            # Intento normal: guardar en Firebase (online)
+            # Intento normal: guardar en Firebase (online). Si ya se sabe que no hay
+            # red, connectivity.run falla al instante y va directo a la cola
             if note_id:
-                await asyncio.to_thread(fb.update_note, uid, note_id, ttl, body)
+                await connectivity.run(fb.update_note, uid, note_id, ttl, body, base_timeout=8.0)
             else:
-                await asyncio.to_thread(fb.add_note, uid, ttl, body)
+                await connectivity.run(fb.add_note, uid, ttl, body, target_id, base_timeout=8.0)
 
             toast("Nota guardada ✅")
             page.go("/notes")
 
-        except requests.exceptions.RequestException:
-            # Error de red → guardamos la nota en cola offline
-            offline_queue.queue_action(page, {
-                "type": "note",
-                "uid": uid,
-                "payload": {
-                    "title": ttl,
-                    "content": body,
-                },
-            })
+        except Exception as ex:
+            if not offline_queue.is_offline_error(ex):
+                # Otro error que no es de red
+                toast(f"Error al guardar: {ex}", error=True)
+                return
+            # Error de red → a la cola offline: update si la nota ya existe, create si es nueva
+            offline_queue.enqueue(page, "note", "update" if note_id else "create", uid, target_id, data)
             toast("Sin conexión: la nota se guardó offline y se subirá más tarde ✅")
             page.go("/notes")
 
-        except Exception as ex:
-            # Otro error que no es de red
-            toast(f"Error al guardar: {ex}", error=True)
-
         finally:
             set_status("")
 
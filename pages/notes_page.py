@@ -7,12 +7,16 @@ from google.cloud.firestore_v1 import base_query as bq
 from firebase_admin import firestore
 
 from theme import BG, INK, MUTED, rounded_card, primary_button
-from ui_helpers import date_scroller, shell_header
+from ui_helpers import date_scroller, shell_header, schedule_update, KeyedList
 from services.firebase_service import FirebaseService
+from services.notes_index import get_notes_index
+from services import offline_queue, read_snapshot
+from services.connectivity import get_connectivity
 
 
 def NotesView(page: ft.Page):
     fb = FirebaseService()
+    connectivity = get_connectivity(page)
 
     sess_user = page.session.get("user")
     if not isinstance(sess_user, dict) or not sess_user.get("uid"):
@@ -29,7 +33,9 @@ def NotesView(page: ft.Page):
 
     status = ft.Text("", color=MUTED)
     list_col = ft.Column(spacing=10)
+    results_col = ft.Column(spacing=10, visible=False)
     scroller_row = ft.Row([])
+    index = get_notes_index(uid)
 
     now_local = datetime.now(tz)
     active_key = now_local.strftime("%Y-%m-%d")
@@ -39,12 +45,12 @@ def NotesView(page: ft.Page):
         print(f"[TOAST] {msg}")
         page.snack_bar = ft.SnackBar(ft.Text(msg), bgcolor="#E5484D" if error else "#2ECC71")
         page.snack_bar.open = True
-        page.update()
+        schedule_update(page)
 
     def set_status(txt=""):
         status.value = txt
         print(f"[STATUS] {txt}")
-        page.update()
+        schedule_update(page, status)
 
     # --- Fecha y Firestore utils ---
     def ts_to_key(ts):
@@ -84,7 +90,7 @@ def NotesView(page: ft.Page):
                 on_select=on_select_date,
             )
         )
-        page.update()
+        schedule_update(page, scroller_row)
 
     def on_select_date(key: str):
         nonlocal active_key
@@ -96,6 +102,113 @@ def NotesView(page: ft.Page):
             print("[ERROR] run_task failed:", ex)
             asyncio.run(load_notes_for_day())
 
+    # --- Modal para ver nota ---
+    def show_note_detail(note_title: str, note_content: str):
+        overlay = ft.Container(
+            bgcolor=ft.Colors.with_opacity(0.5, ft.Colors.BLACK),
+            alignment=ft.alignment.center,
+            content=ft.Container(
+                width=400,
+                height=500,
+                padding=20,
+                bgcolor=ft.Colors.WHITE,
+                border_radius=16,
+                content=ft.Column(
+                    [
+                        ft.Text(note_title, size=18, weight=ft.FontWeight.W_700, color=INK),
+                        ft.Container(
+                            height=380,
+                            content=ft.Column(
+                                [
+                                    ft.Text(
+                                        note_content or "(Sin contenido)",
+                                        size=13,
+                                        color=INK,
+                                        selectable=True,
+                                        text_align=ft.TextAlign.JUSTIFY,
+                                    )
+                                ],
+                                scroll=ft.ScrollMode.AUTO,
+                            ),
+                        ),
+                        ft.ElevatedButton(
+                            "Cerrar",
+                            bgcolor="#D9D9D9",
+                            color=INK,
+                            on_click=lambda e: close_overlay(),
+                        ),
+                    ],
+                    spacing=12,
+                    alignment=ft.MainAxisAlignment.START,
+                ),
+            ),
+        )
+
+        def close_overlay():
+            page.overlay.clear()
+            page.update()
+
+        page.overlay.append(overlay)
+        page.update()
+        print("[VIEW] Mostrando ventana modal de lectura")
+
+    # --- Tarjeta de nota (una por documento) ---
+    def note_card(note: dict):
+        note_id = note["id"]
+        title = note["title"]
+        content = note["content"]
+        created_key = note["createdKey"]
+
+        if note["sameDay"]:
+            # ✅ Hoy: Editar / Eliminar
+            edit_btn = ft.IconButton(
+                icon=ft.Icons.EDIT,
+                tooltip="Editar",
+                on_click=lambda e, nid=note_id: page.go(f"/note_editor?id={nid}&date={active_key}"),
+            )
+            del_btn = ft.IconButton(
+                icon=ft.Icons.DELETE_OUTLINE,
+                tooltip="Eliminar",
+                on_click=lambda e, nid=note_id: on_delete_note(nid, created_key),
+            )
+            action_row = ft.Row([edit_btn, del_btn], alignment=ft.MainAxisAlignment.END)
+        else:
+            # 👁️ Anteriores: solo ver modal
+            view_btn = ft.IconButton(
+                icon=ft.Icons.REMOVE_RED_EYE_OUTLINED,
+                tooltip="Ver nota completa",
+                on_click=lambda e, t=title, c=content: show_note_detail(t, c),
+            )
+            action_row = ft.Row([view_btn], alignment=ft.MainAxisAlignment.END)
+
+        return ft.Container(
+            content=ft.Column(
+                [
+                    ft.Text(title, size=16, weight=ft.FontWeight.W_600, color=INK),
+                    ft.Text(
+                        content[:300] + ("…" if len(content) > 300 else ""),
+                        size=12,
+                        color=MUTED,
+                    ),
+                    action_row,
+                ],
+                spacing=6,
+            ),
+            padding=14,
+            bgcolor="#EDE7FF",
+            border_radius=16,
+        )
+
+    shown_notes: list = []  # lo que está pintado del día activo
+
+    # Reconciliación por id: borrar/editar una nota solo manda esa tarjeta
+    notes_list = KeyedList(
+        list_col,
+        key_fn=lambda n: n["id"],
+        build_fn=note_card,
+        signature_fn=lambda n: (n["title"], n["content"], n["createdKey"], n["sameDay"]),
+    )
+
     # --- Cargar notas del día ---
     async def load_notes_for_day():
         set_status("Cargando notas…")
@@ -113,135 +226,101 @@ def NotesView(page: ft.Page):
             .order_by("updatedAt", direction=firestore.Query.DESCENDING)
             .limit(200)
         )
-        docs = list(q.stream())
-
-        list_col.controls.clear()
-        print(f"[LOAD] {len(docs)} notas encontradas.")
-
-        if not docs:
-            today_key = now_local.strftime("%Y-%m-%d")
-            msg = "Hoy no se han hecho notas." if active_key == today_key else "No hay notas para esta fecha."
-            list_col.controls.append(ft.Text(msg, color=MUTED))
-            page.update()
-            set_status("")
-            return
-
-        today_key = datetime.now(tz).strftime("%Y-%m-%d")
-
-        # --- Modal para ver nota ---
-        def show_note_detail(note_title: str, note_content: str):
-            overlay = ft.Container(
-                bgcolor=ft.Colors.with_opacity(0.5, ft.Colors.BLACK),
-                alignment=ft.alignment.center,
-                content=ft.Container(
-                    width=400,
-                    height=500,
-                    padding=20,
-                    bgcolor=ft.Colors.WHITE,
-                    border_radius=16,
-                    content=ft.Column(
-                        [
-                            ft.Text(note_title, size=18, weight=ft.FontWeight.W_700, color=INK),
-                            ft.Container(
-                                height=380,
-                                content=ft.Column(
-                                    [
-                                        ft.Text(
-                                            note_content or "(Sin contenido)",
-                                            size=13,
-                                            color=INK,
-                                            selectable=True,
-                                            text_align=ft.TextAlign.JUSTIFY,
-                                        )
-                                    ],
-                                    scroll=ft.ScrollMode.AUTO,
-                                ),
-                            ),
-                            ft.ElevatedButton(
-                                "Cerrar",
-                                bgcolor="#D9D9D9",
-                                color=INK,
-                                on_click=lambda e: close_overlay(),
-                            ),
-                        ],
-                        spacing=12,
-                        alignment=ft.MainAxisAlignment.START,
-                    ),
-                ),
-            )
-
-            def close_overlay():
-                page.overlay.clear()
-                page.update()
-
-            page.overlay.append(overlay)
-            page.update()
-            print("[VIEW] Mostrando ventana modal de lectura")
-
-        # --- Mostrar lista de notas ---
-        for d in docs:
-            data = d.to_dict() or {}
-            note_id = d.id
-            title = (data.get("title") or "Sin título")[:120]
-            content = (data.get("content") or "").strip()
-            created_at = data.get("createdAt")
-            created_key = ts_to_key(created_at)
-            is_same_day = (created_key == today_key)
-            print(f"[NOTE] {note_id} ({created_key}) same_day={is_same_day}")
-
-            if is_same_day:
-                # ✅ Hoy: Editar / Eliminar
-                edit_btn = ft.IconButton(
-                    icon=ft.Icons.EDIT,
-                    tooltip="Editar",
-                    on_click=lambda e, nid=note_id: page.go(f"/note_editor?id={nid}&date={active_key}"),
-                )
-                del_btn = ft.IconButton(
-                    icon=ft.Icons.DELETE_OUTLINE,
-                    tooltip="Eliminar",
-                    on_click=lambda e, nid=note_id: on_delete_note(nid, created_key),
-                )
-                action_row = ft.Row([edit_btn, del_btn], alignment=ft.MainAxisAlignment.END)
-            else:
-                # 👁️ Anteriores: solo ver modal
-                view_btn = ft.IconButton(
-                    icon=ft.Icons.REMOVE_RED_EYE_OUTLINED,
-                    tooltip="Ver nota completa",
-                    on_click=lambda e, t=title, c=content: show_note_detail(t, c),
-                )
-                action_row = ft.Row([view_btn], alignment=ft.MainAxisAlignment.END)
-
-            list_col.controls.append(
-                ft.Container(
-                    content=ft.Column(
-                        [
-                            ft.Text(title, size=16, weight=ft.FontWeight.W_600, color=INK),
-                            ft.Text(
-                                content[:300] + ("…" if len(content) > 300 else ""),
-                                size=12,
-                                color=MUTED,
-                            ),
-                            action_row,
-                        ],
-                        spacing=6,
-                    ),
-                    padding=14,
-                    bgcolor="#EDE7FF",
-                    border_radius=16,
-                )
+        day_key = active_key
+
+        def fetch():
+            notes = []
+            for d in q.stream():
+                data = d.to_dict() or {}
+                notes.append({
+                    "id": d.id,
+                    "title": (data.get("title") or "Sin título")[:120],
+                    "content": (data.get("content") or "").strip(),
+                    "createdKey": ts_to_key(data.get("createdAt")),
+                    "updatedKey": ts_to_key(data.get("updatedAt")),
+                })
+            print(f"[LOAD] {len(notes)} notas encontradas.")
+            return notes
+
+        def paint(notes: list, stale: bool):
+            if day_key != active_key:
+                return  # ya se eligió otro día
+            today_key = datetime.now(tz).strftime("%Y-%m-%d")
+            notes = with_pending([{**n, "sameDay": n["createdKey"] == today_key} for n in notes], today_key)
+            msg = "Hoy no se han hecho notas." if day_key == today_key else "No hay notas para esta fecha."
+            shown_notes[:] = notes
+            notes_list.render(notes, empty=ft.Text(msg, color=MUTED))
+            schedule_update(page, list_col)
+
+        # Las notas del día que ya estaban en el dispositivo se pintan sin esperar la consulta
+        try:
+            fresh = await read_snapshot.cached_then_fresh(
+                page, uid, "notes", paint, fetch,
+                to_cache=lambda notes: read_snapshot.merge_notes(read_snapshot.get(page, uid, "notes"), day_key, notes),
+                from_cache=lambda cached: [n for n in cached if n.get("updatedKey") == day_key] or None,
             )
-        page.update()
-        set_status("")
+        except Exception as ex:
+            if not offline_queue.is_offline_error(ex):
+                raise
+            print("[LOAD] Sin conexión, solo notas pendientes:", ex)
+            paint([], True)
+            fresh = False
+        set_status("" if fresh else "Sin conexión: mostrando lo guardado en este dispositivo.")
+
+    def with_pending(notes: list, today_key: str) -> list:
+        """Pinta encima lo que está en la cola offline: ediciones, borrados y notas nuevas de hoy."""
+        pending = offline_queue.pending_for(page, uid, "note")
+        if not pending:
+            return notes
+        out = []
+        for n in notes:
+            action = pending.get(n["id"])
+            if action and action["op"] == "delete":
+                continue
+            if action and action["op"] == "update":
+                n = {**n, "title": action["payload"].get("title") or "Sin título",
+                     "content": (action["payload"].get("content") or "").strip()}
+            out.append(n)
+        if active_key == today_key:
+            created = [
+                {
+                    "id": doc_id,
+                    "title": (a["payload"].get("title") or "Sin título")[:120],
+                    "content": (a["payload"].get("content") or "").strip(),
+                    "createdKey": today_key,
+                    "sameDay": True,
+                }
+                for doc_id, a in pending.items() if a["op"] == "create"
+            ]
+            out = created[::-1] + out
+        return out
 
     # --- Eliminar nota ---
+    def drop_card(note_id: str):
+        shown_notes[:] = [n for n in shown_notes if n["id"] != note_id]
+        notes_list.render(shown_notes, empty=ft.Text("Hoy no se han hecho notas.", color=MUTED))
+        schedule_update(page, list_col)
+
     async def delete_async(note_id: str):
         print(f"[DELETE] Ejecutando delete_async para {note_id}")
         try:
-            await asyncio.to_thread(fb.delete_note, uid, note_id)
+            pending = offline_queue.pending_for(page, uid, "note").get(note_id)
+            if offline_queue.is_local_id(note_id) or (pending and pending["op"] == "create"):
+                # Todavía en la cola: el delete se junta con el create pendiente
+                offline_queue.enqueue(page, "note", "delete", uid, note_id)
+                drop_card(note_id)
+                toast("Nota eliminada ✅")
+                return
+            await connectivity.run(fb.delete_note, uid, note_id, base_timeout=8.0)
             print("[DELETE] Eliminación completada en Firestore.")
             toast("Nota eliminada ✅")
             await load_notes_for_day()
         except Exception as ex:
+            if offline_queue.is_offline_error(ex):
+                offline_queue.enqueue(page, "note", "delete", uid, note_id)
+                drop_card(note_id)
+                toast("Sin conexión: la nota se eliminará al reconectar ✅")
+                return
             print("[ERROR] Durante delete_async:", ex)
             toast(f"Error al eliminar: {ex}", error=True)
         finally:
@@ -293,6 +372,76 @@ def NotesView(page: ft.Page):
         page.update()
         print("[OVERLAY] Mostrado correctamente")
 
+    # --- Búsqueda (índice local, sin leer Firestore) ---
+    async def open_result(note_id: str):
+        note = await asyncio.to_thread(fb.get_note, uid, note_id)
+        if not note:
+            index.delete(note_id)
+            toast("Esa nota ya no existe.", error=True)
+            on_search(search_field.value)
+            return
+        show_note_detail(note.get("title") or "Sin título", note.get("content") or "")
+
+    def result_card(hit: dict):
+        date_key = datetime.fromtimestamp(hit["created"], tz).strftime("%Y-%m-%d")
+        return ft.Container(
+            content=ft.Column(
+                [
+                    ft.Text(hit["title"], size=16, weight=ft.FontWeight.W_600, color=INK),
+                    ft.Text(date_key, size=11, color=MUTED),
+                    ft.Text(hit["snippet"], size=12, color=MUTED),
+                    ft.Row(
+                        [
+                            ft.IconButton(
+                                icon=ft.Icons.REMOVE_RED_EYE_OUTLINED,
+                                tooltip="Ver nota completa",
+                                on_click=lambda e, nid=hit["id"]: page.run_task(open_result, nid),
+                            )
+                        ],
+                        alignment=ft.MainAxisAlignment.END,
+                    ),
+                ],
+                spacing=6,
+            ),
+            padding=14,
+            bgcolor="#EDE7FF",
+            border_radius=16,
+        )
+
+    results_list = KeyedList(
+        results_col,
+        key_fn=lambda h: h["id"],
+        build_fn=result_card,
+        signature_fn=lambda h: (h["title"], h["snippet"], h["created"]),
+    )
+
+    def on_search(query: str):
+        query = (query or "").strip()
+        searching = bool(query)
+        results_col.visible = searching
+        list_col.visible = not searching
+        scroller_row.visible = not searching
+        if searching:
+            index.refresh()  # otro proceso pudo reiniciarlo (p. ej. tras importar un diario)
+        if not searching:
+            results_list.clear()
+        elif not index.built:
+            results_list.render([], empty=ft.Text("Preparando la búsqueda…", color=MUTED))
+            if not sync_state["running"] and not sync_state["failed"]:
+                page.run_task(sync_index)
+        else:
+            hits = index.search(query)
+            results_list.render(hits, empty=ft.Text("No hay notas que coincidan.", color=MUTED))
+        schedule_update(page, results_col, list_col, scroller_row)
+
+    search_field = ft.TextField(
+        hint_text="Buscar en todas mis notas",
+        prefix_icon=ft.Icons.SEARCH,
+        border_radius=12,
+        dense=True,
+        on_change=lambda e: on_search(e.control.value),
+    )
+
     # --- Layout principal ---
     actions = ft.Row(
         [primary_button("Nueva nota", lambda _: page.go(f"/note_editor?date={active_key}"))],
@@ -301,7 +450,7 @@ def NotesView(page: ft.Page):
 
     body = ft.Container(
         content=ft.Column(
-            [rounded_card(ft.Column([header, actions, scroller_row, list_col, status], spacing=12), 16)],
+            [rounded_card(ft.Column([header, actions, search_field, scroller_row, list_col, results_col, status], spacing=12), 16)],
             scroll=ft.ScrollMode.AUTO,
             spacing=16,
         ),
@@ -309,12 +458,34 @@ def NotesView(page: ft.Page):
         bgcolor=BG,
     )
 
+    # Índice de búsqueda: la primera vez lee todas las notas, luego solo los cambios
+    sync_state = {"running": False, "failed": False}  # failed: sin reintentos hasta reabrir la vista
+
+    async def sync_index():
+        sync_state["running"] = True
+        try:
+            changed = await asyncio.to_thread(index.sync, fb)
+            print(f"[BOOT] Índice de notas al día ({changed} cambios).")
+        except Exception as ex:
+            sync_state["failed"] = True
+            print("[ERROR] sync del índice:", ex)
+        finally:
+            sync_state["running"] = False
+        if search_field.value:
+            on_search(search_field.value)
+
     # --- Boot ---
     async def boot():
         print("[BOOT] Iniciando NotesView...")
-        first_date = await asyncio.to_thread(get_first_note_date)
+        try:
+            first_date = await asyncio.to_thread(get_first_note_date)
+        except Exception as ex:
+            if not offline_queue.is_offline_error(ex):
+                raise
+            first_date = now_local  # sin conexión: el selector arranca en hoy
         refresh_scroller(first_date, active_key)
         await load_notes_for_day()
+        await sync_index()
         print("[BOOT] Listo.")
 
     try:
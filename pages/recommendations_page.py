@@ -3,18 +3,20 @@ import flet as ft
 import asyncio, threading
 from datetime import datetime, timedelta
 import pytz
-from google.cloud.firestore_v1 import base_query as bq
-from firebase_admin import firestore
 
 from theme import BG, INK, MUTED, rounded_card, primary_button
-from ui_helpers import date_scroller, shell_header
+from ui_helpers import date_scroller, shell_header, schedule_update, KeyedList
 from services.firebase_service import FirebaseService
 from services.gemini_service import GeminiService
+from services import offline_queue, read_snapshot, recommendation_pregen
+from services.connectivity import OfflineError, get_connectivity
+from services.single_flight import get_single_flight
 
 
 def RecommendationsView(page: ft.Page):
     fb = FirebaseService()
     gem = GeminiService()
+    connectivity = get_connectivity(page)
 
     sess_user = page.session.get("user")
     if not isinstance(sess_user, dict) or not sess_user.get("uid"):
@@ -45,11 +47,11 @@ def RecommendationsView(page: ft.Page):
             bgcolor="#E5484D" if error else "#2ECC71"
         )
         page.snack_bar.open = True
-        page.update()
+        schedule_update(page)
 
     def set_status(txt=""):
         status.value = txt
-        page.update()
+        schedule_update(page, status)
 
     def today_key():
         tz = pytz.timezone("America/Mexico_City")
@@ -105,100 +107,145 @@ def RecommendationsView(page: ft.Page):
         page.overlay.append(overlay)
         page.update()
 
-    # === LOAD DATA ===
-    async def load_today_and_history():
-        set_status("Cargando recomendaciones…")
-        tz, now_local, dkey = today_key()
+    # === HISTORIAL (reconciliado por fecha) ===
+    def history_card(rec: dict):
+        date_key, text = rec["date"], rec["text"]
+        preview = text[:120] + ("…" if len(text) > 120 else "")
+        return ft.Container(
+            on_click=lambda e, dk=date_key, t=text: show_recommendation_detail(dk, t),
+            content=ft.Column(
+                [
+                    ft.Text(date_key, size=15, weight=ft.FontWeight.W_600, color=INK),
+                    ft.Text(preview, size=12, color=MUTED),
+                ],
+                spacing=4,
+            ),
+            padding=14,
+            bgcolor="#EDE7FF",
+            border_radius=16,
+        )
 
-        # Recomendación de hoy
-        today = await asyncio.to_thread(fb.get_recommendation_for_date, uid, dkey)
-        if today and today.get("text"):
-            today_text.value = today["text"]
+    history_list = KeyedList(
+        list_col,
+        key_fn=lambda r: r["date"],
+        build_fn=history_card,
+        signature_fn=lambda r: r["text"],
+    )
+
+    # === LOAD DATA ===
+    def paint_recommendations(data: dict, stale: bool):
+        if data.get("today"):
+            today_text.value = data["today"]
         else:
             today_text.value = "Aún no hay recomendación de hoy. Presiona “Generar recomendación”."
+        history_list.render(
+            [h for h in data["history"] if h["date"] and h["text"]],
+            empty=ft.Text("No hay recomendaciones pasadas aún.", color=MUTED),
+        )
+        schedule_update(page, today_text, list_col)
 
-        # Historial
-        recs = await asyncio.to_thread(fb.list_recommendations, uid, 120)
-        list_col.controls.clear()
-
-        for doc in recs:
-            date_key = doc.get("date")
-            text = (doc.get("text") or "").strip()
-            preview = text[:120] + ("…" if len(text) > 120 else "")
-            if not date_key or not text:
-                continue
-
-            list_col.controls.append(
-                ft.Container(
-                    on_click=lambda e, dk=date_key, t=text: show_recommendation_detail(dk, t),
-                    content=ft.Column(
-                        [
-                            ft.Text(date_key, size=15, weight=ft.FontWeight.W_600, color=INK),
-                            ft.Text(preview, size=12, color=MUTED),
-                        ],
-                        spacing=4,
-                    ),
-                    padding=14,
-                    bgcolor="#EDE7FF",
-                    border_radius=16,
-                )
-            )
-
-        if not list_col.controls:
-            list_col.controls.append(ft.Text("No hay recomendaciones pasadas aún.", color=MUTED))
+    async def load_today_and_history():
+        set_status("Cargando recomendaciones…")
+        tz, now_local, dkey = today_key()
 
-        page.update()
-        set_status("")
+        def fetch():
+            # Recomendación de hoy + historial
+            today = fb.get_recommendation_for_date(uid, dkey)
+            recs = fb.list_recommendations(uid, 120)
+            return {
+                "today": (today or {}).get("text"),
+                "history": [{"date": doc.get("date"), "text": (doc.get("text") or "").strip()} for doc in recs],
+            }
+
+        # Lo guardado en el dispositivo se pinta ya; el servidor lo corrige después
+        fresh = await read_snapshot.cached_then_fresh(
+            page, uid, "recommendations",
+            paint=paint_recommendations,
+            fetch=fetch,
+            to_cache=lambda d: read_snapshot.compact_recommendations(
+                [h for h in d["history"] if h["date"] and h["text"]]
+            ),
+            from_cache=lambda cached: {
+                "today": next((h["text"] for h in cached if h["date"] == dkey), None),
+                "history": cached,
+            },
+        )
+        set_status("" if fresh else "Sin conexión: mostrando lo último guardado.")
 
     # === GENERAR HOY ===
-    async def generate_today():
-        set_status("Generando recomendación…")
-
-        tz, now_local, dkey = today_key()
+    async def produce(tz, now_local, dkey):
+        """
+        Consultas + Gemini + guardado. Lo comparten los clics (o pestañas) que lleguen
+        mientras corre: ("empty" | "cached" | "saved" | "queued", texto, gemini_ok).
+        """
         start_local = tz.localize(datetime(now_local.year, now_local.month, now_local.day, 0, 0, 0))
         end_local = start_local + timedelta(days=1)
         start_utc = start_local.astimezone(pytz.utc)
         end_utc = end_local.astimezone(pytz.utc)
 
-        # Notas y diagnósticos
-        notes_ref = fb.db.collection("users").document(uid).collection("notes")
-        qn = (notes_ref
-              .where(filter=bq.FieldFilter("updatedAt", ">=", start_utc))
-              .where(filter=bq.FieldFilter("updatedAt", "<", end_utc))
-              .order_by("updatedAt", direction=firestore.Query.DESCENDING)
-              .limit(30))
-        notes_today = [{"id": d.id, **(d.to_dict() or {})} for d in qn.stream()]
-
-        diags_ref = fb.db.collection("users").document(uid).collection("diagnostics")
-        qd = (diags_ref
-              .where(filter=bq.FieldFilter("createdAt", ">=", start_utc))
-              .where(filter=bq.FieldFilter("createdAt", "<", end_utc))
-              .order_by("createdAt", direction=firestore.Query.DESCENDING)
-              .limit(3))
-        diags_today = [{"id": d.id, **(d.to_dict() or {})} for d in qd.stream()]
+        # Notas y diagnósticos (en un hilo: no bloquean el loop de la página)
+        notes_today = await asyncio.to_thread(fb.list_notes_between, uid, start_utc, end_utc, 30)
+        diags_today = await asyncio.to_thread(fb.list_diagnostics_between, uid, start_utc, end_utc, 3)
 
         if not notes_today and not diags_today:
-            toast("Aún no hay datos suficientes (escribe una nota o haz tu diagnóstico).", error=True)
-            set_status("")
-            return
+            return "empty", None, True
+
+        # Si la pasada programada (services.recommendation_pregen) ya la generó con
+        # estas mismas notas y diagnósticos, se usa esa: ni Gemini ni escritura
+        digest = recommendation_pregen.inputs_hash(notes_today, diags_today, display_name)
+        existing = await asyncio.to_thread(fb.get_recommendation_for_date, uid, dkey)
+        if recommendation_pregen.is_current(existing, digest):
+            return "cached", existing.get("text") or "", True
 
+        gemini_ok = True
         try:
+            if connectivity.is_offline:
+                raise OfflineError("sin conexión")
+            # El tiempo lo acota el presupuesto del flujo en GeminiService (circuito incluido)
             msg = await asyncio.to_thread(
                 gem.generate_professional_recommendation,
-                notes_today, diags_today, display_name, 550, 0.8, 0.9, 40
+                notes_today, diags_today, display_name, 550, 0.8, 0.9, 40,
             )
         except Exception:
             msg = "Hoy te recomiendo tomarte un momento para respirar profundamente y agradecer algo bueno de tu día 💜."
-            toast("Error con Gemini, usando respaldo.", error=False)
+            gemini_ok = False
+
+        # Con el texto de respaldo no se guarda el hash: la próxima pasada o clic lo reintenta
+        meta = recommendation_pregen.recommendation_meta(notes_today, diags_today, digest if gemini_ok else None)
+        try:
+            await connectivity.run(fb.upsert_recommendation_for_date, uid, dkey, msg, meta, base_timeout=8.0)
+        except Exception as ex:
+            if not offline_queue.is_offline_error(ex):
+                raise
+            # El documento es uno por día (id = fecha): un reintento lo reemplaza en la cola
+            offline_queue.enqueue(page, "recommendation", "create", uid, dkey, {"text": msg, "meta": meta})
+            return "queued", msg, gemini_ok
+        return "saved", msg, gemini_ok
 
-        await asyncio.to_thread(
-            fb.upsert_recommendation_for_date,
-            uid, dkey, msg,
-            {"source": "gemini-2.0-flash", "notesCount": len(notes_today), "diagsCount": len(diags_today)}
+    async def generate_today():
+        set_status("Generando recomendación…")
+
+        tz, now_local, dkey = today_key()
+        # Doble clic: el segundo se une a la generación en curso (una llamada a Gemini, una escritura)
+        outcome, msg, gemini_ok = await get_single_flight().do_async(
+            ("recommendation:generate", uid, dkey), produce, tz, now_local, dkey
         )
 
+        if outcome == "empty":
+            toast("Aún no hay datos suficientes (escribe una nota o haz tu diagnóstico).", error=True)
+            set_status("")
+            return
+        if not gemini_ok:
+            toast("Error con Gemini, usando respaldo.", error=False)
+
         today_text.value = msg
-        toast("Recomendación del día guardada ✅")
+        if outcome == "queued":
+            toast("Sin conexión: la recomendación se guardará al reconectar ✅")
+            set_status("")
+            schedule_update(page, today_text)
+            return
+
+        toast("Tu recomendación del día ya estaba lista ✅" if outcome == "cached" else "Recomendación del día guardada ✅")
         await load_today_and_history()
 
     def on_generate(_):
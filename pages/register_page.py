@@ -1,11 +1,9 @@
 import re
-import uuid
-import time
-import threading
-import requests
 import flet as ft
 
 from services.firebase_service import FirebaseService
+from services.image_proxy import thumb_url
+from components.photo_upload import photo_upload_button
 from theme import BG, INK, MUTED, rounded_card, primary_button, ghost_button
 
 EMAIL_RE = re.compile(r"^[^\s@]+@[^\s@]+\.[^\s@]{2,}$")
@@ -23,9 +21,6 @@ SPECIALTIES = [
     "Psiquiatría (Médica)",
 ]
 
-# URL del microservicio (ajústalo si corre en otro host/puerto)
-UPLOADER_URL = "https://mindful-imagenes.onrender.com"
-
 
 class RegisterView(ft.View):
     def __init__(self, page: ft.Page):
@@ -73,8 +68,14 @@ class RegisterView(ft.View):
 
         self.pro_err = ft.Text("", size=11, color="#E5484D", visible=False)
 
-        # Botón subir en PWA/WEB -> abre modal embebido con IFrame
-        self.btn_web_upload = ft.TextButton("Subir foto (PWA / Web)", on_click=lambda _: self._open_upload_inline())
+        # Subida directa: FilePicker -> endpoint de uploads -> pipeline (sin polling)
+        self.btn_web_upload = photo_upload_button(
+            page, "Subir foto",
+            on_uploaded=self._on_photo_uploaded,
+            on_error=lambda msg: self._toast(msg, error=True),
+            on_start=lambda: self._toast("Subiendo foto…"),
+            icon=ft.Icons.CLOUD_UPLOAD,
+        )
 
         # loader
         self.spinner = ft.ProgressRing(width=18, height=18, visible=False)
@@ -173,18 +174,10 @@ class RegisterView(ft.View):
             elif w >= 860: target = int(w * 0.42)
             else: target = int(w * 0.92)
             self.card_container.width = max(380, min(target, 640))
-            # si hay modal abierto, también recalcular (opcional)
-            if getattr(self, "_uploader_dialog", None) and self._uploader_dialog.open:
-                self._resize_modal()
 
         adjust()
         page.on_resized = lambda e: (adjust(), page.update())
 
-        # estado de polling y modal
-        self._polling = False
-        self._current_session = None
-        self._uploader_dialog: ft.AlertDialog | None = None
-
     # ---------- helpers ----------
     def _toggle_role(self):
         sel = list(self.role.selected)[0]
@@ -242,107 +235,13 @@ class RegisterView(ft.View):
         self.update()
         return ok
 
-    # ---------- Modal con IFrame (PWA/WEB embebido) ----------
-    def _open_upload_inline(self):
-        session_id = uuid.uuid4().hex
-        self._current_session = session_id
-
-        iframe_url = f"{UPLOADER_URL}/uploader?session={session_id}"
-
-        # Intentar IFrame (0.28+). Si no existe, fallback a pestaña externa.
-        try:
-            iframe = ft.IFrame(src=iframe_url, width=800, height=520)
-        except AttributeError:
-            self.page.launch_url(iframe_url)
-            self._toast("Sube tu foto en la pestaña y vuelve. Estoy esperando la URL…")
-            if not self._polling:
-                self._polling = True
-                threading.Thread(target=self._poll_loop, daemon=True).start()
-            return
-
-        def _close_dialog(_=None):
-            if self._uploader_dialog and self._uploader_dialog.open:
-                self._uploader_dialog.open = False
-                self.page.update()
-
-        header = ft.Row(
-            controls=[
-                ft.Text("Subir foto", size=16, weight=ft.FontWeight.W_600),
-                ft.IconButton(ft.Icons.CLOSE, on_click=_close_dialog, tooltip="Cerrar")
-            ],
-            alignment=ft.MainAxisAlignment.SPACE_BETWEEN
-        )
-
-        self._iframe_control = iframe  # guardamos referencia para futuros resize
-
-        modal_body = ft.Container(
-            content=ft.Column(
-                controls=[
-                    header,
-                    ft.Container(content=self._iframe_control, expand=True, height=520, border_radius=12, bgcolor="#FFFFFF"),
-                    ft.Text("Tu imagen se vinculará automáticamente cuando finalice la subida.",
-                            size=12, color=MUTED),
-                ],
-                spacing=10,
-                expand=True
-            ),
-            width=min(self.page.width or 900, 900),
-            height=min(self.page.height or 650, 650),
-            bgcolor="#F7F5FF",
-            border_radius=16,
-            padding=14,
-        )
-
-        self._uploader_dialog = ft.AlertDialog(modal=True, content=modal_body)
-        self.page.dialog = self._uploader_dialog
-        self._uploader_dialog.open = True
-        self.page.update()
-
-        self._toast("Sube tu foto en la ventana y espera un momento…")
-        if not self._polling:
-            self._polling = True
-            threading.Thread(target=self._poll_loop, daemon=True).start()
-
-    def _resize_modal(self):
-        # Llama esto en on_resized para adaptar modal/iframe
-        if not self._uploader_dialog:
-            return
-        # ajusta envolvente
-        wrapper: ft.Container = self._uploader_dialog.content  # type: ignore
-        wrapper.width = min(self.page.width or 900, 900)
-        wrapper.height = min(self.page.height or 650, 650)
-        # ajusta iframe alto visible
-        # (si quieres, puedes hacer que el alto sea wrapper.height - cabecera - paddings)
-        # por simplicidad, mantenemos 520px para contenidos < 650px de alto
-        self.page.update()
-
-    # ---------- Polling al microservicio ----------
-    def _poll_loop(self):
-        while self._polling and self._current_session:
-            try:
-                r = requests.get(f"{UPLOADER_URL}/poll", params={"session": self._current_session}, timeout=4)
-                j = r.json()
-                url = j.get("url")
-                if url:
-                    def finish():
-                        self.photo_url.value = url
-                        self.img.src = url
-                        self.img.visible = True
-                        self.update()
-                        if self._uploader_dialog and self._uploader_dialog.open:
-                            self._uploader_dialog.open = False
-                            self.page.update()
-                        self._toast("Imagen vinculada ✅")
-                    try:
-                        self.page.invoke_later(finish)
-                    except Exception:
-                        finish()
-                    self._polling = False
-                    self._current_session = None
-                    break
-            except Exception:
-                pass
-            time.sleep(1.0)
+    # ---------- Foto ----------
+    def _on_photo_uploaded(self, url: str):
+        self.photo_url.value = url
+        self.img.src = thumb_url(url, "edit")
+        self.img.visible = True
+        self.update()
+        self._toast("Imagen vinculada ✅")
 
     # ---------- Registro ----------
     def _extract_code(self, ex: Exception) -> str:
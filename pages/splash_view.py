@@ -1,14 +1,22 @@
 # pages/splash_view.py
+import os
 import flet as ft
 import asyncio
 from theme import BG, INK
+from ui_helpers import pulse_in, reveal, shimmer_bar
+from services.session_prefetch import prefetch_session, restore_user, is_professional
 
 # Enlace directo del logo (termina en .png/.jpg)
 LOGO_URL = "https://i.postimg.cc/ryBnj3pm/logo.png"
 
+# Tiempo mínimo visible (evita un parpadeo) y máximo de espera por la precarga
+SPLASH_MIN_DISPLAY = float(os.getenv("SPLASH_MIN_DISPLAY", "0.4"))
+SPLASH_MAX_WAIT = float(os.getenv("SPLASH_MAX_WAIT", "2.5"))
+
 def SplashView(page: ft.Page):
     """
-    Splash fullscreen: logo grande centrado (X/Y), parpadeo suave y responsivo.
+    Splash fullscreen: logo grande centrado (X/Y), pulso de entrada y responsivo.
+    Las animaciones corren en el cliente: mientras espera no manda updates.
     """
 
     # ---------- Controles ----------
@@ -28,11 +36,14 @@ def SplashView(page: ft.Page):
         ),
     )
 
+    pulse_in(logo_img)
+
     title = ft.Text("Mindful+", size=30, weight=ft.FontWeight.W_700, color=INK)
+    loading_bar = shimmer_bar(width=160)
 
     # Columna centrada dentro de un contenedor expandido para asegurar centrado absoluto
     center_column = ft.Column(
-        [logo_img, title],
+        [logo_img, title, loading_bar],
         spacing=14,
         horizontal_alignment=ft.CrossAxisAlignment.CENTER,
         alignment=ft.MainAxisAlignment.CENTER,  # centra verticalmente la columna
@@ -73,39 +84,45 @@ def SplashView(page: ft.Page):
 
     page.on_resized = _on_resized
 
-    # ---------- Parpadeo suave ----------
-    stop_blink = {"v": False}
-
-    async def blink():
-        try:
-            while not stop_blink["v"]:
-                logo_img.opacity = 0.6
-                page.update()
-                await asyncio.sleep(0.42)
-                logo_img.opacity = 1.0
-                page.update()
-                await asyncio.sleep(0.42)
-        except Exception:
-            pass
-
     # ---------- Decidir ruta destino ----------
-    stored_user = None
-    try:
-        stored_user = page.client_storage.get("user")
-    except Exception:
-        pass
-    session_user = page.session.get("user")
-    target_route = "/home" if (session_user or stored_user) else "/"
+    def target_route(prefetched: dict | None) -> str:
+        prefetched = prefetched or {}
+        if not prefetched.get("uid"):
+            return "/"
+        return "/pro" if is_professional(prefetched.get("profile")) else "/home"
 
     async def boot():
-        task_blink = asyncio.create_task(blink())
-        await asyncio.sleep(1.1)
-        stop_blink["v"] = True
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        # Usuario, Firestore, perfil y diagnóstico de hoy en paralelo.
+        # Si rebasa el máximo seguimos sin esperar: la precarga termina sola
+        # y la vista destino la usa si alcanza a llegar.
+        task_prefetch = asyncio.create_task(prefetch_session(page))
+
+        # Un solo update: el pulso del logo lo anima Flutter
+        await asyncio.sleep(0.05)
         try:
-            await task_blink
+            reveal(page, logo_img)
         except Exception:
             pass
-        page.go(target_route)
+
+        prefetched = None
+        try:
+            prefetched = await asyncio.wait_for(asyncio.shield(task_prefetch), SPLASH_MAX_WAIT)
+        except asyncio.TimeoutError:
+            print(f"[Splash] precarga > {SPLASH_MAX_WAIT}s, navegando sin esperar")
+        except Exception as ex:
+            print(f"[Splash] precarga falló: {ex}")
+
+        remaining = SPLASH_MIN_DISPLAY - (loop.time() - started)
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+
+        if prefetched is None:
+            # Sin precarga: decidimos solo con el usuario guardado
+            prefetched = {"uid": (restore_user(page) or {}).get("uid")}
+        page.go(target_route(prefetched))
 
     try:
         page.run_task(boot)
@@ -7,7 +7,9 @@ from collections import defaultdict, Counter
 
 from components.app_header import AppHeader
 from theme import BG, INK, rounded_card, MUTED
+from ui_helpers import schedule_update
 from services.firebase_service import FirebaseService
+from services import read_snapshot
 from google.cloud.firestore_v1 import base_query as bq
 
 
@@ -62,32 +64,43 @@ def StatsView(page: ft.Page):
         return plot_to_base64(fig)
 
     # ---------- Cargar datos ----------
-    async def load_notes_data():
-        ref = fb.db.collection("users").document(uid).collection("notes")
+    # Fechas ISO para que el mismo dato sirva al snapshot; las gráficas usan todo lo
+    # leído y al dispositivo solo va la forma compacta (to_cache)
+    def fetch_stats() -> dict:
         date_limit = (today - timedelta(days=60)).astimezone(pytz.utc)
-        q = ref.where(filter=bq.FieldFilter("createdAt", ">=", date_limit))
-        docs = list(q.stream())
-        daily = defaultdict(int)
-        for d in docs:
+        user_ref = fb.db.collection("users").document(uid)
+
+        notes_daily = defaultdict(int)
+        q = user_ref.collection("notes").where(filter=bq.FieldFilter("createdAt", ">=", date_limit))
+        for d in q.stream():
             data = d.to_dict() or {}
             if data.get("createdAt"):
-                dt = data["createdAt"].astimezone(tz).date()
-                daily[dt] += 1
-        return daily
+                notes_daily[data["createdAt"].astimezone(tz).date().isoformat()] += 1
 
-    async def load_diagnostics_data():
-        ref = fb.db.collection("users").document(uid).collection("diagnostics")
-        date_limit = (today - timedelta(days=60)).astimezone(pytz.utc)
-        q = ref.where(filter=bq.FieldFilter("createdAt", ">=", date_limit))
-        docs = list(q.stream())
+        diagnostics = []
+        q = user_ref.collection("diagnostics").where(filter=bq.FieldFilter("createdAt", ">=", date_limit))
+        for d in q.stream():
+            data = d.to_dict() or {}
+            if data.get("createdAt"):
+                diagnostics.append({
+                    "date": data["createdAt"].astimezone(tz).date().isoformat(),
+                    "mood": str(data.get("mood", "")),
+                })
+        diagnostics.sort(key=lambda d: d["date"], reverse=True)
+        return {"notesDaily": dict(notes_daily), "diagnostics": diagnostics}
+
+    def stats_to_cache(raw: dict) -> dict:
+        return read_snapshot.compact_stats(raw["notesDaily"], raw["diagnostics"])
+
+    def notes_data_of(raw: dict) -> dict:
+        return {datetime.strptime(k, "%Y-%m-%d").date(): n for k, n in raw.get("notesDaily", {}).items()}
+
+    def diagnostics_data_of(raw: dict):
         daily = defaultdict(list)
         emotions = []
-        for d in docs:
-            data = d.to_dict() or {}
-            if not data.get("createdAt"):
-                continue
-            dt = data["createdAt"].astimezone(tz).date()
-            mood = str(data.get("mood", "")).capitalize()
+        for row in raw.get("diagnostics", []):
+            dt = datetime.strptime(row["date"], "%Y-%m-%d").date()
+            mood = str(row.get("mood", "")).capitalize()
             if mood:
                 emotions.append((dt, mood))
             score = 3
@@ -129,13 +142,37 @@ def StatsView(page: ft.Page):
     )
 
     # ---------- Lógica de carga ----------
+    painted = {"raw": None, "mode": None}
+
     async def load_and_update():
-        insights_txt.value = "Analizando tus datos 🌿"
-        page.update()
+        if painted["raw"] is None:
+            insights_txt.value = "Analizando tus datos 🌿"
+            schedule_update(page, insights_txt)
+        # Con snapshot las gráficas salen ya; la consulta al servidor las corrige después
+        try:
+            fresh = await read_snapshot.cached_then_fresh(
+                page, uid, "stats", render, fetch_stats, to_cache=stats_to_cache,
+            )
+        except Exception as ex:
+            insights_txt.value = f"No se pudieron cargar tus estadísticas: {ex}"
+            schedule_update(page, insights_txt)
+            return
+        if not fresh:
+            insights_txt.value += "\n(Sin conexión: datos guardados en este dispositivo)"
+            schedule_update(page, insights_txt)
+
+    def on_mode_change(_):
+        if painted["raw"] is not None:
+            render(painted["raw"], False)  # mismo dato, otra agrupación: no hace falta leer
+        else:
+            page.run_task(load_and_update)
 
-        notes_data, (mood_data, emotions_data) = await asyncio.gather(
-            load_notes_data(), load_diagnostics_data()
-        )
+    def render(raw: dict, stale: bool):
+        if painted["raw"] == raw and painted["mode"] == mode_dropdown.value:
+            return  # lo del servidor es igual a lo guardado: no se regeneran las gráficas
+        painted["raw"], painted["mode"] = raw, mode_dropdown.value
+        notes_data = notes_data_of(raw)
+        mood_data, emotions_data = diagnostics_data_of(raw)
 
         # mapa de emojis amigable
         emoji_map = {
@@ -224,9 +261,9 @@ def StatsView(page: ft.Page):
             f"📝 Notas totales: {total_notes}\n"
             f"{mood_txt}"
         )
-        page.update()
+        schedule_update(page, chart_notes, chart_mood, chart_emotions, insights_txt)
 
-    mode_dropdown.on_change = lambda e: page.run_task(load_and_update)
+    mode_dropdown.on_change = on_mode_change
 
     try:
         page.run_task(load_and_update)
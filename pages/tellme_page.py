@@ -1,18 +1,15 @@
 from components.app_header import AppHeader
 import os
-import json
 import threading
 import requests
 import flet as ft
 
 from theme import BG, INK, MUTED, rounded_card
-from ui_helpers import shell_header
-
-# Endpoint del modelo Gemini
-GEMINI_URL = (
-    "https://generativelanguage.googleapis.com/v1beta/models/"
-    "gemini-2.0-flash:generateContent"
-)
+from ui_helpers import shell_header, schedule_update
+from services.connectivity import get_connectivity
+from services.gemini_resilience import GeminiUnavailable
+from services.gemini_service import GeminiService
+from services.offline_queue import is_offline_error
 
 
 def TellMeView(page: ft.Page):
@@ -21,6 +18,9 @@ def TellMeView(page: ft.Page):
     Fluida y con memoria de contexto (últimos mensajes).
     """
 
+    connectivity = get_connectivity(page)
+    gem = GeminiService()
+
     # ---------- Sesión ----------
     sess_user = page.session.get("user") if page.session else None
     username = "amig@"
@@ -74,7 +74,7 @@ def TellMeView(page: ft.Page):
         )
 
         chat.controls.append(ft.Row([bubble], alignment=align))
-        page.update()
+        schedule_update(page, chat)
 
     # Burbuja de "escribiendo..."
     typing_row = ft.Row(
@@ -101,48 +101,22 @@ def TellMeView(page: ft.Page):
         api_key = os.getenv("GEMINI_API_KEY")
         if not api_key:
             return "⚠️ No se encontró la API key (.env)."
+        if connectivity.is_offline:
+            # Ya sabemos que no hay red: no hacemos esperar 25 s para decirlo
+            return "❌ No hay internet, el chat no está disponible por el momento."
 
-        # Prepara contexto (últimos 6 turnos)
-        recent_context = conversation_history[-6:]
-        context_text = ""
-        for role, msg in recent_context:
-            if role == "user":
-                context_text += f"Usuario: {msg}\n"
-            else:
-                context_text += f"Mindful+: {msg}\n"
-
-        # Instrucción de sistema
-        system_prompt = (
-            "Eres Mindful+, un acompañante emocional cálido y empático. "
-            "Responde con amabilidad, comprensión y sin juicios. "
-            "No te presentes en cada mensaje, solo continúa la conversación "
-            "como un amigo que recuerda lo anterior.\n\n"
-        )
-
-        headers = {"Content-Type": "application/json"}
-        url = f"{GEMINI_URL}?key={api_key}"
-        payload = {
-            "contents": [
-                {
-                    "parts": [
-                        {
-                            "text": system_prompt
-                            + context_text
-                            + f"Usuario: {prompt}\nMindful+:"
-                        }
-                    ]
-                }
-            ]
-        }
-
+        # Contexto: últimos 6 turnos. El circuito y el presupuesto de tiempo los
+        # pone GeminiService: si Gemini viene fallando, la respuesta es inmediata
         try:
-            r = requests.post(url, headers=headers, data=json.dumps(payload), timeout=25)
-            r.raise_for_status()
-            j = r.json()
-            return j["candidates"][0]["content"]["parts"][0]["text"]
-        except requests.exceptions.RequestException:
-            # Sin internet o problema de red
-            return "❌ No hay internet, el chat no está disponible por el momento."
+            return gem.chat_reply(conversation_history[-6:], prompt)
+        except GeminiUnavailable as e:
+            if is_offline_error(e.__cause__):
+                # Sin internet o problema de red
+                connectivity.report(False)
+                return "❌ No hay internet, el chat no está disponible por el momento."
+            return "💜 Mindful+ no está disponible en este momento; intenta de nuevo en un rato."
+        except requests.exceptions.RequestException as e:
+            return f"💜 Lo siento, el servicio no respondió bien: {e}"
         except Exception as e:
             return f"💜 Lo siento, hubo un error al procesar tu mensaje: {e}"
 
@@ -161,7 +135,7 @@ def TellMeView(page: ft.Page):
         input_field.disabled = True
         send_btn.disabled = True
         chat.controls.append(typing_row)
-        page.update()
+        schedule_update(page, chat, input_field, send_btn)
 
         # Hilo de procesamiento
         def task():
@@ -175,7 +149,7 @@ def TellMeView(page: ft.Page):
                 input_field.disabled = False
                 send_btn.disabled = False
                 input_field.focus()
-                page.update()
+                schedule_update(page, chat, input_field, send_btn)
 
             try:
                 page.invoke_later(finish)
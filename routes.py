@@ -0,0 +1,102 @@
+# routes.py
+import importlib
+import threading
+
+# Tabla de rutas: (ruta, exacta, "modulo:fabrica").
+# El orden importa: la primera coincidencia gana (p. ej. /pro/edit antes que /pro).
+# Los módulos de página se importan hasta que se visitan por primera vez.
+ROUTES = [
+    ("/splash", True, "pages.splash_view:SplashView"),
+    ("/", True, "pages.welcome_page:WelcomeView"),
+    ("/register", True, "pages.register_page:RegisterView"),
+    ("/login", True, "pages.login_page:LoginView"),
+    ("/home", True, "pages.home_page:HomeView"),
+    ("/diagnostic", True, "pages.diagnostic_page:DiagnosticView"),
+    ("/notes", False, "pages.notes_page:NotesView"),
+    ("/note_new", False, "pages.note_editor_page:NoteEditorView"),
+    ("/note_edit", False, "pages.note_editor_page:NoteEditorView"),
+    ("/recommendations", False, "pages.recommendations_page:RecommendationsView"),
+    ("/tellme", False, "pages.tellme_page:TellMeView"),
+    ("/pro/edit", False, "pages.pro_edit_profile_page:ProEditProfileView"),
+    ("/pro", False, "pages.pro_panel_page:ProPanelView"),
+    ("/help", False, "pages.help_page:HelpView"),
+    ("/stats", False, "pages.stats_page:StatsView"),
+]
+
+FALLBACK = "pages.welcome_page:WelcomeView"
+
+# Módulos pesados que conviene tener listos antes de que el usuario los pida.
+# Se precargan en segundo plano después del primer frame del splash.
+PRELOAD_MODULES = [
+    "services.firebase_service",
+    "pages.home_page",
+    "pages.login_page",
+    "pages.diagnostic_page",
+    "pages.notes_page",
+    "pages.note_editor_page",
+    "pages.recommendations_page",
+    "pages.tellme_page",
+    "pages.help_page",
+    "pages.pro_panel_page",
+    "pages.pro_edit_profile_page",
+    "pages.stats_page",  # matplotlib: el más lento, al final
+]
+
+_factories = {}
+_lock = threading.Lock()
+_preload_started = False
+
+
+def resolve(route: str) -> str:
+    """Devuelve el destino "modulo:fabrica" para una ruta (ignora el querystring)."""
+    path = (route or "/splash").split("?", 1)[0] or "/"
+    for prefix, exact, target in ROUTES:
+        if (path == prefix) if exact else path.startswith(prefix):
+            return target
+    return FALLBACK
+
+
+def load_factory(target: str):
+    """Importa (una sola vez) el módulo de la vista y regresa su fábrica."""
+    factory = _factories.get(target)
+    if factory is not None:
+        return factory
+    module_name, attr = target.split(":", 1)
+    try:
+        module = importlib.import_module(module_name)
+    except ModuleNotFoundError as ex:
+        # El bundle web (tools/web_bundle.py) no trae las páginas de solo servidor
+        if ex.name != module_name or target == FALLBACK:
+            raise
+        print(f"[Routes] {module_name} no está en este build; uso {FALLBACK}")
+        return load_factory(FALLBACK)
+    factory = getattr(module, attr)
+    with _lock:
+        _factories[target] = factory
+    return factory
+
+
+def build_view(page, route: str):
+    return load_factory(resolve(route))(page)
+
+
+def preload_heavy_modules(modules=None):
+    """
+    Importa en un hilo de fondo los módulos pesados (Firestore, matplotlib…),
+    para que la primera navegación a cada página no pague el costo de importación.
+    Solo corre una vez por proceso.
+    """
+    global _preload_started
+    with _lock:
+        if _preload_started:
+            return
+        _preload_started = True
+
+    def worker():
+        for name in modules or PRELOAD_MODULES:
+            try:
+                importlib.import_module(name)
+            except Exception as ex:
+                print(f"[Routes] No pude precargar {name}: {ex}")
+
+    threading.Thread(target=worker, daemon=True, name="preload-modules").start()
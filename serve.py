@@ -0,0 +1,99 @@
+# serve.py
+"""
+Arranca la app web en modo producción (asgi:app) con varios procesos.
+
+    python serve.py --workers 4 [--port 8000]
+        uvicorn --workers: un solo puerto, el kernel reparte las conexiones.
+        Sirve si el cliente nunca reconecta a otro proceso (una sola sesión por pestaña).
+
+    python serve.py --workers 4 --sticky [--port 8000]
+        Un proceso por puerto (8001..8004) y al frente nginx con hash consistente
+        por cookie (deploy/nginx.conf): un cliente siempre cae en el mismo worker,
+        también al reconectar el WebSocket. Se imprime el bloque upstream a usar.
+
+SIGTERM / Ctrl+C: cada worker deja de aceptar, espera hasta DRAIN_SECONDS a que
+terminen las peticiones abiertas y cierra las sesiones Flet.
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+
+DRAIN_SECONDS = int(os.getenv("DRAIN_SECONDS", "20"))
+
+
+def run_shared(args):
+    import uvicorn
+
+    uvicorn.run(
+        "asgi:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.drain,
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+        log_level=args.log_level,
+    )
+
+
+def run_sticky(args):
+    ports = [args.port + 1 + i for i in range(args.workers)]
+    print("upstream mindful_workers {")
+    print("    hash $sticky_key consistent;")
+    for port in ports:
+        print(f"    server 127.0.0.1:{port} max_fails=1 fail_timeout=5s;")
+    print("}")
+
+    procs = []
+    for port in ports:
+        cmd = [
+            sys.executable, "-m", "uvicorn", "asgi:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--timeout-graceful-shutdown", str(args.drain),
+            "--proxy-headers", "--forwarded-allow-ips", "*",
+            "--log-level", args.log_level,
+        ]
+        procs.append(subprocess.Popen(cmd))
+
+    def stop(signum, _frame):
+        print(f"[serve] señal {signum}: drenando {len(procs)} workers")
+        for p in procs:
+            if p.poll() is None:
+                p.send_signal(signal.SIGTERM)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # Si un worker muere solo, nginx lo saca del hash; los demás siguen atendiendo
+    for p in procs:
+        try:
+            p.wait()
+        except KeyboardInterrupt:
+            pass
+    for p in procs:
+        p.wait()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Sirve asgi:app con varios workers")
+    ap.add_argument("--workers", type=int, default=int(os.getenv("WEB_WORKERS", "2")))
+    ap.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    ap.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    ap.add_argument("--sticky", action="store_true", help="un puerto por worker, para nginx con hash")
+    ap.add_argument("--drain", type=int, default=DRAIN_SECONDS, help="segundos de gracia al apagar")
+    ap.add_argument("--log-level", default="warning")
+    args = ap.parse_args()
+
+    if not os.getenv("FLET_SECRET_KEY"):
+        print("[serve] Define FLET_SECRET_KEY (la misma para todos los workers)")
+
+    if args.sticky:
+        run_sticky(args)
+    else:
+        run_shared(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# services/account_cleanup.py
+"""
+Borrado en cascada de los datos de un usuario con Firestore BulkWriter.
+
+- Cada subcolección se recorre por páginas con cursor (solo ids, select([])) y los
+  borrados se encolan en el BulkWriter, que agrupa, manda en paralelo y se auto-limita
+  (rampa 500/50/5).
+- Antes de empezar se marca el perfil con deletion.status = "in_progress"; el perfil
+  se borra al final. Si el proceso se corta, volver a llamar retoma donde quedó
+  (los borrados son idempotentes) y pending_deletions() lista los que faltan.
+
+Uso desde consola (con keys.json disponible):
+    python -m services.account_cleanup <uid> [--keep-profile] [--auth]
+    python -m services.account_cleanup --resume
+"""
+import os
+from datetime import datetime, timezone
+
+from services.journal_io import SUBCOLLECTIONS, iter_collection
+
+PAGE_SIZE = 500
+# Techo del BulkWriter: arranca en 500 ops/s y sube 50% cada 5 min hasta este valor
+MAX_OPS_PER_SECOND = int(os.getenv("CLEANUP_MAX_OPS_PER_SECOND", "2000"))
+MAX_RETRIES = 5
+
+
+def _bulk_writer(db):
+    try:
+        from google.cloud.firestore_v1.bulk_writer import BulkWriterOptions
+        options = BulkWriterOptions(initial_ops_per_second=500, max_ops_per_second=MAX_OPS_PER_SECOND)
+    except ImportError:
+        options = None
+    writer = db.bulk_writer(options) if options else db.bulk_writer()
+
+    def on_error(failure, _writer) -> bool:
+        # True = reintentar (BulkWriter aplica backoff exponencial)
+        if failure.attempts < MAX_RETRIES:
+            return True
+        print(f"[AccountCleanup] no se pudo borrar {failure.operation.reference.path}: {failure.message}")
+        return False
+
+    writer.on_write_error(on_error)
+    return writer
+
+
+def delete_collection(db, coll_ref, page_size: int = PAGE_SIZE, on_progress=None, writer=None) -> int:
+    """
+    Vacía una colección completa. Las páginas (solo ids) se leen con cursor mientras
+    el BulkWriter sigue borrando las anteriores en segundo plano; flush al final.
+    Regresa cuántos documentos se mandaron a borrar.
+    """
+    own_writer = writer is None
+    writer = writer or _bulk_writer(db)
+    deleted = 0
+    try:
+        for snap in iter_collection(coll_ref.select([]), page_size=page_size):
+            writer.delete(snap.reference)
+            deleted += 1
+            if on_progress and deleted % page_size == 0:
+                on_progress(coll_ref.id, deleted)
+        writer.flush()
+        if on_progress and deleted % page_size:
+            on_progress(coll_ref.id, deleted)
+    finally:
+        if own_writer:
+            writer.close()
+    return deleted
+
+
+def forget_user(uid: str, page=None):
+    """
+    Lo que este proceso guarda del usuario: perfil en caché e índice de notas; con
+    `page`, también el snapshot de lecturas del dispositivo.
+    """
+    from services import profile_cache, read_snapshot
+    from services.notes_index import reset_notes_index
+
+    profile_cache.invalidate_profile(uid)
+    reset_notes_index(uid)
+    if page is not None:
+        read_snapshot.clear(page, uid)
+
+
+def delete_user_data(fb, uid: str, include_profile: bool = True, on_progress=None, page=None) -> dict:
+    """
+    Borra notas, diagnósticos, recomendaciones (y cualquier otra subcolección del
+    usuario) y, al final, el documento de perfil. Regresa {colección: borrados}.
+    Después olvida las copias locales (forget_user) para no seguir sirviendo el
+    perfil borrado hasta que caduque la caché.
+    """
+    user_ref = fb.db.collection("users").document(uid)
+    if user_ref.get().exists:
+        user_ref.set(
+            {"deletion": {"status": "in_progress", "startedAt": datetime.now(timezone.utc)}},
+            merge=True,
+        )
+
+    names = list(SUBCOLLECTIONS)
+    try:
+        names += [c.id for c in user_ref.collections() if c.id not in names]
+    except Exception as ex:
+        print(f"[AccountCleanup] no pude listar subcolecciones: {ex}")
+
+    counts = {}
+    writer = _bulk_writer(fb.db)
+    try:
+        for name in names:
+            counts[name] = delete_collection(fb.db, user_ref.collection(name), on_progress=on_progress, writer=writer)
+        if include_profile:
+            writer.delete(user_ref)
+            writer.flush()
+        elif user_ref.get().exists:
+            user_ref.set({"deletion": {"status": "done"}}, merge=True)
+    finally:
+        writer.close()
+
+    forget_user(uid, page)
+    return counts
+
+
+def pending_deletions(fb) -> list[str]:
+    """uids con un borrado que empezó y no terminó."""
+    q = fb.db.collection("users").where("deletion.status", "==", "in_progress")
+    return [d.id for d in q.select([]).stream()]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from services.firebase_service import FirebaseService
+
+    ap = argparse.ArgumentParser(description="Borra en cascada los datos de un usuario")
+    ap.add_argument("uid", nargs="?")
+    ap.add_argument("--keep-profile", action="store_true", help="no borrar el documento users/<uid>")
+    ap.add_argument("--auth", action="store_true", help="borrar también la cuenta de Firebase Auth")
+    ap.add_argument("--resume", action="store_true", help="terminar los borrados interrumpidos")
+    args = ap.parse_args()
+
+    fb = FirebaseService()
+    uids = pending_deletions(fb) if args.resume else [args.uid]
+    progress = lambda name, n: print(f"[AccountCleanup] {name}: {n}")  # noqa: E731
+    for uid in filter(None, uids):
+        if args.auth:
+            print(uid, fb.delete_account(uid))
+        else:
+            print(uid, delete_user_data(fb, uid, include_profile=not args.keep_profile, on_progress=progress))
@@ -0,0 +1,215 @@
+# services/background_jobs.py
+"""
+Trabajos en segundo plano que no deben bloquear a la persona usuaria, con
+reintentos y espera creciente. Uno por proceso (get_background_jobs()): un hilo
+con su propio loop, como el PollCoordinator, y como mucho MAX_CONCURRENCY
+trabajos a la vez. Cada trabajo tiene una clave; si ya hay uno con esa clave en
+curso, el segundo submit no hace nada.
+
+El que usa la app es la frase del día: después de que el diagnóstico ya se
+guardó, aquí se pide a Gemini, se escribe con update_diagnostic y se publica en
+el tema pubsub "phrase:<uid>" para que HomeView la pinte sin recargar.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+
+MAX_CONCURRENCY = int(os.getenv("BACKGROUND_JOBS_CONCURRENCY", "4"))
+RETRY_BACKOFF = (2, 8, 30)  # segundos antes de cada reintento (más jitter)
+
+FALLBACK_PHRASE = "Sigue adelante: cada paso cuenta."
+SPECULATIVE_WAIT = 25.0  # lo más que se espera una frase especulativa aún en curso
+PHRASE_MODEL = "gemini-2.0-flash"
+
+
+class BackgroundJobs:
+    def __init__(self, max_concurrency: int = MAX_CONCURRENCY, backoff=RETRY_BACKOFF):
+        self.max_concurrency = max_concurrency
+        self.backoff = backoff
+        self.completed = 0
+        self.failed = 0
+        self.attempts = 0
+
+        self._active: set[str] = set()
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._started = False
+        self._loop = None
+        self._sem = None
+        self._ready = threading.Event()
+
+    # ---------- API ----------
+    def submit(self, key: str, fn, *args, on_done=None, on_failed=None) -> bool:
+        """
+        fn(*args) (bloqueante) en un hilo, con reintentos. on_done(resultado) o
+        on_failed(excepción) se llaman desde el hilo de trabajos. False si ya había
+        un trabajo con esa clave.
+        """
+        with self._lock:
+            if key in self._active:
+                return False
+            self._active.add(key)
+        self._ensure_started()
+        self._ready.wait()
+        self._loop.call_soon_threadsafe(
+            lambda: self._loop.create_task(self._run_job(key, fn, args, on_done, on_failed))
+        )
+        return True
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._active)
+
+    def drain(self, timeout: float | None = None) -> bool:
+        """Espera a que terminen los trabajos en curso (al apagar el worker). True si terminaron."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._active:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    # ---------- hilo de fondo ----------
+    def _ensure_started(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            threading.Thread(target=self._run, daemon=True, name="background-jobs").start()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._sem = asyncio.Semaphore(self.max_concurrency)
+        self._ready.set()
+        self._loop.run_forever()
+
+    async def _run_job(self, key, fn, args, on_done, on_failed):
+        try:
+            async with self._sem:
+                for attempt in range(len(self.backoff) + 1):
+                    self.attempts += 1
+                    try:
+                        result = await asyncio.to_thread(fn, *args)
+                    except Exception as ex:
+                        if attempt == len(self.backoff):
+                            self.failed += 1
+                            print(f"[Jobs] {key} falló tras {attempt + 1} intentos: {ex}")
+                            self._call(on_failed, ex)
+                            return
+                        delay = self.backoff[attempt] * (1 + random.random() * 0.25)
+                        print(f"[Jobs] {key} intento {attempt + 1} falló ({ex}); reintento en {delay:.1f}s")
+                        await asyncio.sleep(delay)
+                    else:
+                        self.completed += 1
+                        self._call(on_done, result)
+                        return
+        finally:
+            with self._idle:
+                self._active.discard(key)
+                self._idle.notify_all()
+
+    @staticmethod
+    def _call(cb, *args):
+        if cb is None:
+            return
+        try:
+            cb(*args)
+        except Exception as ex:
+            print(f"[Jobs] callback: {ex}")
+
+
+_jobs = None
+_jobs_lock = threading.Lock()
+
+
+def get_background_jobs() -> BackgroundJobs:
+    global _jobs
+    with _jobs_lock:
+        if _jobs is None:
+            _jobs = BackgroundJobs()
+        return _jobs
+
+
+def shutdown_jobs(timeout: float = 10.0) -> bool:
+    """Al apagar el worker ASGI: da tiempo a que terminen las frases en curso."""
+    return _jobs.drain(timeout) if _jobs is not None else True
+
+
+# ---------- frase del día ----------
+def phrase_topic(uid: str) -> str:
+    return f"phrase:{uid}"
+
+
+def _generate_phrase(fb, gem, uid: str, diagnostic_id: str, inputs: dict | None, speculative=None) -> str | None:
+    phrase = None
+    if speculative is not None:
+        # Frase pedida mientras se llenaba el formulario (services.phrase_prefetch)
+        try:
+            phrase = speculative.result(timeout=SPECULATIVE_WAIT)
+        except Exception as ex:
+            print(f"[Jobs] frase especulativa descartada: {ex}")
+    if phrase:
+        fb.update_diagnostic(uid, diagnostic_id, {"phrase": phrase, "phraseChars": len(phrase), "model": PHRASE_MODEL})
+        return phrase
+    if inputs is None:
+        # Sin datos a la mano (Home, reinicio del proceso): se leen del diagnóstico
+        doc = fb.get_diagnostic(uid, diagnostic_id)
+        if not doc:
+            return None
+        if doc.get("phrase"):
+            return doc["phrase"]  # otro proceso ya la escribió
+        inputs = doc
+    phrase = gem.phrase_for_diagnostic(
+        inputs.get("diagnosis"),
+        inputs.get("emotions") or [],
+        inputs.get("dayTags") or [],
+        inputs.get("note"),
+        120,
+    )
+    fb.update_diagnostic(uid, diagnostic_id, {"phrase": phrase, "phraseChars": len(phrase), "model": PHRASE_MODEL})
+    return phrase
+
+
+def submit_phrase(page, uid: str, diagnostic_id: str, inputs: dict | None = None, fb=None, gem=None,
+                  speculative=None) -> bool:
+    """
+    Genera y guarda la frase del diagnóstico en segundo plano y la publica en
+    phrase_topic(uid). inputs = {"diagnosis", "emotions", "dayTags", "note"};
+    None = leerlos del documento. speculative: Future con la frase ya pedida
+    para estas entradas (si falla, se llama a Gemini como siempre). Si Gemini falla en todos los intentos se guarda
+    FALLBACK_PHRASE para que el resumen de hoy no se quede en "pendiente".
+    """
+    if fb is None:
+        from services.firebase_service import FirebaseService
+        fb = FirebaseService()
+    if gem is None:
+        from services.gemini_service import GeminiService
+        gem = GeminiService()
+    pubsub = page.pubsub
+
+    def publish(phrase):
+        if phrase:
+            try:
+                pubsub.send_all_on_topic(phrase_topic(uid), {"diagnosticId": diagnostic_id, "phrase": phrase})
+            except Exception as ex:
+                print(f"[Jobs] pubsub: {ex}")
+
+    def on_failed(_ex):
+        try:
+            fb.update_diagnostic(uid, diagnostic_id, {"phrase": FALLBACK_PHRASE, "phraseChars": len(FALLBACK_PHRASE)})
+        except Exception as ex:
+            print(f"[Jobs] frase de respaldo: {ex}")
+            return
+        publish(FALLBACK_PHRASE)
+
+    return get_background_jobs().submit(
+        f"phrase:{uid}:{diagnostic_id}",
+        _generate_phrase, fb, gem, uid, diagnostic_id, inputs, speculative,
+        on_done=publish, on_failed=on_failed,
+    )
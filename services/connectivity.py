@@ -0,0 +1,213 @@
+# services/connectivity.py
+"""
+Estado de red de una sesión: online / degraded / offline.
+
+Se alimenta de:
+  - page.on_connect / page.on_disconnect (el cliente perdió o recuperó la conexión)
+  - el resultado de las llamadas recientes a Firestore/Gemini (report / run)
+  - una sonda barata (conexión TCP al host de Firestore) mientras estamos offline,
+    con espera creciente entre intentos
+
+Con eso:
+  - offline: run() no espera nada, lanza OfflineError y la vista encola la escritura
+  - online: el timeout sale de la latencia observada (4 × p90, entre 25 % y 100 %
+    del base). Con red rápida una caída se detecta en ~2 s y no en 8
+  - degraded: se espera el base completo. Una llamada cortada por el timeout
+    adaptativo cuenta como muestra lenta (a ese timeout), no como falla: solo la
+    sonda o los timeouts con el base completo llevan a offline, nunca la pura
+    lentitud
+
+Un monitor por página: get_connectivity(page).
+"""
+import asyncio
+import os
+import socket
+import sys
+import threading
+import time
+from collections import deque
+
+ONLINE, DEGRADED, OFFLINE = "online", "degraded", "offline"
+
+PROBE_HOST = os.getenv("CONNECTIVITY_PROBE_HOST", "firestore.googleapis.com")
+PROBE_TIMEOUT = 1.5
+PROBE_BACKOFF = (2, 4, 8, 15, 30)  # segundos entre sondas mientras estamos offline
+
+WINDOW = 8                 # resultados recientes que se consideran
+SLOW_RPC = 2.5             # segundos: una respuesta más lenta marca degraded
+OFFLINE_AFTER = 2          # fallas de red seguidas para pasar a offline
+MIN_TIMEOUT_RATIO = 0.25   # el timeout adaptativo nunca baja de base × esto
+
+_MONITOR_KEY = "__mindful_connectivity__"
+
+
+class OfflineError(ConnectionError):
+    """Sin red (ya sabida o detectada por timeout): la escritura va a la cola offline."""
+
+
+def tcp_probe(host: str = PROBE_HOST, timeout: float = PROBE_TIMEOUT) -> bool | None:
+    """True/False si hay ruta al backend; None si aquí no se puede probar (Pyodide no tiene sockets)."""
+    if sys.platform == "emscripten":
+        return None
+    try:
+        with socket.create_connection((host, 443), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+class ConnectivityMonitor:
+    def __init__(self, probe=tcp_probe, backoff=PROBE_BACKOFF):
+        self.probe = probe
+        self.backoff = backoff
+        self.state = ONLINE
+        self._outcomes = deque(maxlen=WINDOW)   # (ok, latency | None)
+        self._failures = 0                       # fallas de red seguidas
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._probe_timer = None
+        self._probe_attempt = 0
+
+    # ---------- consulta ----------
+    @property
+    def is_offline(self) -> bool:
+        return self.state == OFFLINE
+
+    def timeout(self, base: float) -> float:
+        """Timeout para una llamada cuyo límite "normal" es base."""
+        with self._lock:
+            if self.state == DEGRADED:
+                return base
+            # También las llamadas cortadas, con el timeout que usaron: así crece
+            latencies = sorted(lat for _, lat in self._outcomes if lat is not None)
+        if len(latencies) < 3:
+            return base
+        p90 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.9))]
+        return min(base, max(base * MIN_TIMEOUT_RATIO, 4 * p90))
+
+    # ---------- entradas ----------
+    def on_change(self, callback):
+        """callback(anterior, nuevo); se llama desde el hilo que detectó el cambio."""
+        self._listeners.append(callback)
+
+    def set_connected(self, connected: bool):
+        """page.on_connect / page.on_disconnect."""
+        if connected:
+            # Reconectó el cliente: confirmamos con la sonda antes de volver a online
+            self._start(threading.Thread(target=self._probe_now, daemon=True))
+        else:
+            self._set(OFFLINE)
+
+    def report(self, ok: bool, latency: float | None = None, conclusive: bool = True):
+        """
+        Resultado de una llamada de red (ok=False solo para errores de red/timeout).
+        conclusive=False: se cortó antes del base, pudo ser solo lentitud; marca
+        degraded pero no cuenta para OFFLINE_AFTER.
+        """
+        with self._lock:
+            self._outcomes.append((ok, latency))
+            if ok:
+                self._failures = 0
+            elif conclusive:
+                self._failures += 1
+            recent_failures = sum(1 for o, _ in self._outcomes if not o)
+            if self._failures >= OFFLINE_AFTER:
+                new = OFFLINE
+            elif not ok or recent_failures * 4 > len(self._outcomes) or (latency or 0) > SLOW_RPC:
+                new = DEGRADED
+            else:
+                new = ONLINE
+        self._set(new)
+
+    async def run(self, fn, *args, base_timeout: float = 8.0):
+        """
+        fn(*args) en un hilo con el timeout adaptativo. Offline -> OfflineError sin
+        intentar; timeout o error de red -> se registra y sale como OfflineError.
+        Otros errores (permisos, datos) suben tal cual.
+        """
+        from services.offline_queue import is_offline_error
+
+        if self.is_offline:
+            raise OfflineError("sin conexión")
+        limit = self.timeout(base_timeout)
+        t0 = time.monotonic()
+        try:
+            result = await asyncio.wait_for(asyncio.to_thread(fn, *args), timeout=limit)
+        except Exception as ex:
+            if is_offline_error(ex):
+                if isinstance(ex, (asyncio.TimeoutError, TimeoutError)) and limit < base_timeout:
+                    # Lenta o caída: lo confirma la sonda; la siguiente espera el base
+                    self.report(False, limit, conclusive=False)
+                    self._start(threading.Thread(target=self._confirm_route, daemon=True))
+                else:
+                    self.report(False)
+                raise OfflineError(str(ex) or "timeout") from ex
+            raise
+        self.report(True, time.monotonic() - t0)
+        return result
+
+    # ---------- internos ----------
+    def _set(self, new: str):
+        with self._lock:
+            old, self.state = self.state, new
+        if old == new:
+            return
+        print(f"[Connectivity] {old} -> {new}")
+        if new == OFFLINE:
+            self._probe_attempt = 0
+            self._schedule_probe()
+        for cb in list(self._listeners):
+            try:
+                cb(old, new)
+            except Exception as ex:
+                print(f"[Connectivity] listener: {ex}")
+
+    def _schedule_probe(self):
+        if self._probe_timer is not None:
+            self._probe_timer.cancel()
+        delay = self.backoff[min(self._probe_attempt, len(self.backoff) - 1)]
+        self._probe_timer = threading.Timer(delay, self._probe_now)
+        self._probe_timer.daemon = True
+        self._start(self._probe_timer)
+
+    def _start(self, thread: threading.Thread):
+        try:
+            thread.start()
+        except RuntimeError:
+            # Sin hilos (Pyodide): la sonda no puede probar nada, se resuelve ya
+            self._probe_now()
+
+    def _probe_now(self):
+        result = self.probe()
+        if result is None:
+            # No se puede sondear: lo decide la siguiente llamada real
+            with self._lock:
+                self._failures = 0
+            self._set(DEGRADED if self.state == OFFLINE else self.state)
+        elif result:
+            with self._lock:
+                self._failures = 0
+                self._outcomes.clear()
+            self._set(ONLINE)
+        elif self.state == OFFLINE:
+            self._probe_attempt += 1
+            self._schedule_probe()
+        else:
+            self._set(OFFLINE)
+
+    def _confirm_route(self):
+        """Tras un timeout recortado: si la sonda no llega al backend, offline; si llega, era lentitud."""
+        if self.probe() is False and self.state != OFFLINE:
+            self._set(OFFLINE)
+
+    def close(self):
+        if self._probe_timer is not None:
+            self._probe_timer.cancel()
+
+
+def get_connectivity(page) -> ConnectivityMonitor:
+    monitor = getattr(page, _MONITOR_KEY, None)
+    if monitor is None:
+        monitor = ConnectivityMonitor()
+        setattr(page, _MONITOR_KEY, monitor)
+    return monitor
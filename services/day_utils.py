@@ -0,0 +1,24 @@
+# services/day_utils.py
+from datetime import datetime, timedelta
+import pytz
+
+# Todas las "fechas del día" de la app se calculan en hora de CDMX
+TZ_NAME = "America/Mexico_City"
+
+
+def local_tz():
+    return pytz.timezone(TZ_NAME)
+
+
+def today_key() -> str:
+    """Fecha local de hoy como 'YYYY-MM-DD'."""
+    return datetime.now(local_tz()).strftime("%Y-%m-%d")
+
+
+def day_bounds_utc(date_key: str | None = None):
+    """Inicio y fin (UTC) del día local indicado; por defecto, hoy."""
+    tz = local_tz()
+    year, month, day = map(int, (date_key or today_key()).split("-"))
+    start_local = tz.localize(datetime(year, month, day, 0, 0, 0))
+    end_local = start_local + timedelta(days=1)
+    return start_local.astimezone(pytz.utc), end_local.astimezone(pytz.utc)
@@ -1,13 +1,19 @@
 import os
 import json
+import uuid
 import requests
 from typing import Optional, Tuple, Dict, Any
 
 import firebase_admin
 from firebase_admin import credentials, firestore, auth as admin_auth
 from firebase_admin import firestore as admin_fs
+
 from typing import Optional, Tuple, Dict, Any
 
+from services import notes_index, profile_cache
+from services.single_flight import shared
+from services.day_utils import today_key, day_bounds_utc
+
 
 
 class FirebaseService:
@@ -17,7 +23,8 @@ class FirebaseService:
         {
           "firebase_web_api_key": "AAAA....",
           "firebase_project_id": "tu-proyecto",
-          "firebase_admin_creds_path": "serviceAccount.json"
+          "firebase_admin_creds_path": "serviceAccount.json",
+          "firebase_storage_bucket": "tu-proyecto.appspot.com"   (opcional)
         }
         """
         candidates = [config_path, "keys.json", "keys/keys.json", "components/keys/keys.json"]
@@ -36,6 +43,9 @@ class FirebaseService:
         self.api_key: str = cfg["firebase_web_api_key"]
         self.project_id: str = cfg["firebase_project_id"]
         self.creds_path: str = cfg["firebase_admin_creds_path"]
+        self.storage_bucket: str = (
+            cfg.get("firebase_storage_bucket") or os.getenv("FIREBASE_STORAGE_BUCKET") or f"{self.project_id}.appspot.com"
+        )
 
         if not os.path.exists(self.creds_path):
             raise FileNotFoundError(f"No encuentro el service account en: {self.creds_path}")
@@ -101,7 +111,9 @@ class FirebaseService:
             {"email": email, "username": username, "type": "normal", "createdAt": firestore.SERVER_TIMESTAMP},
             merge=True,
         )
+        profile_cache.invalidate_profile(uid)
 
+    @shared("get_user_profile")
     def get_user_profile(self, uid: str) -> Optional[dict]:
         doc = self.db.collection("users").document(uid).get()
         return doc.to_dict() if doc.exists else None
@@ -130,13 +142,36 @@ class FirebaseService:
         if photo_url:
             payload["professional"]["photoUrl"] = photo_url
         doc_ref.set(payload, merge=True)
+        profile_cache.invalidate_profile(uid)
 
     # Dentro de class FirebaseService: (agrega estos métodos si no existen)
 
     def update_user_photo(self, uid: str, photo_url: str):
         """Actualiza professional.photoUrl (no toca otros campos)."""
         doc_ref = self.db.collection("users").document(uid)
-        doc_ref.set({"professional": {"photoUrl": photo_url}}, merge=True)
+        payload = {"professional": {"photoUrl": photo_url}}
+        doc_ref.set(payload, merge=True)
+        profile_cache.merge_profile(uid, payload)
+
+    def upload_public_file(self, path: str, data: bytes, content_type: str) -> str:
+        """
+        Sube a Firebase Storage (si el objeto no existe ya) y regresa su URL de
+        descarga con token, igual que getDownloadURL() del SDK web: sirve desde
+        cualquier equipo y no depende de este servidor.
+        """
+        from firebase_admin import storage
+
+        bucket = storage.bucket(self.storage_bucket)
+        blob = bucket.get_blob(path)
+        token = ((blob.metadata or {}).get("firebaseStorageDownloadTokens") or "").split(",")[0] if blob else ""
+        if not token:
+            token = uuid.uuid4().hex
+            blob = bucket.blob(path)
+            blob.metadata = {"firebaseStorageDownloadTokens": token}
+            blob.cache_control = "public, max-age=31536000, immutable"
+            blob.upload_from_string(data, content_type=content_type)
+        quoted = requests.utils.quote(path, safe="")
+        return f"https://firebasestorage.googleapis.com/v0/b/{bucket.name}/o/{quoted}?alt=media&token={token}"
 
     def update_professional_profile(self, uid: str, data: dict):
         """
@@ -149,6 +184,8 @@ class FirebaseService:
         for k, v in data.items():
             payload["professional"][k] = v
         doc_ref.set(payload, merge=True)
+        # Misma escritura sobre la caché: /pro no necesita releer el perfil
+        profile_cache.merge_profile(uid, payload)
 
 
 
@@ -156,54 +193,228 @@ class FirebaseService:
     def diagnostics_collection(self, uid: str):
         return self.db.collection("users").document(uid).collection("diagnostics")
 
-    def add_diagnostic(self, uid: str, data: dict) -> str:
+    @staticmethod
+    def new_doc_id() -> str:
+        """Id de documento generado aquí: reintentar el mismo alta no la duplica."""
+        return uuid.uuid4().hex[:20]
+
+    def add_diagnostic(self, uid: str, data: dict, diagnostic_id: str | None = None) -> str:
+        """Guarda el diagnóstico y, en el mismo batch, el resumen `today` del perfil."""
         doc = {**data, "createdAt": admin_fs.SERVER_TIMESTAMP}
-        doc_ref = self.diagnostics_collection(uid).add(doc)[1]
+        doc_ref = self.diagnostics_collection(uid).document(diagnostic_id)
+        batch = self.db.batch()
+        batch.set(doc_ref, doc)
+        batch.set(self.db.collection("users").document(uid), {"today": self._today_summary(doc_ref.id, data)}, merge=True)
+        batch.commit()
+        profile_cache.invalidate_profile(uid)
         return doc_ref.id
 
     def update_diagnostic(self, uid: str, diagnostic_id: str, data: dict):
-        self.diagnostics_collection(uid).document(diagnostic_id).update(data)
+        diag_ref = self.diagnostics_collection(uid).document(diagnostic_id)
+        summary_keys = [k for k in ("diagnosis", "score", "phrase") if k in data]
+        if not summary_keys:
+            diag_ref.update(data)
+            return
+
+        user_ref = self.db.collection("users").document(uid)
+
+        @firestore.transactional
+        def run(tx):
+            # Solo se toca `today` si el resumen apunta a este diagnóstico
+            snap = user_ref.get(transaction=tx)
+            today = self.today_summary(snap.to_dict() if snap.exists else None)
+            tx.update(diag_ref, data)
+            if today and today.get("diagnosticId") == diagnostic_id:
+                patch = {f"today.{k}": data[k] for k in summary_keys}
+                if "phrase" in data:
+                    patch["today.phraseStatus"] = "ready" if data["phrase"] else "pending"
+                patch["today.updatedAt"] = admin_fs.SERVER_TIMESTAMP
+                tx.update(user_ref, patch)
+
+        run(self.db.transaction())
+        profile_cache.invalidate_profile(uid)
+
+    def delete_diagnostic(self, uid: str, diagnostic_id: str):
+        """
+        Borra el diagnóstico; si era el del resumen `today`, el resumen pasa al anterior
+        diagnóstico de hoy (o queda vacío si no hay otro).
+        """
+        diag_ref = self.diagnostics_collection(uid).document(diagnostic_id)
+        user_ref = self.db.collection("users").document(uid)
+        start_utc, end_utc = day_bounds_utc()
+        # Los dos más recientes del día: si uno es el que se borra, el otro es el nuevo resumen
+        latest_q = (self.diagnostics_collection(uid)
+            .where("createdAt", ">=", start_utc)
+            .where("createdAt", "<", end_utc)
+            .order_by("createdAt", direction=firestore.Query.DESCENDING)
+            .limit(2))
+
+        @firestore.transactional
+        def run(tx):
+            # En una transacción todas las lecturas van antes de las escrituras
+            snap = user_ref.get(transaction=tx)
+            today = self.today_summary(snap.to_dict() if snap.exists else None)
+            if not (today and today.get("diagnosticId") == diagnostic_id):
+                tx.delete(diag_ref)
+                return
+            previous = next((d for d in tx.get(latest_q) if d.id != diagnostic_id), None)
+            tx.delete(diag_ref)
+            if previous is not None:
+                tx.update(user_ref, {"today": self._today_summary(previous.id, previous.to_dict() or {})})
+            else:
+                tx.update(user_ref, {"today": self._today_summary(None, {})})
+
+        run(self.db.transaction())
+        profile_cache.invalidate_profile(uid)
+
+    @shared("get_diagnostic")
+    def get_diagnostic(self, uid: str, diagnostic_id: str) -> Optional[dict]:
+        d = self.diagnostics_collection(uid).document(diagnostic_id).get()
+        return ({**d.to_dict(), "id": d.id} if d.exists else None)
+
+    @shared("latest_diagnostic_between")
+    def latest_diagnostic_between(self, uid: str, start_utc, end_utc) -> Optional[dict]:
+        """Último diagnóstico creado en el rango [start_utc, end_utc)."""
+        q = (self.diagnostics_collection(uid)
+            .where("createdAt", ">=", start_utc)
+            .where("createdAt", "<", end_utc)
+            .order_by("createdAt", direction=firestore.Query.DESCENDING)
+            .limit(1))
+        docs = list(q.stream())
+        return ({**(docs[0].to_dict() or {}), "id": docs[0].id} if docs else None)
+
+    # ---------- RESUMEN DE HOY (users/<uid>.today) ----------
+    # Copia chica del último diagnóstico del día para que Home no tenga que consultar
+    # la colección: {dateKey, diagnosticId, diagnosis, score, phrase, phraseStatus}
+    def _today_summary(self, diagnostic_id: Optional[str], data: dict) -> dict:
+        phrase = data.get("phrase")
+        return {
+            "dateKey": today_key(),
+            "diagnosticId": diagnostic_id,
+            "diagnosis": data.get("diagnosis"),
+            "score": data.get("score"),
+            "phrase": phrase,
+            "phraseStatus": "ready" if phrase else ("pending" if diagnostic_id else "none"),
+            "updatedAt": admin_fs.SERVER_TIMESTAMP,
+        }
+
+    @staticmethod
+    def today_summary(profile: Optional[dict]) -> Optional[dict]:
+        """El resumen `today` del perfil, solo si es de hoy (si no, None)."""
+        today = (profile or {}).get("today")
+        if isinstance(today, dict) and today.get("dateKey") == today_key():
+            return today
+        return None
+
+    def get_today_summary(self, uid: str) -> Optional[dict]:
+        """Una lectura puntual del perfil."""
+        return self.today_summary(self.get_user_profile(uid))
 
+    @shared("backfill_today_summary")
+    def backfill_today_summary(self, uid: str) -> dict:
+        """
+        Para perfiles sin resumen de hoy (datos previos o día nuevo): consulta una vez
+        el último diagnóstico del día y deja el resumen escrito (aunque no haya ninguno),
+        así el resto del día Home solo hace lecturas puntuales.
+        """
+        start_utc, end_utc = day_bounds_utc()
+        doc = self.latest_diagnostic_between(uid, start_utc, end_utc)
+        summary = self._today_summary(doc["id"] if doc else None, doc or {})
+        self.db.collection("users").document(uid).set({"today": summary}, merge=True)
+        profile_cache.invalidate_profile(uid)
+        return summary
+
+    @shared("list_diagnostics")
     def list_diagnostics(self, uid: str, limit: int = 30):
         q = self.diagnostics_collection(uid).order_by(
             "createdAt", direction=firestore.Query.DESCENDING
         ).limit(limit)
         return [{**doc.to_dict(), "id": doc.id} for doc in q.stream()]
 
+    @shared("list_diagnostics_between")
+    def list_diagnostics_between(self, uid: str, start_utc, end_utc, limit: int = 3):
+        """Diagnósticos creados en [start_utc, end_utc), del más reciente al más viejo."""
+        q = (self.diagnostics_collection(uid)
+            .where("createdAt", ">=", start_utc)
+            .where("createdAt", "<", end_utc)
+            .order_by("createdAt", direction=firestore.Query.DESCENDING)
+            .limit(limit))
+        return [{**(doc.to_dict() or {}), "id": doc.id} for doc in q.stream()]
+
     # ---------- NOTES ----------
     def notes_collection(self, uid: str):
         return self.db.collection("users").document(uid).collection("notes")
 
-    def add_note(self, uid: str, title: str, content: str) -> str:
+    def add_note(self, uid: str, title: str, content: str, note_id: str | None = None) -> str:
         doc = {
             "title": title.strip()[:80] or "Sin título",
             "content": content.strip()[:4000],
             "createdAt": admin_fs.SERVER_TIMESTAMP,
             "updatedAt": admin_fs.SERVER_TIMESTAMP,
         }
-        ref = self.notes_collection(uid).add(doc)[1]
+        ref = self.notes_collection(uid).document(note_id)
+        ref.set(doc)
+        notes_index.on_note_saved(uid, ref.id, doc["title"], doc["content"])
         return ref.id
 
     def update_note(self, uid: str, note_id: str, title: str, content: str):
-        self.notes_collection(uid).document(note_id).update({
+        data = {
             "title": (title or "").strip()[:80] or "Sin título",
             "content": (content or "").strip()[:4000],
             "updatedAt": admin_fs.SERVER_TIMESTAMP,
-        })
+        }
+        self.notes_collection(uid).document(note_id).update(data)
+        notes_index.on_note_saved(uid, note_id, data["title"], data["content"])
 
     def delete_note(self, uid: str, note_id: str):
         self.notes_collection(uid).document(note_id).delete()
+        notes_index.on_note_deleted(uid, note_id)
 
+    @shared("get_note")
     def get_note(self, uid: str, note_id: str):
         d = self.notes_collection(uid).document(note_id).get()
         return ({**d.to_dict(), "id": d.id} if d.exists else None)
 
+    @shared("list_notes")
     def list_notes(self, uid: str, limit: int = 100):
         q = (self.notes_collection(uid)
             .order_by("updatedAt", direction=firestore.Query.DESCENDING)
             .limit(limit))
         return [{**doc.to_dict(), "id": doc.id} for doc in q.stream()]
 
+    @shared("list_notes_between")
+    def list_notes_between(self, uid: str, start_utc, end_utc, limit: int = 30):
+        """Notas escritas o editadas en [start_utc, end_utc), de la más reciente a la más vieja."""
+        q = (self.notes_collection(uid)
+            .where("updatedAt", ">=", start_utc)
+            .where("updatedAt", "<", end_utc)
+            .order_by("updatedAt", direction=firestore.Query.DESCENDING)
+            .limit(limit))
+        return [{**(doc.to_dict() or {}), "id": doc.id} for doc in q.stream()]
+
+    def active_user_ids_between(self, start_utc, end_utc, limit: int = 5000) -> tuple[list[str], bool]:
+        """
+        (usuarios con notas o diagnósticos en [start_utc, end_utc), si se cortó en
+        `limit`). Consultas de grupo de colecciones: necesitan el índice de campo
+        único con alcance "collection group" en notes.updatedAt y
+        diagnostics.createdAt. Cada documento del día cuenta como una lectura
+        (select([]) solo ahorra transferencia).
+        """
+        uids: dict[str, None] = {}  # dict: sin repetidos y en el orden en que aparecen
+        for group, field in (("notes", "updatedAt"), ("diagnostics", "createdAt")):
+            q = (self.db.collection_group(group)
+                .where(field, ">=", start_utc)
+                .where(field, "<", end_utc)
+                .select([]))
+            for doc in q.stream():
+                uid = doc.reference.parent.parent.id
+                if uid in uids:
+                    continue
+                if len(uids) >= limit:
+                    return list(uids), True
+                uids[uid] = None
+        return list(uids), False
+
     # ---------- RECOMMENDATIONS (UNA POR DÍA) ----------
     def recommendation_doc(self, uid: str, date_key: str):
         """Referencia al documento de recomendación de ese día."""
@@ -220,11 +431,13 @@ class FirebaseService:
         }
         self.recommendation_doc(uid, date_key).set(payload, merge=False)
 
+    @shared("get_recommendation_for_date")
     def get_recommendation_for_date(self, uid: str, date_key: str):
         """Obtiene la recomendación de un día específico."""
         doc = self.recommendation_doc(uid, date_key).get()
         return ({**doc.to_dict(), "id": doc.id} if doc.exists else None)
 
+    @shared("list_recommendations")
     def list_recommendations(self, uid: str, limit: int = 60):
         """Lista el historial de recomendaciones, ordenadas por fecha descendente."""
         q = (self.db.collection("users")
@@ -240,7 +453,19 @@ class FirebaseService:
 
     def delete_recommendations_all(self, uid: str):
         """Borra todas las recomendaciones del usuario (uso administrativo)."""
-        batch = self.db.batch()
-        for d in self.db.collection("users").document(uid).collection("recommendations").stream():
-            batch.delete(d.reference)
-        batch.commit()
+        from services.account_cleanup import delete_collection
+        return delete_collection(self.db, self.db.collection("users").document(uid).collection("recommendations"))
+
+    # ---------- CUENTA ----------
+    def delete_account(self, uid: str, on_progress=None, page=None) -> dict:
+        """
+        Borra en cascada notas, diagnósticos, recomendaciones, el perfil y el usuario
+        de Auth (con `page`, también el snapshot guardado en ese dispositivo).
+        """
+        from services.account_cleanup import delete_user_data
+        counts = delete_user_data(self, uid, include_profile=True, on_progress=on_progress, page=page)
+        try:
+            admin_auth.delete_user(uid)
+        except admin_auth.UserNotFoundError:
+            pass
+        return counts
@@ -0,0 +1,212 @@
+# services/gemini_resilience.py
+"""
+Capa de resiliencia para las llamadas a Gemini (GeminiService y el chat).
+
+  - Circuito compartido por proceso: tras FAILURES_TO_OPEN fallas seguidas (timeout,
+    error de red, HTTP 429/5xx) se abre y durante OPEN_SECONDS las llamadas fallan
+    al instante con GeminiUnavailable; quien llama muestra su texto de respaldo sin
+    esperar. Luego deja pasar una llamada de prueba (half-open).
+  - Presupuesto por flujo (BUDGETS): el tiempo total que el flujo está dispuesto a
+    esperar, contando la llamada de cobertura si la hay.
+  - Llamada de cobertura (hedge) opcional: si la primera no respondió al p95 de la
+    latencia observada del flujo (o falló con un error transitorio), sale una
+    segunda igual y gana la primera que responda. Solo en HEDGED_FLOWS y con
+    GEMINI_HEDGE=1 (por defecto: el chat).
+
+Los errores 4xx (clave inválida, petición mala) no cuentan para el circuito: Gemini
+respondió; suben tal cual.
+"""
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+FAILURES_TO_OPEN = 3
+OPEN_SECONDS = 30.0
+
+# Segundos que cada flujo espera como mucho (antes: timeout fijo por llamada)
+BUDGETS = {"phrase": 20.0, "recommendation": 30.0, "chat": 25.0}
+HEDGE = os.getenv("GEMINI_HEDGE", "1") == "1"
+HEDGED_FLOWS = {"chat"}        # donde alguien espera mirando la pantalla
+HEDGE_MIN_SAMPLES = 20         # sin suficientes latencias no hay p95 fiable
+LATENCY_WINDOW = 100
+
+TRANSIENT_STATUS = {429, 500, 502, 503, 504}
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class GeminiUnavailable(RuntimeError):
+    """Gemini caído, lento o con el circuito abierto: usar el texto de respaldo."""
+
+
+def status_of(ex) -> int | None:
+    """Código HTTP de un error de requests o de urllib (None si no hubo respuesta)."""
+    code = getattr(ex, "code", None)
+    if isinstance(code, int):
+        return code
+    response = getattr(ex, "response", None)
+    return getattr(response, "status_code", None)
+
+
+def is_transient(ex) -> bool:
+    status = status_of(ex)
+    if status is not None:
+        return status in TRANSIENT_STATUS
+    return isinstance(ex, (TimeoutError, ConnectionError, OSError))
+
+
+class CircuitBreaker:
+    def __init__(self, failures_to_open: int = FAILURES_TO_OPEN, open_seconds: float = OPEN_SECONDS,
+                 clock=time.monotonic):
+        self.failures_to_open = failures_to_open
+        self.open_seconds = open_seconds
+        self.clock = clock
+        self.state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and self.clock() - self._opened_at >= self.open_seconds:
+                self.state = HALF_OPEN
+                self._trial = False
+            if self.state == HALF_OPEN and not self._trial:
+                self._trial = True  # una sola llamada de prueba a la vez
+                return True
+            return False
+
+    def success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                print("[Gemini] circuito cerrado")
+            self.state = CLOSED
+            self._failures = 0
+            self._trial = False
+
+    def failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == HALF_OPEN or self._failures >= self.failures_to_open:
+                if self.state != OPEN:
+                    print(f"[Gemini] circuito abierto por {self.open_seconds:.0f}s")
+                self.state = OPEN
+                self._opened_at = self.clock()
+                self._trial = False
+
+
+class LatencyWindow:
+    def __init__(self, size: int = LATENCY_WINDOW):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self) -> float | None:
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+
+
+class GeminiGuard:
+    def __init__(self, breaker: CircuitBreaker | None = None, budgets: dict | None = None,
+                 hedge: bool = HEDGE, hedged_flows=HEDGED_FLOWS, max_workers: int = 16):
+        self.breaker = breaker or CircuitBreaker()
+        self.budgets = budgets or BUDGETS
+        self.hedge = hedge
+        self.hedged_flows = hedged_flows
+        self.calls = 0
+        self.short_circuited = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.failures = 0
+        self._windows = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gemini")
+
+    def window(self, flow: str) -> LatencyWindow:
+        return self._windows.setdefault(flow, LatencyWindow())
+
+    def call(self, flow: str, send):
+        """
+        send(timeout) hace la petición (bloqueante) y regresa la respuesta. Lanza
+        GeminiUnavailable si el circuito está abierto, se acaba el presupuesto o
+        fallan todos los intentos; los errores no transitorios suben tal cual.
+        """
+        self.calls += 1
+        if not self.breaker.allow():
+            self.short_circuited += 1
+            raise GeminiUnavailable("circuito abierto")
+
+        t0 = time.monotonic()
+        deadline = t0 + self.budgets[flow]
+        window = self.window(flow)
+        # Flujos con cobertura: un intento extra, al p95 (hedge) o tras un error transitorio
+        extra = 1 if self.hedge and flow in self.hedged_flows else 0
+        hedge_at = window.p95() if extra else None
+
+        def attempt():
+            started = time.monotonic()
+            return send(max(0.1, deadline - started)), time.monotonic() - started
+
+        pending = {self._pool.submit(attempt): False}  # future -> es el intento extra
+        last_error = None
+        while pending:
+            now = time.monotonic()
+            remaining = deadline - now
+            if remaining <= 0:
+                break
+            hedge_due = extra and hedge_at is not None
+            timeout = min(remaining, max(0.0, t0 + hedge_at - now)) if hedge_due else remaining
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                if hedge_due and time.monotonic() - t0 >= hedge_at:
+                    self.hedges += 1
+                    extra = 0
+                    pending[self._pool.submit(attempt)] = True
+                continue
+            for future in done:
+                hedged = pending.pop(future)
+                try:
+                    result, latency = future.result()
+                except Exception as ex:
+                    if not is_transient(ex):
+                        self.breaker.success()  # respondió, aunque con error
+                        raise
+                    last_error = ex
+                    if extra and not pending and deadline - time.monotonic() > 0:
+                        self.hedges += 1
+                        extra = 0
+                        pending[self._pool.submit(attempt)] = True
+                    continue
+                window.add(latency)
+                self.breaker.success()
+                self.hedge_wins += hedged
+                return result
+
+        # Las peticiones que sigan en curso terminan solas (requests no se puede cortar)
+        self.failures += 1
+        self.breaker.failure()
+        if pending or last_error is None:
+            raise GeminiUnavailable(f"sin respuesta en {self.budgets[flow]:.0f}s") from last_error
+        raise GeminiUnavailable(str(last_error)) from last_error
+
+
+_guard = None
+_guard_lock = threading.Lock()
+
+
+def get_gemini_guard() -> GeminiGuard:
+    global _guard
+    with _guard_lock:
+        if _guard is None:
+            _guard = GeminiGuard()
+        return _guard
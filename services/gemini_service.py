@@ -1,5 +1,7 @@
 # services/gemini_service.py
-import os, json, requests
+import os, json, hashlib, requests
+from services.gemini_resilience import get_gemini_guard
+from services.single_flight import get_single_flight
 
 DEFAULT_URL = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
 DEBUG = True  # logs en consola
@@ -10,6 +12,29 @@ class GeminiService:
         self.api_key = api_key or os.getenv("GEMINI_API_KEY") or "TU_API_KEY_AQUI"
         self.url = (model_url or DEFAULT_URL) + f"?key={self.api_key}"
 
+    def _post(self, flow: str, payload: dict) -> dict:
+        """
+        POST a Gemini a través del circuito y el presupuesto del flujo
+        (services.gemini_resilience). Una petición idéntica que llegue mientras esta
+        sigue en curso (doble clic, otra pestaña) recibe la misma respuesta.
+        """
+        def send(timeout: float) -> dict:
+            if DEBUG:
+                print(f"[Gemini] POST ({flow})", self.url)
+            r = requests.post(
+                self.url,
+                data=json.dumps(payload),
+                headers={"Content-Type": "application/json"},
+                timeout=timeout,
+            )
+            if DEBUG:
+                print("[Gemini] status:", r.status_code)
+            r.raise_for_status()
+            return r.json()
+
+        digest = hashlib.sha1(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+        return get_single_flight().do((f"gemini:{flow}", digest), get_gemini_guard().call, flow, send)
+
     # --------------------------
     # FRASE BREVE DE DIAGNÓSTICO
     # --------------------------
@@ -32,18 +57,7 @@ Perfil del día:
 Responde SOLO con la frase final (sin comillas ni prefacios)."""
 
         payload = {"contents": [{"parts": [{"text": prompt}]}]}
-        if DEBUG:
-            print("[Gemini] POST", self.url)
-        r = requests.post(
-            self.url,
-            data=json.dumps(payload),
-            headers={"Content-Type": "application/json"},
-            timeout=20,
-        )
-        if DEBUG:
-            print("[Gemini] status:", r.status_code)
-        r.raise_for_status()
-        j = r.json()
+        j = self._post("phrase", payload)
         if DEBUG:
             print("[Gemini] body(head):", str(j)[:300], "...")
         try:
@@ -126,18 +140,7 @@ Responde SOLO con el texto final (sin comillas ni introducciones adicionales).
             },
         }
 
-        if DEBUG:
-            print("[Gemini] POST (recomendación única):", self.url)
-        r = requests.post(
-            self.url,
-            data=json.dumps(payload),
-            headers={"Content-Type": "application/json"},
-            timeout=30,
-        )
-        if DEBUG:
-            print("[Gemini] status:", r.status_code)
-        r.raise_for_status()
-        j = r.json()
+        j = self._post("recommendation", payload)
         if DEBUG:
             print("[Gemini] body(head):", str(j)[:300], "...")
 
@@ -156,3 +159,30 @@ Responde SOLO con el texto final (sin comillas ni introducciones adicionales).
         if DEBUG:
             print("[Gemini] Response (preview):", text[:180], "...")
         return text.strip()
+
+    # --------------------------
+    # CHAT (Tell Me +)
+    # --------------------------
+    def chat_reply(self, history: list[tuple[str, str]], message: str) -> str:
+        """
+        Respuesta de Mindful+ a `message` con el contexto reciente.
+        history: [("user" | "assistant", texto)], ya recortado por la vista.
+        """
+        context_text = ""
+        for role, msg in history:
+            if role == "user":
+                context_text += f"Usuario: {msg}\n"
+            else:
+                context_text += f"Mindful+: {msg}\n"
+
+        # Instrucción de sistema
+        system_prompt = (
+            "Eres Mindful+, un acompañante emocional cálido y empático. "
+            "Responde con amabilidad, comprensión y sin juicios. "
+            "No te presentes en cada mensaje, solo continúa la conversación "
+            "como un amigo que recuerda lo anterior.\n\n"
+        )
+
+        payload = {"contents": [{"parts": [{"text": system_prompt + context_text + f"Usuario: {message}\nMindful+:"}]}]}
+        j = self._post("chat", payload)
+        return j["candidates"][0]["content"]["parts"][0]["text"]
@@ -0,0 +1,214 @@
+# services/image_cache.py
+import hashlib
+import io
+import os
+import threading
+from urllib.parse import urlsplit, urlunsplit
+
+import requests
+from PIL import Image, ImageOps
+from requests.adapters import HTTPAdapter
+
+from services.image_proxy import SourceRejected, get_source_policy
+
+CACHE_DIR = os.getenv("IMAGE_CACHE_DIR", os.path.join("storage", "image_cache"))
+CACHE_MAX_BYTES = int(os.getenv("IMAGE_CACHE_MAX_MB", "256")) * 1024 * 1024
+MAX_SOURCE_BYTES = 15 * 1024 * 1024
+FETCH_TIMEOUT = 10
+
+# Lado (px) de cada miniatura: ~2x el tamaño con que la UI la pinta
+THUMB_SIZES = {
+    "card": 128,    # avatar de la lista de ayuda (64 px)
+    "detail": 192,  # diálogo de detalle (92 px)
+    "edit": 240,    # vista previa al editar / registrar (120 px)
+    "panel": 256,   # panel profesional (128 px)
+}
+
+
+def _sha(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class _PinnedAdapter(HTTPAdapter):
+    """Conecta a la IP ya revisada; TLS (SNI y certificado) sigue validando el nombre original."""
+
+    def __init__(self, hostname: str):
+        self.hostname = hostname
+        super().__init__(max_retries=0)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs["server_hostname"] = self.hostname
+        kwargs["assert_hostname"] = self.hostname
+        super().init_poolmanager(*args, **kwargs)
+
+
+def pinned_get(url: str, address: str, **kwargs):
+    """GET a `url` conectándose a `address` (sin resolver de nuevo), con el Host original."""
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    host = f"[{address}]" if ":" in address else address
+    target = urlunsplit((parts.scheme, f"{host}:{port}", parts.path, parts.query, ""))
+    session = requests.Session()
+    session.trust_env = False  # un proxy del entorno resolvería el nombre por su cuenta
+    session.mount(f"{parts.scheme}://", _PinnedAdapter(parts.hostname))
+    headers = {**kwargs.pop("headers", {}), "Host": parts.netloc}
+    return session, session.get(target, headers=headers, **kwargs)
+
+
+class ImageCache:
+    """
+    Caché en disco direccionada por contenido:
+      src/<sha>            bytes originales (una descarga por foto)
+      thumbs/<sha>_<size>  miniatura WEBP
+      urls/<sha(url)>      índice url -> sha del contenido
+    Al rebasar max_bytes se borran los archivos menos usados (mtime = último acceso).
+    """
+
+    def __init__(self, root: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES, policy=None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.policy = policy or get_source_policy()
+        for sub in ("src", "thumbs", "urls"):
+            os.makedirs(os.path.join(root, sub), exist_ok=True)
+        self._lock = threading.Lock()
+        self._key_locks: dict[str, threading.Lock] = {}
+        self._bytes = sum(os.path.getsize(p) for p in self._files())
+
+    # ---------- helpers ----------
+    def _path(self, *parts) -> str:
+        return os.path.join(self.root, *parts)
+
+    def _files(self):
+        for sub in ("src", "thumbs"):
+            d = self._path(sub)
+            for name in os.listdir(d):
+                yield os.path.join(d, name)
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _write(self, path: str, data: bytes):
+        tmp = f"{path}.tmp{threading.get_ident()}"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._bytes += len(data)
+        if self._bytes > self.max_bytes:
+            self.evict(keep=path)  # el recién escrito se va a usar enseguida
+
+    @staticmethod
+    def _touch(path: str):
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+
+    # ---------- origen ----------
+    def _fetch(self, url: str) -> bytes:
+        address = self.policy.check(url)
+        # Sin redirecciones: una 30x podría apuntar a un host que no pasó la revisión
+        session, r = pinned_get(url, address, timeout=FETCH_TIMEOUT, stream=True, allow_redirects=False)
+        with session, r:
+            if r.is_redirect:
+                raise SourceRejected("El origen respondió con una redirección")
+            r.raise_for_status()
+            return r.raw.read(MAX_SOURCE_BYTES + 1, decode_content=True)
+
+    def _index_path(self, url: str) -> str:
+        return self._path("urls", _sha(url.encode("utf-8")))
+
+    def _indexed(self, url: str) -> str | None:
+        """sha del contenido que ya descargamos para esta URL (o None)."""
+        try:
+            with open(self._index_path(url), "r", encoding="utf-8") as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def source_hash(self, url: str) -> str:
+        """Descarga la foto una sola vez y regresa el sha de su contenido."""
+        index = self._index_path(url)
+        with self._key_lock(index):
+            digest = self._indexed(url)
+            if digest and os.path.exists(self._path("src", digest)):
+                return digest
+
+            data = self._fetch(url)
+            if len(data) > MAX_SOURCE_BYTES:
+                raise ValueError("La imagen de origen es demasiado grande")
+
+            digest = _sha(data)
+            src = self._path("src", digest)
+            if not os.path.exists(src):
+                self._write(src, data)
+            with open(index, "w", encoding="utf-8") as f:
+                f.write(digest)
+            return digest
+
+    # ---------- miniaturas ----------
+    def thumbnail(self, url: str, size: str) -> str:
+        """Ruta local de la miniatura WEBP (la genera si no existe)."""
+        side = THUMB_SIZES[size]
+        # La miniatura ya hecha basta aunque el original se haya desalojado (los
+        # originales casi no se tocan, así que son los primeros en irse)
+        digest = self._indexed(url)
+        if digest:
+            out = self._path("thumbs", f"{digest}_{size}.webp")
+            if os.path.exists(out):
+                self._touch(out)
+                return out
+        digest = self.source_hash(url)
+        out = self._path("thumbs", f"{digest}_{size}.webp")
+        with self._key_lock(out):
+            if os.path.exists(out):
+                self._touch(out)
+                return out
+            src = self._path("src", digest)
+            with Image.open(src) as im:
+                im = ImageOps.exif_transpose(im)
+                im = im.convert("RGBA" if im.mode in ("RGBA", "LA", "P") else "RGB")
+                im = ImageOps.fit(im, (side, side), Image.Resampling.LANCZOS)
+                buf = io.BytesIO()
+                im.save(buf, "WEBP", quality=82, method=4)
+            self._touch(src)
+            self._write(out, buf.getvalue())
+            return out
+
+    # ---------- desalojo ----------
+    def evict(self, target_ratio: float = 0.9, keep: str | None = None):
+        """Borra los archivos menos usados (salvo `keep`) hasta quedar bajo target_ratio * max_bytes."""
+        with self._lock:
+            entries = []
+            for p in self._files():
+                try:
+                    st = os.stat(p)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, p))
+            total = sum(size for _, size, _ in entries)
+            limit = int(self.max_bytes * target_ratio)
+            for _, size, p in sorted(entries):
+                if total <= limit:
+                    break
+                if p == keep:
+                    continue
+                try:
+                    os.remove(p)
+                    total -= size
+                except OSError:
+                    pass
+            self._bytes = total
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_image_cache() -> ImageCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ImageCache()
+        return _cache
@@ -0,0 +1,163 @@
+# services/image_proxy.py
+import ipaddress
+import os
+import socket
+import threading
+from urllib.parse import quote, urlsplit
+
+from services.poll_coordinator import UPLOADER_URL
+
+# Base pública de /img. Vacío = rutas relativas, servidas por la misma app
+# (asgi.py monta el router); así sirve igual detrás de https y desde cualquier equipo.
+IMAGE_PROXY_URL = os.getenv("IMAGE_PROXY_URL", "").rstrip("/")
+# Solo escritorio (main.py): servidor aparte en loopback, el cliente está en la misma máquina
+IMAGE_PROXY_HOST = os.getenv("IMAGE_PROXY_HOST", "127.0.0.1")
+IMAGE_PROXY_PORT = int(os.getenv("IMAGE_PROXY_PORT", "8551"))
+
+# Fotos subidas desde la app (services.photo_pipeline -> Firebase Storage)
+STORAGE_ORIGIN = "https://firebasestorage.googleapis.com"
+# Orígenes de los que el proxy acepta descargar fotos, además del uploader y de
+# Storage (separados por comas, p. ej. "https://res.cloudinary.com").
+IMAGE_SOURCE_ORIGINS = os.getenv("IMAGE_SOURCE_ORIGINS", "")
+
+CACHE_HEADERS = {"Cache-Control": "public, max-age=31536000, immutable"}
+
+_started = False
+
+
+class SourceRejected(ValueError):
+    """La URL de origen no está permitida (origen fuera de la lista o dirección interna)."""
+
+
+def _origin(url: str) -> str | None:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname or parts.username or parts.password:
+        return None
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+    except ValueError:
+        return None
+    return f"{parts.scheme}://{parts.hostname.lower()}:{port}"
+
+
+def _resolve(host: str, port: int) -> set[str]:
+    return {info[4][0] for info in socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)}
+
+
+def is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%")[0])
+    if getattr(ip, "ipv4_mapped", None):
+        ip = ip.ipv4_mapped
+    # is_global deja fuera loopback, redes privadas, link-local (169.254.169.254), CGNAT…
+    return ip.is_global and not ip.is_multicast
+
+
+class SourcePolicy:
+    """
+    Qué puede descargar el proxy: solo URLs de los orígenes permitidos (el uploader,
+    Firebase Storage e IMAGE_SOURCE_ORIGINS) y nunca si el nombre resuelve a una
+    dirección interna.
+    """
+
+    def __init__(self, origins=None, allow_private: bool = False, resolve=_resolve):
+        if origins is None:
+            origins = [UPLOADER_URL, STORAGE_ORIGIN, *IMAGE_SOURCE_ORIGINS.split(",")]
+        self.origins = {o for o in map(_origin, (s.strip() for s in origins if s.strip())) if o}
+        self.allow_private = allow_private
+        self.resolve = resolve
+
+    def allows(self, url: str) -> bool:
+        """Revisión sin red (para decidir si vale la pena pasar la foto por el proxy)."""
+        return _origin(url) in self.origins
+
+    def check(self, url: str) -> str:
+        """
+        Revisión completa antes de descargar: origen permitido y DNS a direcciones
+        públicas. Regresa la dirección revisada; hay que conectarse a esa (no volver
+        a resolver: un DNS que cambia de respuesta la saltaría).
+        """
+        origin = _origin(url)
+        if origin not in self.origins:
+            raise SourceRejected("Origen no permitido")
+        parts = urlsplit(url)
+        try:
+            addresses = self.resolve(parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        except OSError:
+            raise SourceRejected("El host no resuelve")
+        if not addresses:
+            raise SourceRejected("El host no resuelve")
+        if not self.allow_private and not all(is_public_address(a) for a in addresses):
+            raise SourceRejected("El host resuelve a una dirección interna")
+        return sorted(addresses, key=lambda a: (":" in a, a))[0]  # IPv4 primero
+
+
+_policy = None
+
+
+def get_source_policy() -> SourcePolicy:
+    global _policy
+    if _policy is None:
+        _policy = SourcePolicy()
+    return _policy
+
+
+def thumb_url(src: str | None, size: str) -> str | None:
+    """URL de la miniatura local para una foto remota (o la original si el proxy no la acepta)."""
+    if not src or not src.startswith(("http://", "https://")) or not get_source_policy().allows(src):
+        return src
+    return f"{IMAGE_PROXY_URL}/img/{size}?src={quote(src, safe='')}"
+
+
+def build_router():
+    """Router FastAPI con GET /img/{size}?src=<url>."""
+    from fastapi import APIRouter, HTTPException
+    from fastapi.responses import FileResponse
+    from services.image_cache import THUMB_SIZES, get_image_cache
+
+    router = APIRouter()
+
+    @router.get("/img/{size}")
+    def thumbnail(size: str, src: str):
+        # def (no async): FastAPI lo corre en su pool de hilos, la descarga no bloquea el loop
+        if size not in THUMB_SIZES:
+            raise HTTPException(404, "Tamaño desconocido")
+        if not src.startswith(("http://", "https://")):
+            raise HTTPException(400, "src inválido")
+        try:
+            path = get_image_cache().thumbnail(src, size)
+        except SourceRejected as ex:
+            raise HTTPException(403, str(ex))
+        except Exception as ex:
+            print(f"[ImageProxy] {src} -> {ex}")
+            raise HTTPException(502, "No se pudo obtener la imagen")
+        return FileResponse(path, media_type="image/webp", headers=CACHE_HEADERS)
+
+    return router
+
+
+def create_app():
+    from fastapi import FastAPI
+
+    app = FastAPI()
+    app.include_router(build_router())
+    return app
+
+
+def start_image_proxy():
+    """
+    Levanta el endpoint en un hilo de fondo para la app de escritorio (ft.app), que
+    no tiene servidor HTTP propio donde montar el router. Si IMAGE_PROXY_URL no está
+    fijada, las URLs apuntan a este servidor en loopback.
+    """
+    global _started, IMAGE_PROXY_URL
+    if _started:
+        return
+    _started = True
+    if not IMAGE_PROXY_URL:
+        IMAGE_PROXY_URL = f"http://{IMAGE_PROXY_HOST}:{IMAGE_PROXY_PORT}"
+
+    def serve():
+        import uvicorn
+        uvicorn.run(create_app(), host=IMAGE_PROXY_HOST, port=IMAGE_PROXY_PORT, log_level="warning")
+
+    threading.Thread(target=serve, daemon=True, name="image-proxy").start()
@@ -0,0 +1,446 @@
+# services/notes_index.py
+import bisect
+import hashlib
+import json
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows: un solo proceso, basta el candado de hilos
+    fcntl = None
+
+INDEX_DIR = os.getenv("NOTES_INDEX_DIR", os.path.join("storage", "notes_index"))
+COMPACT_EVERY = 500      # operaciones en el log antes de reescribir el snapshot
+SNIPPET_CHARS = 300
+TITLE_WEIGHT = 2         # las palabras del título cuentan doble
+MAX_PREFIX_TERMS = 64    # expansiones por prefijo que se consideran por palabra
+PREFIX_FACTOR = 0.7      # una coincidencia por prefijo pesa menos que una exacta
+K1, B = 1.2, 0.75        # parámetros BM25
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset("""
+a al algo algunos ante antes como con contra cual cuando de del desde donde durante e el ella ellas ellos
+en entre era es esa ese eso esta este esto estos fue ha hay la las le les lo los mas me mi mis mucho muy
+nada ni no nos o otra otro para pero poco por porque que se ser si sin sobre su sus tambien te tengo ti
+tu tus un una uno unos y ya yo
+""".split())
+
+
+def fold(text: str) -> str:
+    """Minúsculas y sin acentos: 'Ánimo, canción' -> 'animo, cancion'."""
+    decomposed = unicodedata.normalize("NFKD", text or "")
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch)).lower()
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN_RE.findall(fold(text)) if t not in STOPWORDS]
+
+
+def _to_epoch(ts) -> float | None:
+    if ts is None:
+        return None
+    if isinstance(ts, (int, float)):
+        return float(ts)
+    return ts.timestamp()
+
+
+def _file_sig(path: str):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class NotesIndex:
+    """
+    Índice invertido local de las notas de UN usuario.
+      postings[term] = {note_id: frecuencia}
+      docs[note_id]  = {"title", "snippet", "created", "len"}
+    Se guarda como snapshot JSON + log de operaciones (JSONL); abrirlo es leer el
+    snapshot y re-aplicar el log. Cada COMPACT_EVERY operaciones se reescribe el snapshot.
+    Los procesos que comparten INDEX_DIR se coordinan con un candado de archivo.
+    """
+
+    def __init__(self, uid: str, root: str = INDEX_DIR):
+        name = hashlib.sha256(uid.encode("utf-8")).hexdigest()[:32]
+        self.uid = uid
+        self.snapshot_path = os.path.join(root, f"{name}.json")
+        self.log_path = os.path.join(root, f"{name}.log")
+        self.lock_path = os.path.join(root, f"{name}.lock")
+        os.makedirs(root, exist_ok=True)
+
+        self.docs: dict[str, dict] = {}
+        self.postings: dict[str, dict[str, int]] = {}
+        self.total_len = 0
+        self.synced_at = 0.0      # mayor updatedAt visto desde Firestore
+        self.built = False        # ya se hizo la carga completa inicial
+        self.generation = None    # notesIndexGen del perfil con que se construyó
+        self._terms: list[str] = []
+        self._terms_dirty = True
+        self._log_ops = 0         # operaciones en el log desde el último snapshot
+        self._snap_sig = None     # (inode, mtime) del snapshot cargado en memoria
+        self._log_ino = None      # inode del log que vamos leyendo
+        self._log_offset = 0      # bytes del log ya aplicados
+        self._lock = threading.RLock()
+        self.refresh()
+
+    # ---------- indexado ----------
+    def _add(self, note_id: str, title: str, content: str, created: float):
+        counts = Counter(tokenize(content))
+        for t in tokenize(title):
+            counts[t] += TITLE_WEIGHT
+        length = sum(counts.values())
+        for term, tf in counts.items():
+            plist = self.postings.get(term)
+            if plist is None:
+                plist = self.postings[term] = {}
+                self._terms_dirty = True
+            plist[note_id] = tf
+        body = (content or "").strip()
+        self.docs[note_id] = {
+            "title": (title or "Sin título")[:120],
+            "snippet": body[:SNIPPET_CHARS] + ("…" if len(body) > SNIPPET_CHARS else ""),
+            "created": created,
+            "len": length,
+            "terms": list(counts),
+        }
+        self.total_len += length
+
+    def _remove(self, note_id: str):
+        doc = self.docs.pop(note_id, None)
+        if not doc:
+            return
+        self.total_len -= doc["len"]
+        for term in doc["terms"]:
+            plist = self.postings.get(term)
+            if plist is None:
+                continue
+            plist.pop(note_id, None)
+            if not plist:
+                del self.postings[term]
+                self._terms_dirty = True
+
+    def upsert(self, note_id: str, title: str, content: str, created=None, log: bool = True):
+        """log=False: solo en memoria de este proceso (p. ej. cargas de prueba)."""
+        with self._exclusive(log):
+            old = self.docs.get(note_id)
+            created_ts = old["created"] if (old and created is None) else (_to_epoch(created) or time.time())
+            self._commit([{"op": "put", "id": note_id, "title": title, "content": content, "created": created_ts}], log)
+
+    def delete(self, note_id: str, log: bool = True):
+        with self._exclusive(log):
+            if note_id not in self.docs:
+                return
+            self._commit([{"op": "del", "id": note_id}], log)
+
+    # ---------- búsqueda ----------
+    def _expand(self, token: str) -> list[tuple[str, float]]:
+        """Términos del índice que empiezan con `token` (el exacto pesa 1.0)."""
+        if self._terms_dirty:
+            self._terms = sorted(self.postings)
+            self._terms_dirty = False
+        out = []
+        i = bisect.bisect_left(self._terms, token)
+        while i < len(self._terms) and len(out) < MAX_PREFIX_TERMS:
+            term = self._terms[i]
+            if not term.startswith(token):
+                break
+            out.append((term, 1.0 if term == token else PREFIX_FACTOR))
+            i += 1
+        return out
+
+    def search(self, query: str, limit: int = 30) -> list[dict]:
+        """
+        BM25 con coincidencia por prefijo: cada palabra de la consulta debe aparecer
+        (exacta o como prefijo) en la nota. Regresa [{"id","title","snippet","created","score"}].
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        with self._shared():
+            n_docs = len(self.docs)
+            if not n_docs:
+                return []
+            avg_len = self.total_len / n_docs
+            scores: dict[str, float] | None = None
+            for token in tokens:
+                token_scores: dict[str, float] = {}
+                for term, weight in self._expand(token):
+                    plist = self.postings[term]
+                    idf = math.log(1 + (n_docs - len(plist) + 0.5) / (len(plist) + 0.5))
+                    for note_id, tf in plist.items():
+                        dl = self.docs[note_id]["len"]
+                        s = weight * idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * dl / avg_len))
+                        if s > token_scores.get(note_id, 0.0):
+                            token_scores[note_id] = s
+                if scores is None:
+                    scores = token_scores
+                else:
+                    scores = {nid: scores[nid] + s for nid, s in token_scores.items() if nid in scores}
+                if not scores:
+                    return []
+
+            ranked = sorted(scores.items(), key=lambda kv: (-kv[1], -self.docs[kv[0]]["created"]))[:limit]
+            return [
+                {
+                    "id": nid,
+                    "title": self.docs[nid]["title"],
+                    "snippet": self.docs[nid]["snippet"],
+                    "created": self.docs[nid]["created"],
+                    "score": round(score, 4),
+                }
+                for nid, score in ranked
+            ]
+
+    # ---------- sincronización con Firestore ----------
+    def sync(self, fb):
+        """
+        Primera vez: indexa todas las notas del usuario (una sola lectura completa).
+        Después: solo trae las notas con updatedAt posterior a la última sincronización.
+        """
+        from google.cloud.firestore_v1 import base_query as bq
+
+        generation = (fb.get_user_profile(self.uid) or {}).get("notesIndexGen")
+        with self._shared():
+            built, since = self.built, self.synced_at
+            stale = built and generation != self.generation
+        if stale:
+            # Otro proceso (p. ej. un import en otro host) pidió reconstruirlo. Fuera
+            # del candado compartido: flock es por archivo abierto, así que pedir el
+            # exclusivo con el compartido tomado esperaría a este mismo proceso
+            with self._exclusive():
+                if self.built and generation != self.generation:
+                    self._clear()
+            built, since = False, 0.0
+        ref = fb.notes_collection(self.uid)
+        q = ref if not built else ref.where(
+            filter=bq.FieldFilter("updatedAt", ">", datetime.fromtimestamp(since, timezone.utc))
+        )
+        ops = []
+        newest = since
+        for d in q.select(["title", "content", "createdAt", "updatedAt"]).stream():
+            data = d.to_dict() or {}
+            ops.append({
+                "op": "put", "id": d.id, "title": data.get("title") or "", "content": data.get("content") or "",
+                "created": _to_epoch(data.get("createdAt")) or time.time(),
+            })
+            updated = _to_epoch(data.get("updatedAt"))
+            if updated is not None:  # sin updatedAt no adelanta la marca (antes contaba como "ahora")
+                newest = max(newest, updated)
+        with self._exclusive():
+            if built and not self.built:
+                return 0  # se reinició el índice mientras leíamos: la próxima sync lo reconstruye
+            first_build = not self.built
+            self._commit(ops + [{"op": "sync", "at": newest, "gen": generation}])
+            if first_build:
+                self._compact()
+        return len(ops)
+
+    # ---------- persistencia ----------
+    # Varios procesos (serve.py --workers N) comparten snapshot y log: toda escritura
+    # va al log con el candado de archivo tomado, y antes de leer o escribir cada
+    # proceso aplica lo que los demás agregaron. Compactar mezcla el log completo en
+    # el snapshot; si el snapshot cambió (otro compactó o se reinició el índice), se
+    # recarga entero.
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self.lock_path, "a") as handle:
+                fcntl.flock(handle, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _shared(self):
+        with self._file_lock(exclusive=False):
+            self._catch_up()
+            yield
+
+    @contextmanager
+    def _exclusive(self, on_disk: bool = True):
+        if not on_disk:
+            with self._lock:
+                yield
+            return
+        with self._file_lock(exclusive=True):
+            self._catch_up()
+            yield
+
+    def refresh(self):
+        """Aplica lo que otros procesos escribieron desde la última lectura."""
+        with self._shared():
+            pass
+
+    def _apply(self, op: dict):
+        kind = op.get("op")
+        if kind == "put":
+            self._remove(op["id"])
+            self._add(op["id"], op["title"], op["content"], op["created"])
+        elif kind == "del":
+            self._remove(op["id"])
+        elif kind == "sync":
+            self.synced_at = max(self.synced_at, op["at"])
+            self.generation = op.get("gen", self.generation)
+            self.built = True
+
+    def _commit(self, ops: list[dict], on_disk: bool = True):
+        """Escribe las operaciones al log (con el candado exclusivo y al día) y las aplica."""
+        if on_disk and ops:
+            data = "".join(json.dumps(op, ensure_ascii=False) + "\n" for op in ops).encode("utf-8")
+            with open(self.log_path, "ab") as f:
+                if f.tell() != self._log_offset:
+                    data = b"\n" + data  # cierra una línea cortada por un cierre abrupto
+                f.write(data)
+                self._log_offset = f.tell()
+                self._log_ino = os.fstat(f.fileno()).st_ino
+            self._log_ops += len(ops)
+        for op in ops:
+            self._apply(op)
+        if on_disk and self._log_ops >= COMPACT_EVERY:
+            self._compact()
+
+    def _catch_up(self):
+        snap_sig = _file_sig(self.snapshot_path)
+        try:
+            log_ino = os.stat(self.log_path).st_ino
+        except FileNotFoundError:
+            log_ino = None
+        # Snapshot distinto o log reemplazado: lo que tenemos en memoria ya no vale
+        if snap_sig != self._snap_sig or (self._log_offset and log_ino != self._log_ino):
+            self._load_snapshot(snap_sig)
+        if log_ino is None:
+            return
+        if log_ino != self._log_ino:
+            self._log_ino, self._log_offset = log_ino, 0
+        with open(self.log_path, "rb") as f:
+            f.seek(self._log_offset)
+            chunk = f.read()
+        complete = chunk.rfind(b"\n") + 1  # una línea a medio escribir se lee la próxima vez
+        for line in chunk[:complete].splitlines():
+            try:
+                op = json.loads(line)
+            except ValueError:
+                continue  # línea cortada por un cierre abrupto
+            self._apply(op)
+            self._log_ops += 1
+        self._log_offset += complete
+
+    def save(self):
+        """Reescribe el snapshot con todo lo aplicado (de este y de otros procesos) y vacía el log."""
+        with self._exclusive():
+            self._compact()
+
+    def _compact(self):
+        data = {
+            "version": 1,
+            "syncedAt": self.synced_at,
+            "built": self.built,
+            "generation": self.generation,
+            "docs": {nid: {k: v for k, v in d.items() if k != "terms"} for nid, d in self.docs.items()},
+            "postings": self.postings,
+        }
+        tmp = self.snapshot_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.snapshot_path)
+        try:
+            os.remove(self.log_path)
+        except OSError:
+            pass
+        self._snap_sig = _file_sig(self.snapshot_path)
+        self._log_ino, self._log_offset, self._log_ops = None, 0, 0
+
+    def clear(self):
+        """Borra el índice en disco; todos los procesos lo notan y la próxima sync lo reconstruye."""
+        with self._exclusive():
+            self._clear()
+
+    def _clear(self):
+        for path in (self.snapshot_path, self.log_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._load_snapshot(None)
+
+    def _load_snapshot(self, sig):
+        self.docs, self.postings, self.total_len = {}, {}, 0
+        self.synced_at, self.built, self.generation = 0.0, False, None
+        self._snap_sig = sig
+        self._log_ino, self._log_offset, self._log_ops = None, 0, 0
+        self._terms_dirty = True
+        if sig is None:
+            return
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.synced_at = data.get("syncedAt", 0.0)
+            self.built = data.get("built", False)
+            self.generation = data.get("generation")
+            self.postings = data.get("postings", {})
+            self.docs = data.get("docs", {})
+            # "terms" de cada nota se reconstruye desde postings (no se guarda duplicado)
+            for d in self.docs.values():
+                d["terms"] = []
+            for term, plist in self.postings.items():
+                for nid in plist:
+                    self.docs[nid]["terms"].append(term)
+            self.total_len = sum(d["len"] for d in self.docs.values())
+        except Exception as ex:
+            print(f"[NotesIndex] snapshot dañado, se reconstruye: {ex}")
+            self.docs, self.postings, self.total_len, self.synced_at, self.built = {}, {}, 0, 0.0, False
+
+
+_indexes: dict[str, NotesIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_notes_index(uid: str) -> NotesIndex:
+    """Índice del usuario (uno por proceso, compartido entre sesiones)."""
+    with _indexes_lock:
+        idx = _indexes.get(uid)
+        if idx is None:
+            idx = _indexes[uid] = NotesIndex(uid)
+        return idx
+
+
+def reset_notes_index(uid: str, fb=None):
+    """
+    Descarta el índice del usuario: la próxima sync lo reconstruye completo desde
+    Firestore. Los procesos de este host lo notan al buscar; con `fb` además se sube
+    notesIndexGen en el perfil, que revisa la sync de los servidores de otros hosts.
+    """
+    get_notes_index(uid).clear()
+    if fb is not None:
+        fb.db.collection("users").document(uid).set({"notesIndexGen": uuid.uuid4().hex}, merge=True)
+
+
+# ---------- ganchos para FirebaseService ----------
+def on_note_saved(uid: str, note_id: str, title: str, content: str, created=None):
+    try:
+        get_notes_index(uid).upsert(note_id, title, content, created)
+    except Exception as ex:
+        # El índice nunca debe romper una escritura en Firestore
+        print(f"[NotesIndex] no se pudo indexar {note_id}: {ex}")
+
+
+def on_note_deleted(uid: str, note_id: str):
+    try:
+        get_notes_index(uid).delete(note_id)
+    except Exception as ex:
+        print(f"[NotesIndex] no se pudo quitar {note_id}: {ex}")
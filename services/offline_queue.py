@@ -1,7 +1,13 @@
 # services/offline_queue.py
 import json
+import time
+import uuid
 
 QUEUE_KEY = "offline_action_queue"
+LOCAL_PREFIX = "local-"   # id provisional de lo creado sin conexión
+
+KINDS = ("note", "diagnostic", "recommendation")
+OPS = ("create", "update", "delete")
 
 
 def _get_storage(page):
@@ -13,7 +19,7 @@ def _load_list(page):
     storage = _get_storage(page)
     raw = storage.get(QUEUE_KEY) or "[]"
     try:
-        return json.loads(raw)
+        return [_upgrade(a) for a in json.loads(raw)]
     except Exception:
         return []
 
@@ -23,18 +29,108 @@ def _save_list(page, data):
     storage.set(QUEUE_KEY, json.dumps(data))
 
 
+def _upgrade(action: dict) -> dict:
+    """Acciones del formato anterior ({"type": "note", "payload"}) -> create con id local."""
+    if "op" in action:
+        return action
+    return {
+        "op": "create",
+        "kind": action.get("type"),
+        "uid": action.get("uid"),
+        "doc_id": new_local_id(),
+        "payload": action.get("payload") or {},
+        "ts": time.time(),
+    }
+
+
+def new_local_id() -> str:
+    return LOCAL_PREFIX + uuid.uuid4().hex[:16]
+
+
+def is_local_id(doc_id: str | None) -> bool:
+    return bool(doc_id) and doc_id.startswith(LOCAL_PREFIX)
+
+
+# ---------- coalescencia ----------
+def _merge(older: dict | None, newer: dict | None) -> dict | None:
+    """
+    Junta dos operaciones sobre el mismo documento (older antes que newer).
+    None = se cancelan (no hay que escribir nada).
+    """
+    if older is None:
+        return newer
+    a, b = older["op"], newer["op"]
+    if a == "create":
+        if b == "update":
+            # create + update = un solo create con los datos finales
+            return {**older, "payload": {**older["payload"], **newer["payload"]}, "ts": newer["ts"]}
+        if b == "delete":
+            # Con id local nunca llegó al servidor: no hay nada que borrar. Con id real
+            # puede que sí (el intento en línea expiró pero se escribió): se borra
+            return None if is_local_id(older["doc_id"]) else newer
+        return newer  # create + create (upsert por fecha): gana el último
+    if a == "update":
+        if b == "update":
+            return {**older, "payload": {**older["payload"], **newer["payload"]}, "ts": newer["ts"]}
+        return newer  # update + delete = delete; update + create (set) = create
+    # a == "delete"
+    if b == "create":
+        return newer  # borrar y volver a escribir el mismo id (recomendación del día)
+    return older      # update después de delete: el documento ya no existe
+
+
+def coalesce(actions: list[dict]) -> list[dict]:
+    """
+    Una operación por documento (uid, kind, doc_id), en el orden en que apareció
+    la primera: create+update -> create, update+update -> update, create+delete -> nada.
+    """
+    merged: dict[tuple, dict | None] = {}
+    order: list[tuple] = []
+    for action in actions:
+        key = (action.get("uid"), action.get("kind"), action.get("doc_id"))
+        if key not in merged:
+            order.append(key)
+            merged[key] = action
+        else:
+            merged[key] = _merge(merged[key], action)
+    return [merged[k] for k in order if merged[k] is not None]
+
+
+# ---------- API ----------
+def enqueue(page, kind: str, op: str, uid: str, doc_id: str | None = None, payload: dict | None = None) -> str:
+    """
+    Encola una escritura y la junta con las pendientes del mismo documento.
+    Para create sin doc_id se genera un id local ("local-…"): las ediciones o el
+    borrado posteriores de ese documento se encolan con ese mismo id.
+    Regresa el doc_id usado.
+    """
+    if kind not in KINDS or op not in OPS:
+        raise ValueError(f"Acción offline inválida: {op} {kind}")
+    if op == "create" and not doc_id:
+        doc_id = new_local_id()
+    if not doc_id:
+        raise ValueError(f"{op} {kind} necesita doc_id")
+    action = {"op": op, "kind": kind, "uid": uid, "doc_id": doc_id, "payload": payload or {}, "ts": time.time()}
+    _save_list(page, coalesce(_load_list(page) + [action]))
+    return doc_id
+
+
 def queue_action(page, action: dict):
     """
-    action debe tener al menos:
-    {
-      "type": "note" | "diagnostic" | ...,
-      "payload": {...},
-      "uid": "user-id-opcional"
-    }
+    Compatibilidad: {"type": "note" | "diagnostic", "payload": {...}, "uid": ...}
+    se encola como create.
     """
-    lst = _load_list(page)
-    lst.append(action)
-    _save_list(page, lst)
+    _save_list(page, coalesce(_load_list(page) + [_upgrade(action)]))
+
+
+def requeue(page, actions: list[dict]):
+    """Regresa a la cola lo que no se pudo sincronizar, antes de lo encolado mientras tanto."""
+    _save_list(page, coalesce(list(actions) + _load_list(page)))
+
+
+def pending_for(page, uid: str, kind: str) -> dict:
+    """{doc_id: acción} pendientes de un tipo, para pintarlas encima de lo leído del servidor."""
+    return {a["doc_id"]: a for a in _load_list(page) if a.get("uid") == uid and a.get("kind") == kind}
 
 
 def peek_all(page):
@@ -49,3 +145,26 @@ def pop_all(page):
 
 def has_pending(page) -> bool:
     return len(_load_list(page)) > 0
+
+
+def is_offline_error(ex: BaseException) -> bool:
+    """Errores que significan "sin red / backend inalcanzable" (vale la pena encolar)."""
+    import asyncio
+
+    if isinstance(ex, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    try:
+        import requests
+        if isinstance(ex, requests.exceptions.RequestException):
+            # Un 4xx/5xx (HTTPError) sí llegó al servidor: no es falta de red
+            return isinstance(ex, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+    except ImportError:
+        pass
+    try:
+        from google.api_core import exceptions as gexc
+        from google.api_core.retry import RetryError
+        if isinstance(ex, (gexc.ServiceUnavailable, gexc.DeadlineExceeded, RetryError)):
+            return True
+    except ImportError:
+        pass
+    return isinstance(ex, OSError)
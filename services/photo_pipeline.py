@@ -0,0 +1,105 @@
+# services/photo_pipeline.py
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image, ImageOps
+
+UPLOAD_DIR = os.getenv("UPLOAD_DIR", "uploads")
+# Carpeta de las fotos de profesionistas en Firebase Storage
+PHOTOS_PREFIX = os.getenv("PHOTOS_PREFIX", "mindful/profesionistas")
+PHOTO_WORKERS = int(os.getenv("PHOTO_WORKERS", "2"))
+
+MAX_UPLOAD_BYTES = 25 * 1024 * 1024
+MAX_PIXELS = 80_000_000      # ~ cámara de 80 MP; más que eso lo tratamos como bomba
+MAX_SIDE = 1024              # lado mayor de la foto guardada
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP", "MPO"}  # MPO = JPEG de algunos celulares
+
+_pool = None
+
+
+class PhotoRejected(ValueError):
+    """La imagen no es válida (formato, tamaño o archivo dañado)."""
+
+
+def process_photo(data: bytes) -> tuple[str, bytes]:
+    """
+    Valida, endereza (EXIF), reduce a MAX_SIDE y re-codifica en WEBP.
+    Al re-codificar desde los píxeles no se copia ningún metadato (GPS, cámara…).
+    Regresa (sha256 del resultado, bytes).
+    """
+    if len(data) > MAX_UPLOAD_BYTES:
+        raise PhotoRejected("La imagen pesa demasiado")
+    try:
+        with Image.open(io.BytesIO(data)) as probe:
+            fmt = probe.format
+            width, height = probe.size
+            probe.verify()
+    except Exception:
+        raise PhotoRejected("El archivo no es una imagen válida")
+    if fmt not in ALLOWED_FORMATS:
+        raise PhotoRejected(f"Formato no permitido: {fmt}")
+    if width * height > MAX_PIXELS:
+        raise PhotoRejected("La imagen tiene demasiados píxeles")
+
+    with Image.open(io.BytesIO(data)) as im:
+        # En JPEG, draft() decodifica a escala reducida: mucho más rápido en fotos de cámara
+        im.draft("RGB", (MAX_SIDE * 2, MAX_SIDE * 2))
+        im = ImageOps.exif_transpose(im)
+        im = im.convert("RGBA" if im.mode in ("RGBA", "LA", "P") else "RGB")
+        im.thumbnail((MAX_SIDE, MAX_SIDE), Image.Resampling.LANCZOS)
+        out = io.BytesIO()
+        im.save(out, "WEBP", quality=85, method=4)
+    encoded = out.getvalue()
+    return hashlib.sha256(encoded).hexdigest(), encoded
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # spawn, no fork: al crear el pool ya corren hilos (gRPC de Firestore, uvicorn)
+        # y un hijo con fork podría heredar un candado tomado y colgarse
+        _pool = ProcessPoolExecutor(max_workers=PHOTO_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def shutdown_pool(wait: bool = True):
+    """Cierra el pool de procesos (al apagar el worker ASGI); se recrea si se vuelve a usar."""
+    global _pool
+    pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+async def ingest_photo(path: str, remove_source: bool = True) -> str:
+    """
+    Procesa un archivo subido en el pool de procesos y lo sube a Firebase Storage
+    con nombre por contenido. Regresa la URL pública de la foto (no depende del
+    worker ni del disco de este servidor).
+    """
+    if os.path.getsize(path) > MAX_UPLOAD_BYTES:
+        raise PhotoRejected("La imagen pesa demasiado")
+    data = await asyncio.to_thread(_read, path)
+    loop = asyncio.get_running_loop()
+    digest, encoded = await loop.run_in_executor(_get_pool(), process_photo, data)
+
+    url = await asyncio.to_thread(_store, f"{digest}.webp", encoded)
+    if remove_source:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return url
+
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _store(name: str, data: bytes) -> str:
+    from services.firebase_service import FirebaseService
+    return FirebaseService().upload_public_file(f"{PHOTOS_PREFIX}/{name}", data, "image/webp")
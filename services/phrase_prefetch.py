@@ -0,0 +1,113 @@
+# services/phrase_prefetch.py
+"""
+Frase del día especulativa mientras se llena el diagnóstico.
+
+Cuando el formulario lleva DEBOUNCE segundos sin cambios se pide la frase a Gemini
+en un hilo; al guardar, si las entradas (diagnóstico, emociones, etiquetas, nota)
+siguen siendo las mismas, el trabajo de la frase reutiliza esa respuesta en lugar
+de volver a llamar. Si cambiaron, la respuesta se descarta.
+
+"Cancelar" es descartar: la llamada HTTP que ya salió no se puede cortar, pero un
+cambio antes de que venza el debounce sí evita la llamada. Como mucho MAX_CALLS
+llamadas especulativas por sesión. Una por página: get_phrase_prefetch(page, ...).
+"""
+import json
+import threading
+from concurrent.futures import Future
+
+DEBOUNCE = 1.5      # segundos sin cambios antes de pedir la frase
+MAX_CALLS = 3       # llamadas especulativas por sesión
+
+_PREFETCH_KEY = "__mindful_phrase_prefetch__"
+
+
+def inputs_key(inputs: dict) -> str:
+    return json.dumps(inputs, sort_keys=True, ensure_ascii=False)
+
+
+class SpeculativePhrase:
+    def __init__(self, generate, debounce: float = DEBOUNCE, max_calls: int = MAX_CALLS):
+        self.generate = generate          # generate(inputs) -> frase (bloqueante)
+        self.debounce = debounce
+        self.max_calls = max_calls
+        self.calls = 0                    # llamadas hechas a Gemini
+        self.hits = 0                     # reutilizadas al guardar
+        self.discarded = 0                # hechas y tiradas porque cambió el formulario
+
+        self._lock = threading.Lock()
+        self._timer = None
+        self._token = 0
+        self._key = None
+        self._future = None
+
+    def update(self, inputs: dict):
+        """El formulario cambió: reinicia el debounce; la frase en curso se tira si ya no aplica."""
+        key = inputs_key(inputs)
+        with self._lock:
+            self._cancel_timer()
+            if key == self._key:
+                return  # volvió a lo que ya se pidió
+            self._drop()
+            if self.calls >= self.max_calls:
+                return
+            self._token += 1
+            timer = threading.Timer(self.debounce, self._fire, (self._token, key, inputs))
+            timer.daemon = True
+            self._timer = timer
+        try:
+            timer.start()
+        except RuntimeError:
+            # Sin hilos (Pyodide): no hay especulación, la frase se pide al guardar
+            self._timer = None
+
+    def take(self, inputs: dict) -> Future | None:
+        """Al guardar: el Future de la frase si se pidió con estas mismas entradas; si no, None."""
+        key = inputs_key(inputs)
+        with self._lock:
+            self._cancel_timer()
+            if self._future is None or self._key != key:
+                self._drop()
+                return None
+            future, self._future, self._key = self._future, None, None
+            self.hits += 1
+            return future
+
+    def cancel(self):
+        with self._lock:
+            self._cancel_timer()
+            self._drop()
+
+    # ---------- internos (con el lock tomado) ----------
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._token += 1
+
+    def _drop(self):
+        if self._future is not None:
+            self.discarded += 1
+        self._future, self._key = None, None
+
+    def _fire(self, token: int, key: str, inputs: dict):
+        with self._lock:
+            if token != self._token or self.calls >= self.max_calls:
+                return  # hubo otro cambio justo cuando vencía el debounce
+            self._timer = None
+            self.calls += 1
+            future = self._future = Future()
+            self._key = key
+        print(f"[PhrasePrefetch] pidiendo frase ({self.calls}/{self.max_calls})")
+        try:
+            future.set_result(self.generate(inputs))
+        except Exception as ex:
+            future.set_exception(ex)
+
+
+def get_phrase_prefetch(page, generate) -> SpeculativePhrase:
+    """El de la sesión (el tope de llamadas cuenta aunque se vuelva a abrir el diagnóstico)."""
+    prefetch = getattr(page, _PREFETCH_KEY, None)
+    if prefetch is None:
+        prefetch = SpeculativePhrase(generate)
+        setattr(page, _PREFETCH_KEY, prefetch)
+    return prefetch
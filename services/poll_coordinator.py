@@ -0,0 +1,203 @@
+# services/poll_coordinator.py
+import asyncio
+import os
+import threading
+import time
+
+# Microservicio de notificaciones (misma URL que usa el header)
+UPLOADER_URL = os.getenv("UPLOADER_URL", "https://mindful-imagenes.onrender.com").rstrip("/")
+
+POLL_INTERVAL = float(os.getenv("POLL_INTERVAL", "1.0"))
+POLL_MAX_QPS = float(os.getenv("POLL_MAX_QPS", "5"))   # tope de peticiones salientes por segundo
+POLL_TIMEOUT = 5
+
+
+class _TokenBucket:
+    """Limitador simple: como mucho `rate` peticiones por segundo (ráfaga = rate)."""
+
+    def __init__(self, rate: float):
+        self.rate = max(rate, 0.1)
+        self.tokens = self.rate
+        self.stamp = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.rate, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class PollCoordinator:
+    """
+    Un solo poller por proceso para los handshakes con el microservicio.
+    En vez de un hilo + requests.get por usuario cada segundo:
+      - Las sesiones pendientes se juntan y se consultan en UNA petición por tick
+        (POST {path}/batch con {"sessions": [...]}).
+      - Si el servicio no tiene endpoint batch, se cae a GET {path}?session=… por sesión,
+        repartidas en ronda y limitadas a max_qps.
+      - Todas las peticiones comparten un cliente HTTP (conexiones keep-alive).
+    Los callbacks se llaman desde el hilo del poller: quien los registra decide cómo
+    regresar al hilo de su página (p. ej. page.invoke_later).
+    """
+
+    def __init__(self, base_url: str = UPLOADER_URL, path: str = "/notify/poll",
+                 interval: float = POLL_INTERVAL, max_qps: float = POLL_MAX_QPS):
+        self.url = f"{base_url}{path}"
+        self.interval = interval
+        self.bucket = _TokenBucket(max_qps)
+        self.batch_supported = True
+        self.requests_sent = 0
+
+        self._waiters: dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._started = False
+        self._loop = None
+        self._wake = None
+        self._ready = threading.Event()
+
+    # ---------- API ----------
+    def watch(self, session_id: str, on_ready, on_timeout=None, ttl: float = 60):
+        """Espera a que el servicio marque `session_id` como listo (máximo ttl segundos)."""
+        with self._lock:
+            self._waiters[session_id] = {
+                "on_ready": on_ready,
+                "on_timeout": on_timeout,
+                "deadline": time.monotonic() + ttl,
+                "last_poll": 0.0,
+            }
+        self._ensure_started()
+        self._ready.wait()
+        self._loop.call_soon_threadsafe(self._wake.set)
+
+    def cancel(self, session_id: str):
+        with self._lock:
+            self._waiters.pop(session_id, None)
+
+    @property
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._waiters)
+
+    # ---------- hilo de fondo ----------
+    def _ensure_started(self):
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+            threading.Thread(target=self._run, daemon=True, name="poll-coordinator").start()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._wake = asyncio.Event()
+        self._ready.set()
+        self._loop.run_until_complete(self._main())
+
+    async def _main(self):
+        import httpx
+
+        async with httpx.AsyncClient(timeout=POLL_TIMEOUT) as http:
+            while True:
+                if not self.pending:
+                    # Sin sesiones pendientes el hilo duerme, no hace peticiones
+                    self._wake.clear()
+                    await self._wake.wait()
+                started = time.monotonic()
+                self._expire()
+                ready = await self._tick(http)
+                self._dispatch(ready)
+                await asyncio.sleep(max(0.0, self.interval - (time.monotonic() - started)))
+
+    async def _tick(self, http) -> set[str]:
+        with self._lock:
+            ids = list(self._waiters)
+        if not ids:
+            return set()
+        if self.batch_supported:
+            try:
+                return await self._poll_batch(http, ids)
+            except _BatchUnsupported:
+                print("[PollCoordinator] sin endpoint batch, uso polls individuales")
+                self.batch_supported = False
+            except Exception as ex:
+                print(f"[PollCoordinator] batch: {ex}")
+                return set()
+        return await self._poll_each(http)
+
+    async def _poll_batch(self, http, ids: list[str]) -> set[str]:
+        if not self.bucket.take():
+            return set()
+        self.requests_sent += 1
+        r = await http.post(f"{self.url}/batch", json={"sessions": ids})
+        if r.status_code in (404, 405):
+            raise _BatchUnsupported()
+        r.raise_for_status()
+        data = r.json()
+        # Acepta {"ready": [ids]} o {id: {"ready": bool}}
+        if isinstance(data.get("ready"), list):
+            return set(data["ready"]) & set(ids)
+        return {sid for sid, v in data.items() if isinstance(v, dict) and v.get("ready")}
+
+    async def _poll_each(self, http) -> set[str]:
+        # Primero las sesiones que llevan más tiempo sin consultarse
+        with self._lock:
+            order = sorted(self._waiters.items(), key=lambda kv: kv[1]["last_poll"])
+        batch = []
+        for sid, w in order:
+            if not self.bucket.take():
+                break
+            w["last_poll"] = time.monotonic()
+            batch.append(sid)
+
+        async def one(sid):
+            self.requests_sent += 1
+            try:
+                r = await http.get(self.url, params={"session": sid})
+                return sid if r.is_success and r.json().get("ready") else None
+            except Exception:
+                return None
+
+        return {sid for sid in await asyncio.gather(*(one(s) for s in batch)) if sid}
+
+    def _expire(self):
+        now = time.monotonic()
+        with self._lock:
+            expired = [(sid, w) for sid, w in self._waiters.items() if w["deadline"] <= now]
+            for sid, _ in expired:
+                del self._waiters[sid]
+        for sid, w in expired:
+            self._call(w["on_timeout"])
+
+    def _dispatch(self, ready: set[str]):
+        with self._lock:
+            done = [self._waiters.pop(sid) for sid in ready if sid in self._waiters]
+        for w in done:
+            self._call(w["on_ready"])
+
+    @staticmethod
+    def _call(cb):
+        if cb is None:
+            return
+        try:
+            cb()
+        except Exception as ex:
+            print(f"[PollCoordinator] callback: {ex}")
+
+
+class _BatchUnsupported(Exception):
+    pass
+
+
+_coordinator = None
+_coordinator_lock = threading.Lock()
+
+
+def get_poll_coordinator() -> PollCoordinator:
+    global _coordinator
+    with _coordinator_lock:
+        if _coordinator is None:
+            _coordinator = PollCoordinator()
+        return _coordinator
@@ -0,0 +1,64 @@
+# services/profile_cache.py
+import asyncio
+import copy
+import os
+import threading
+import time
+
+# Cuánto vive un perfil en caché sin volver a leerlo (otros procesos pueden haberlo cambiado)
+PROFILE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "300"))
+
+_profiles: dict[str, tuple[float, dict]] = {}
+_lock = threading.Lock()
+
+
+def get_cached_profile(uid: str) -> dict | None:
+    """Perfil en caché (copia) o None si no está o ya caducó. No hace lecturas."""
+    with _lock:
+        entry = _profiles.get(uid)
+        if not entry:
+            return None
+        stamp, profile = entry
+        if time.monotonic() - stamp > PROFILE_TTL:
+            del _profiles[uid]
+            return None
+        return copy.deepcopy(profile)
+
+
+def put_profile(uid: str, profile: dict | None):
+    with _lock:
+        _profiles[uid] = (time.monotonic(), copy.deepcopy(profile or {}))
+
+
+def invalidate_profile(uid: str):
+    with _lock:
+        _profiles.pop(uid, None)
+
+
+def merge_profile(uid: str, patch: dict):
+    """
+    Aplica al perfil en caché lo mismo que un set(..., merge=True) acaba de escribir,
+    así la siguiente vista no tiene que releerlo. Si no estaba en caché, no hace nada.
+    """
+    def deep_merge(dst: dict, src: dict):
+        for k, v in src.items():
+            if isinstance(v, dict) and isinstance(dst.get(k), dict):
+                deep_merge(dst[k], v)
+            else:
+                dst[k] = copy.deepcopy(v)
+
+    with _lock:
+        entry = _profiles.get(uid)
+        if entry:
+            deep_merge(entry[1], patch)
+
+
+async def load_profile(fb, uid: str, force: bool = False) -> dict:
+    """Perfil desde la caché o, si no está, una lectura en un hilo (no bloquea el loop)."""
+    if not force:
+        cached = get_cached_profile(uid)
+        if cached is not None:
+            return cached
+    profile = await asyncio.to_thread(fb.get_user_profile, uid) or {}
+    put_profile(uid, profile)
+    return copy.deepcopy(profile)
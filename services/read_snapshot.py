@@ -0,0 +1,189 @@
+# services/read_snapshot.py
+"""
+Copia chica de lo último que leímos de Firestore, guardada en client_storage por
+usuario, para que Notas, Recomendaciones, Home y Estadísticas pinten algo útil al
+instante (y sin conexión) y luego se pongan al día con el servidor.
+
+Secciones (cada una con su "savedAt"):
+  notes            notas recientes (metadatos + inicio del texto), más recientes primero
+  today            resumen `today` del perfil (frase del día)
+  recommendations  últimas recomendaciones {"date", "text"}, más recientes primero
+  stats            agregados de Estadísticas: {"notesDaily": {fecha: n}} y los
+                   últimos diagnósticos {"date", "mood"}, más recientes primero
+
+Con otro SCHEMA_VERSION (o JSON roto) el snapshot se descarta completo. Nunca
+pasa de MAX_BYTES: las listas más grandes se van recortando a la mitad.
+"""
+import copy
+import json
+import os
+import time
+
+from services.connectivity import get_connectivity
+
+SCHEMA_VERSION = 1
+KEY_PREFIX = "read_snapshot:"
+MAX_BYTES = int(os.getenv("READ_SNAPSHOT_MAX_BYTES", str(48 * 1024)))
+
+# Límites por sección (lo que se guarda, no lo que se muestra)
+MAX_NOTES = 40
+NOTE_TEXT_CHARS = 500
+MAX_DIAGNOSTICS = 120
+MAX_RECOMMENDATIONS = 20
+RECOMMENDATION_CHARS = 1200
+
+READ_TIMEOUT = 20.0  # segundos para la consulta de reconciliación
+
+
+def _key(uid: str) -> str:
+    return KEY_PREFIX + uid
+
+
+def load(page, uid: str) -> dict:
+    """Snapshot completo del usuario o {} (sin datos, otra versión o ilegible)."""
+    if not uid:
+        return {}
+    try:
+        raw = page.client_storage.get(_key(uid))
+        snap = json.loads(raw) if isinstance(raw, str) else raw
+    except Exception as ex:
+        print(f"[Snapshot] ilegible: {ex}")
+        return {}
+    if not isinstance(snap, dict) or snap.get("v") != SCHEMA_VERSION or snap.get("uid") != uid:
+        return {}
+    return snap
+
+
+def get(page, uid: str, section: str, default=None):
+    """Valor guardado de una sección (sin el savedAt) o default."""
+    entry = load(page, uid).get("sections", {}).get(section)
+    return entry["value"] if entry else default
+
+
+def saved_at(page, uid: str, section: str) -> float | None:
+    entry = load(page, uid).get("sections", {}).get(section)
+    return entry["savedAt"] if entry else None
+
+
+def _shrink(sections: dict) -> bool:
+    """Recorta a la mitad la sección más pesada. False si ya no hay qué recortar."""
+    sizes = {name: len(json.dumps(e["value"], ensure_ascii=False)) for name, e in sections.items()}
+    for name in sorted(sizes, key=sizes.get, reverse=True):
+        value = sections[name]["value"]
+        if isinstance(value, list) and len(value) > 1:
+            sections[name]["value"] = value[: len(value) // 2]
+            return True
+        if isinstance(value, dict):
+            for k, v in value.items():
+                if isinstance(v, list) and len(v) > 1:
+                    value[k] = v[: len(v) // 2]
+                    return True
+                if isinstance(v, dict) and len(v) > 1:
+                    # Agregados por fecha: se quedan los días más recientes
+                    keep = sorted(v)[len(v) // 2:]
+                    value[k] = {d: v[d] for d in keep}
+                    return True
+    return False
+
+
+def encode(snap: dict) -> str:
+    """JSON compacto que cabe en MAX_BYTES (recorta listas si hace falta)."""
+    while True:
+        data = json.dumps(snap, ensure_ascii=False, separators=(",", ":"))
+        if len(data.encode("utf-8")) <= MAX_BYTES:
+            return data
+        if not _shrink(snap["sections"]):
+            # Ni recortando cabe: mejor nada que un snapshot a medias
+            snap["sections"] = {}
+            return json.dumps(snap, separators=(",", ":"))
+
+
+def put(page, uid: str, section: str, value):
+    """Guarda una sección (reemplaza la anterior) respetando el tope de tamaño."""
+    if not uid:
+        return
+    snap = load(page, uid) or {"v": SCHEMA_VERSION, "uid": uid, "sections": {}}
+    # Copia: encode() recorta en su lugar y `value` puede ser lo que la vista va a pintar
+    snap["sections"][section] = {"savedAt": time.time(), "value": copy.deepcopy(value)}
+    try:
+        page.client_storage.set(_key(uid), encode(snap))
+    except Exception as ex:
+        # Cuota llena o cliente desconectado: el snapshot es opcional
+        print(f"[Snapshot] no se pudo guardar {section}: {ex}")
+
+
+def clear(page, uid: str):
+    """Al cerrar sesión: no dejar datos del usuario en el dispositivo."""
+    try:
+        page.client_storage.remove(_key(uid))
+    except Exception:
+        pass
+
+
+# ---------- formas compactas por sección ----------
+def compact_note(note: dict) -> dict:
+    """Tarjeta de NotesView -> lo que se guarda (el texto se corta a NOTE_TEXT_CHARS)."""
+    return {
+        "id": note["id"],
+        "title": note["title"],
+        "content": note["content"][:NOTE_TEXT_CHARS],
+        "createdKey": note["createdKey"],
+        "updatedKey": note["updatedKey"],
+    }
+
+
+def merge_notes(cached: list, day_key: str, fresh: list) -> list:
+    """Reemplaza las notas de un día (por updatedKey) y deja las MAX_NOTES más recientes."""
+    others = [n for n in cached or [] if n.get("updatedKey") != day_key]
+    merged = [compact_note(n) for n in fresh] + others
+    merged.sort(key=lambda n: n["updatedKey"], reverse=True)
+    return merged[:MAX_NOTES]
+
+
+def compact_today(today: dict | None) -> dict | None:
+    """Resumen `today` sin updatedAt (datetime o SERVER_TIMESTAMP, no son JSON)."""
+    if not today:
+        return None
+    return {k: v for k, v in today.items() if k != "updatedAt"}
+
+
+def compact_stats(notes_daily: dict, diagnostics: list) -> dict:
+    """Fechas ISO como llaves; diagnósticos más recientes primero, máximo MAX_DIAGNOSTICS."""
+    recent = sorted(diagnostics, key=lambda d: d["date"], reverse=True)[:MAX_DIAGNOSTICS]
+    return {"notesDaily": dict(notes_daily), "diagnostics": recent}
+
+
+def compact_recommendations(history: list) -> list:
+    return [
+        {"date": h["date"], "text": h["text"][:RECOMMENDATION_CHARS]}
+        for h in history[:MAX_RECOMMENDATIONS]
+    ]
+
+
+# ---------- pintar del snapshot y luego reconciliar ----------
+async def cached_then_fresh(page, uid: str, section: str, paint, fetch, to_cache=None, from_cache=None):
+    """
+    1. Si hay snapshot de `section`, paint(from_cache(valor), True) sin esperar a la red.
+    2. fresh = fetch() en un hilo (vía el monitor de conectividad); se guarda
+       to_cache(fresh) y paint(fresh, False).
+    Si fetch falla y ya se pintó el snapshot, la vista se queda con él y regresa
+    False; si no había nada que mostrar, la excepción sube.
+    """
+    cached = get(page, uid, section)
+    painted = False
+    if cached is not None:
+        value = from_cache(cached) if from_cache else cached
+        if value is not None:
+            paint(value, True)
+            painted = True
+    try:
+        # Si ya se sabe que no hay red no se intenta: lo guardado se queda sin esperar
+        fresh = await get_connectivity(page).run(fetch, base_timeout=READ_TIMEOUT)
+    except Exception as ex:
+        if not painted:
+            raise
+        print(f"[Snapshot] {section}: sin servidor, se queda lo guardado ({ex})")
+        return False
+    put(page, uid, section, to_cache(fresh) if to_cache else fresh)
+    paint(fresh, False)
+    return True
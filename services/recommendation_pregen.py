@@ -0,0 +1,227 @@
+# services/recommendation_pregen.py
+"""
+Pre-generación de la recomendación del día, fuera de horas pico.
+
+Por cada usuario con actividad en el día: lee sus notas y diagnósticos del día,
+calcula inputs_hash() y, si la recomendación guardada ya se hizo con esas mismas
+entradas (meta.inputsHash), no hace nada. Si cambiaron, llama a Gemini y guarda
+con upsert_recommendation_for_date. RecommendationsView calcula el mismo hash al
+presionar "Generar": si coincide, muestra la guardada sin llamar a Gemini.
+
+  - run_batch(): una pasada con un pool de WORKERS hilos y un límite global de
+    RPM llamadas a Gemini por minuto; regresa el reporte (rendimiento y tasa de
+    omisión).
+  - tools/pregen_recommendations.py: la misma pasada desde la línea de comandos.
+  - start_scheduler(): hilo del proceso que corre una pasada en cada hora de
+    PREGEN_HOURS (hora de CDMX). Solo con PREGEN_SCHEDULER=1 y solo en un worker
+    (candado de archivo).
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+WORKERS = int(os.getenv("PREGEN_WORKERS", "4"))
+RPM = float(os.getenv("PREGEN_RPM", "30"))      # llamadas a Gemini por minuto, en todo el lote
+PREGEN_HOURS = tuple(int(h) for h in os.getenv("PREGEN_HOURS", "11,15,19").split(",") if h.strip())
+LOCK_PATH = os.getenv("PREGEN_LOCK", os.path.join("storage", "pregen.lock"))
+
+NOTES_LIMIT = 30
+DIAGNOSTICS_LIMIT = 3
+ACTIVE_USERS_LIMIT = int(os.getenv("PREGEN_MAX_USERS", "5000"))  # por pasada
+
+GENERATED, UNCHANGED, EMPTY, FAILED = "generated", "unchanged", "empty", "failed"
+
+
+def display_name_of(profile: dict | None) -> str:
+    profile = profile or {}
+    return profile.get("username") or (profile.get("email") or "").split("@")[0] or "la persona usuaria"
+
+
+def inputs_hash(notes: list[dict], diagnostics: list[dict], name: str) -> str:
+    """Huella de lo que entra al prompt: si no cambia, la recomendación tampoco tiene por qué."""
+    data = {
+        "name": name,
+        "notes": [[n.get("id"), n.get("title"), n.get("content")] for n in notes],
+        "diagnostics": [
+            [d.get("id"), d.get("diagnosis"), d.get("mood"), d.get("emotions"), d.get("dayTags")]
+            for d in diagnostics
+        ],
+    }
+    return hashlib.sha1(json.dumps(data, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def is_current(recommendation: dict | None, digest: str) -> bool:
+    return bool(recommendation) and (recommendation.get("meta") or {}).get("inputsHash") == digest
+
+
+def recommendation_meta(notes: list[dict], diagnostics: list[dict], digest: str | None, **extra) -> dict:
+    meta = {"source": "gemini-2.0-flash", "notesCount": len(notes), "diagsCount": len(diagnostics), **extra}
+    if digest:
+        meta["inputsHash"] = digest
+    return meta
+
+
+class RateLimiter:
+    """Cubeta de fichas compartida por los hilos: como mucho per_minute llamadas por minuto."""
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        self.interval = 60.0 / per_minute
+        self.burst = burst
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) / self.interval)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * self.interval
+            time.sleep(wait)
+
+
+def pregenerate_user(fb, gem, uid: str, date_key: str, start_utc, end_utc, limiter: RateLimiter | None = None,
+                     dry_run: bool = False) -> str:
+    notes = fb.list_notes_between(uid, start_utc, end_utc, NOTES_LIMIT)
+    diagnostics = fb.list_diagnostics_between(uid, start_utc, end_utc, DIAGNOSTICS_LIMIT)
+    if not notes and not diagnostics:
+        return EMPTY
+    name = display_name_of(fb.get_user_profile(uid))
+    digest = inputs_hash(notes, diagnostics, name)
+    if is_current(fb.get_recommendation_for_date(uid, date_key), digest):
+        return UNCHANGED
+    if dry_run:
+        return GENERATED
+    if limiter is not None:
+        limiter.acquire()
+    try:
+        text = gem.generate_professional_recommendation(notes, diagnostics, name, 550, 0.8, 0.9, 40)
+    except Exception as ex:
+        # Sin respaldo: que el botón lo intente de nuevo cuando el usuario lo pida
+        print(f"[Pregen] {uid}: Gemini falló ({ex})")
+        return FAILED
+    fb.upsert_recommendation_for_date(
+        uid, date_key, text, recommendation_meta(notes, diagnostics, digest, pregenerated=True)
+    )
+    return GENERATED
+
+
+def run_batch(fb=None, gem=None, date_key: str | None = None, uids: list[str] | None = None,
+              workers: int = WORKERS, rpm: float = RPM, bounds=None, dry_run: bool = False) -> dict:
+    """
+    Una pasada sobre `uids` (por defecto, los activos del día, hasta
+    ACTIVE_USERS_LIMIT). Regresa {"date", "users", "truncated", "generated",
+    "unchanged", "empty", "failed", "seconds", "usersPerSecond", "skipRate"};
+    truncated = hubo más activos que el tope y esos se quedaron sin pasada.
+    """
+    if fb is None:
+        from services.firebase_service import FirebaseService
+        fb = FirebaseService()
+    if gem is None:
+        from services.gemini_service import GeminiService
+        gem = GeminiService()
+    if date_key is None or bounds is None:
+        from services.day_utils import day_bounds_utc, today_key
+        date_key = date_key or today_key()
+        bounds = bounds or day_bounds_utc(date_key)
+    start_utc, end_utc = bounds
+
+    t0 = time.monotonic()
+    truncated = False
+    if uids is None:
+        uids, truncated = fb.active_user_ids_between(start_utc, end_utc, ACTIVE_USERS_LIMIT)
+        if truncated:
+            print(f"[Pregen] más de {ACTIVE_USERS_LIMIT} usuarios activos: el resto se queda sin pasada")
+    limiter = RateLimiter(rpm)
+
+    def one(uid):
+        try:
+            return pregenerate_user(fb, gem, uid, date_key, start_utc, end_utc, limiter, dry_run)
+        except Exception as ex:
+            print(f"[Pregen] {uid}: {ex}")
+            return FAILED
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pregen") as pool:
+        outcomes = list(pool.map(one, uids))
+
+    seconds = time.monotonic() - t0
+    report = {"date": date_key, "users": len(uids), "truncated": truncated}
+    for outcome in (GENERATED, UNCHANGED, EMPTY, FAILED):
+        report[outcome] = outcomes.count(outcome)
+    report["seconds"] = round(seconds, 2)
+    report["usersPerSecond"] = round(len(uids) / seconds, 2) if seconds else 0.0
+    report["skipRate"] = round((report[UNCHANGED] + report[EMPTY]) / len(uids), 3) if uids else 0.0
+    print(f"[Pregen] {json.dumps(report)}")
+    return report
+
+
+# ---------- programador dentro del proceso ----------
+_scheduler = None
+
+
+def _seconds_until_next_run(hours=PREGEN_HOURS) -> float:
+    from datetime import datetime, timedelta
+    from services.day_utils import local_tz
+
+    now = datetime.now(local_tz())
+    candidates = [now.replace(hour=h, minute=0, second=0, microsecond=0) for h in sorted(hours)]
+    candidates += [c + timedelta(days=1) for c in candidates]
+    return next((c - now).total_seconds() for c in candidates if c > now)
+
+
+def _acquire_lock():
+    """Candado de archivo no bloqueante: el primer worker que lo toma es el que programa."""
+    try:
+        import fcntl
+    except ImportError:
+        return None  # Windows/Pyodide: sin candado, se confía en PREGEN_SCHEDULER
+    os.makedirs(os.path.dirname(LOCK_PATH) or ".", exist_ok=True)
+    handle = open(LOCK_PATH, "w")
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return False
+    return handle
+
+
+def start_scheduler() -> bool:
+    """Arranca el hilo si PREGEN_SCHEDULER=1 y este worker obtuvo el candado."""
+    global _scheduler
+    if _scheduler is not None or os.getenv("PREGEN_SCHEDULER") != "1" or not PREGEN_HOURS:
+        return False
+    lock = _acquire_lock()
+    if lock is False:
+        return False
+    stop = threading.Event()
+
+    def loop():
+        while not stop.wait(_seconds_until_next_run()):
+            try:
+                run_batch()
+            except Exception as ex:
+                print(f"[Pregen] pasada fallida: {ex}")
+
+    thread = threading.Thread(target=loop, daemon=True, name="pregen-scheduler")
+    _scheduler = (thread, stop, lock)
+    thread.start()
+    print(f"[Pregen] programado a las {', '.join(f'{h}:00' for h in PREGEN_HOURS)} (pid {os.getpid()})")
+    return True
+
+
+def stop_scheduler():
+    global _scheduler
+    if _scheduler is None:
+        return
+    _thread, stop, lock = _scheduler
+    stop.set()
+    if lock:
+        lock.close()
+    _scheduler = None
@@ -0,0 +1,89 @@
+# services/session_prefetch.py
+import asyncio
+import json
+
+from services.day_utils import today_key
+from services.profile_cache import put_profile
+
+# Clave en page.session donde el splash deja lo que ya descargó
+PREFETCH_KEY = "prefetch"
+
+
+def restore_user(page):
+    """Recupera el usuario de la sesión o del client_storage (dict o JSON)."""
+    user = page.session.get("user")
+    if isinstance(user, dict) and user.get("uid"):
+        return user
+    try:
+        raw = page.client_storage.get("user")
+        if isinstance(raw, str):
+            raw = json.loads(raw)
+        if isinstance(raw, dict) and raw.get("uid"):
+            page.session.set("user", raw)
+            return raw
+    except Exception:
+        pass
+    return None
+
+
+def _warm_client():
+    # Import diferido: firebase_admin es pesado y el splash no debe esperarlo
+    from services.firebase_service import FirebaseService
+    return FirebaseService()
+
+
+async def prefetch_session(page) -> dict:
+    """
+    Arranca en paralelo todo lo que la primera pantalla necesita:
+    usuario guardado, cliente de Firestore y perfil (que ya trae el resumen de hoy).
+    El resultado se guarda en page.session[PREFETCH_KEY] aunque el splash
+    ya se haya ido (si llegó tarde, la vista destino lo usará si puede).
+    """
+    user = restore_user(page)
+    uid = (user or {}).get("uid")
+    result = {"uid": uid, "dateKey": today_key()}
+    if not uid:
+        return result
+
+    fb = await asyncio.to_thread(_warm_client)
+    try:
+        profile = await asyncio.to_thread(fb.get_user_profile, uid)
+    except Exception as ex:
+        # Solo guardamos lo que sí se pudo leer; lo demás lo pide la vista
+        print(f"[Prefetch] perfil falló: {ex}")
+    else:
+        result["profile"] = profile or {}
+        result["today"] = fb.today_summary(profile)
+        put_profile(uid, result["profile"])
+
+    page.session.set(PREFETCH_KEY, result)
+    return result
+
+
+def stash_profile(page, uid: str, profile: dict | None):
+    """Deja el perfil recién leído (p. ej. en el login) para que Home no lo vuelva a pedir."""
+    from services.firebase_service import FirebaseService
+    put_profile(uid, profile)
+    page.session.set(PREFETCH_KEY, {
+        "uid": uid,
+        "dateKey": today_key(),
+        "profile": profile or {},
+        "today": FirebaseService.today_summary(profile),
+    })
+
+
+def take_prefetch(page, uid: str):
+    """
+    Entrega (una sola vez) lo precargado para este usuario y este día.
+    Regresa None si no hay nada o si ya no corresponde.
+    """
+    data = page.session.get(PREFETCH_KEY)
+    if not isinstance(data, dict) or data.get("uid") != uid or data.get("dateKey") != today_key():
+        return None
+    page.session.remove(PREFETCH_KEY)
+    return data
+
+
+def is_professional(profile: dict | None) -> bool:
+    profile = profile or {}
+    return (profile.get("type") == "profesional") or bool(profile.get("professional"))
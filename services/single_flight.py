@@ -0,0 +1,112 @@
+# services/single_flight.py
+"""
+Single-flight: si llega una llamada idéntica (misma clave) mientras otra sigue en
+curso, no se repite: espera a la primera y recibe el mismo resultado (o la misma
+excepción; el resultado llega como copia para que nadie comparta listas o dicts
+mutables). Cuando termina, la siguiente llamada ya vuelve a ejecutarse; esto no
+es una caché.
+
+Uno por proceso (get_single_flight()), así se juntan también las llamadas de
+distintas sesiones del mismo usuario. La clave es (operación, uid, args...); el
+primer elemento es el que agrupa los contadores de counters().
+
+    @shared("list_notes")                 # métodos de lectura de FirebaseService
+    def list_notes(self, uid, limit=100): ...
+
+    get_single_flight().do(key, fn, *args)             # desde un hilo
+    await get_single_flight().do_async(key, fn, *args) # desde el loop (fn puede ser async)
+"""
+import asyncio
+import copy
+import functools
+import inspect
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    def __init__(self):
+        self._inflight: dict[tuple, list] = {}
+        self._counts: dict[str, list[int]] = {}   # operación -> [llamadas, ejecutadas]
+        self._lock = threading.Lock()
+
+    def _join(self, key: tuple) -> tuple[Future, bool]:
+        """(future, es_el_primero)."""
+        with self._lock:
+            counts = self._counts.setdefault(key[0], [0, 0])
+            counts[0] += 1
+            entry = self._inflight.get(key)
+            if entry is not None:
+                entry[1] += 1
+                return entry[0], False
+            counts[1] += 1
+            future = Future()
+            self._inflight[key] = [future, 0]   # [future, cuántos esperan]
+            return future, True
+
+    def _finish(self, key: tuple, future: Future, result=None, error: BaseException | None = None):
+        with self._lock:
+            _, waiting = self._inflight.pop(key)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            # Copia aparte: el primero puede modificar su resultado mientras los demás lo copian
+            future.set_result(copy.deepcopy(result) if waiting else result)
+
+    def do(self, key: tuple, fn, *args):
+        future, leader = self._join(key)
+        if not leader:
+            return copy.deepcopy(future.result())
+        try:
+            result = fn(*args)
+        except BaseException as ex:
+            self._finish(key, future, error=ex)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def do_async(self, key: tuple, fn, *args):
+        future, leader = self._join(key)
+        if not leader:
+            return copy.deepcopy(await asyncio.wrap_future(future))
+        try:
+            if inspect.iscoroutinefunction(fn):
+                result = await fn(*args)
+            else:
+                result = await asyncio.to_thread(fn, *args)
+        except BaseException as ex:
+            self._finish(key, future, error=ex)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    def counters(self) -> dict[str, dict]:
+        """{operación: {"calls", "executed", "collapsed"}}."""
+        with self._lock:
+            return {
+                op: {"calls": calls, "executed": executed, "collapsed": calls - executed}
+                for op, (calls, executed) in self._counts.items()
+            }
+
+
+_flight = None
+_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> SingleFlight:
+    global _flight
+    with _flight_lock:
+        if _flight is None:
+            _flight = SingleFlight()
+        return _flight
+
+
+def shared(operation: str):
+    """Decorador para métodos de lectura: la clave es (operation, *args, **kwargs), sin self."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = (operation, *args, *sorted(kwargs.items()))
+            return get_single_flight().do(key, functools.partial(method, self, *args, **kwargs))
+        return wrapper
+    return decorator
@@ -1,50 +1,79 @@
 # services/sync_offline.py
-import asyncio
-from services.firebase_service import FirebaseService
 from services import offline_queue
 
 
-async def sync_offline_actions(page):
+def apply_action(fb, action: dict):
+    """Una escritura a Firestore por acción (la cola ya viene coalescida). Regresa el id del documento."""
+    op, kind = action.get("op"), action.get("kind")
+    uid, doc_id = action.get("uid"), action.get("doc_id")
+    payload = action.get("payload") or {}
+
+    # Un create con id real usa ese id: si el intento en línea sí llegó, no se duplica
+    server_id = None if offline_queue.is_local_id(doc_id) else doc_id
+
+    # --- NOTAS ---
+    if kind == "note":
+        if op == "create":
+            return fb.add_note(uid, payload.get("title", ""), payload.get("content", ""), server_id)
+        elif op == "update":
+            fb.update_note(uid, doc_id, payload.get("title", ""), payload.get("content", ""))
+        elif op == "delete":
+            fb.delete_note(uid, doc_id)
+
+    # --- DIAGNÓSTICOS ---
+    elif kind == "diagnostic":
+        if op == "create":
+            return fb.add_diagnostic(uid, payload, server_id)
+        elif op == "update":
+            fb.update_diagnostic(uid, doc_id, payload)
+        elif op == "delete":
+            fb.delete_diagnostic(uid, doc_id)
+
+    # --- RECOMENDACIONES (doc_id = fecha) ---
+    elif kind == "recommendation":
+        if op in ("create", "update"):
+            fb.upsert_recommendation_for_date(uid, doc_id, payload.get("text", ""), payload.get("meta"))
+        elif op == "delete":
+            fb.delete_recommendation(uid, doc_id)
+    return doc_id
+
+
+async def sync_offline_actions(page, fb=None):
     """
     Llamar cuando el usuario vuelva a estar "online".
-    Intenta subir todo lo que haya en la cola.
+    Sube la cola ya coalescida: una escritura por documento tocado sin conexión.
+    Regresa cuántas escrituras se hicieron.
     """
     if not offline_queue.has_pending(page):
-        return
+        return 0
 
-    fb = FirebaseService()
-    pending = offline_queue.pop_all(page)
+    if fb is None:
+        from services.firebase_service import FirebaseService
+        fb = FirebaseService()
+    pending = offline_queue.coalesce(offline_queue.pop_all(page))
     still_pending = []
+    writes = 0
 
     for action in pending:
-        typ = action.get("type")
-        payload = action.get("payload") or {}
-        uid = action.get("uid")
-
+        # Un update/delete sobre un id local solo puede venir de un create que falló
+        # antes; sin él no hay documento en el servidor al que aplicarlo
+        if action["op"] != "create" and offline_queue.is_local_id(action.get("doc_id")):
+            continue
         try:
-            # --- NOTAS OFFLINE ---
-            if typ == "note":
-                fb.add_note(
-                    uid,
-                    payload.get("title", ""),
-                    payload.get("content", ""),
-                )
-
-            # --- DIAGNÓSTICOS OFFLINE ---
-            elif typ == "diagnostic":
-                # Aquí el payload es el mismo que guardamos en diagnostic_page
-                fb.add_diagnostic(uid, payload)
-
-            # Aquí podrías agregar más tipos:
-            # elif typ == "otra_cosa":
-            #     fb.algo(uid, **payload)
-
+            doc_id = apply_action(fb, action)
+            writes += 1
         except Exception as e:
             # Si falla, lo regresamos a la cola para intentar más tarde
-            print("[SYNC] Error al sincronizar acción:", typ, e)
+            print("[SYNC] Error al sincronizar acción:", action.get("op"), action.get("kind"), e)
             still_pending.append(action)
+            continue
+
+        # Diagnóstico hecho sin conexión: su frase no se pudo pedir entonces
+        if action["kind"] == "diagnostic" and action["op"] == "create" and not (action.get("payload") or {}).get("phrase"):
+            from services.background_jobs import submit_phrase
+            submit_phrase(page, action["uid"], doc_id, action["payload"], fb=fb)
 
-    # Re-graba lo que no se pudo enviar
+    # Re-graba lo que no se pudo enviar (antes de lo que se encoló mientras tanto)
     if still_pending:
-        for a in still_pending:
-            offline_queue.queue_action(page, a)
+        offline_queue.requeue(page, still_pending)
+    return writes
@@ -0,0 +1,183 @@
+# tools/compress_dist.py
+"""
+Paso de build para dist/ (después de tools/web_bundle.py y antes de
+tools/precache_manifest.py):
+
+  1. Nombres con hash de contenido para la cadena que cargamos nosotros:
+     index.html -> python.<h>.js -> python-worker.<h>.js -> app.<h>.tar.gz
+     (se reescriben las referencias; los nombres viejos se borran). Con eso se
+     pueden servir como `immutable`. Los archivos de Flutter (assets/, flutter*.js)
+     los pide el runtime por nombre fijo: se quedan igual y se revalidan.
+  2. Variantes .gz (gzip -9) y .br (brotli, si el paquete `brotli` está instalado)
+     de todo lo comprimible, solo si ahorran al menos MIN_SAVING.
+
+tools/serve_dist.py y deploy/nginx.conf negocian Accept-Encoding con estas
+variantes y ponen los headers de caché.
+
+Uso (desde la raíz del repo):
+    python tools/compress_dist.py [--dist dist]
+"""
+import argparse
+import glob
+import gzip
+import hashlib
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+try:
+    import brotli  # opcional: pip install brotli
+except ImportError:
+    brotli = None
+
+# (archivo, archivo que lo referencia), de las hojas hacia index.html
+HASHED_CHAIN = [
+    ("app.tar.gz", "python-worker.js"),
+    ("python-worker.js", "python.js"),
+    ("python.js", "index.html"),
+]
+HASH_LEN = 10
+HASHED_RE = re.compile(r"\.[0-9a-f]{%d}\.(?:js|tar\.gz)$" % HASH_LEN)
+COMPRESSIBLE = (
+    ".js", ".mjs", ".json", ".html", ".css", ".svg", ".txt", ".wasm",
+    ".otf", ".ttf", ".frag", ".bin", ".map",
+)
+COMPRESSIBLE_NAMES = {"NOTICES"}
+MIN_SAVING = 0.10
+
+
+def _split(name: str) -> tuple[str, str]:
+    """app.tar.gz -> ("app", ".tar.gz"); python.js -> ("python", ".js")."""
+    if name.endswith(".tar.gz"):
+        return name[: -len(".tar.gz")], ".tar.gz"
+    stem, ext = os.path.splitext(name)
+    return stem, ext
+
+
+def _name_re(name: str) -> re.Pattern:
+    """Coincide con el nombre plano o con cualquier versión con hash."""
+    stem, ext = _split(name)
+    return re.compile(r"(?<![\w.-])%s(?:\.[0-9a-f]{%d})?%s(?![\w.-])" % (re.escape(stem), HASH_LEN, re.escape(ext)))
+
+
+def _hashed_variants(dist_dir: str, name: str) -> list[str]:
+    stem, ext = _split(name)
+    pattern = os.path.join(dist_dir, f"{glob.escape(stem)}.{'[0-9a-f]' * HASH_LEN}{ext}")
+    return [p for suffix in ("", ".gz", ".br") for p in glob.glob(pattern + suffix)]
+
+
+def hash_names(dist_dir: str) -> dict:
+    """Renombra la cadena con hashes de contenido. Regresa {nombre: nombre_con_hash}."""
+    renamed = {}
+    for name, parent in HASHED_CHAIN:
+        src = os.path.join(dist_dir, name)
+        if not os.path.exists(src):
+            # Ya procesado y sin un build nuevo encima: nada que hacer
+            continue
+        with open(src, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()[:HASH_LEN]
+        stem, ext = _split(name)
+        hashed = f"{stem}.{digest}{ext}"
+        for old in _hashed_variants(dist_dir, name):
+            os.remove(old)
+        os.replace(src, os.path.join(dist_dir, hashed))
+
+        parent_path = os.path.join(dist_dir, parent)
+        if not os.path.exists(parent_path):
+            # El padre ya tenía hash: al cambiarle la referencia cambia su contenido,
+            # así que vuelve a su nombre plano y el siguiente paso le pone hash nuevo
+            previous = [p for p in _hashed_variants(dist_dir, parent) if not p.endswith((".gz", ".br"))]
+            if previous:
+                os.replace(previous[0], parent_path)
+                for old in _hashed_variants(dist_dir, parent):
+                    os.remove(old)
+        if os.path.exists(parent_path):
+            with open(parent_path, "r", encoding="utf-8") as f:
+                text = f.read()
+            text, n = _name_re(name).subn(hashed, text)
+            if not n:
+                print(f"[compress] aviso: {parent} no menciona {name}")
+            with open(parent_path, "w", encoding="utf-8") as f:
+                f.write(text)
+        renamed[name] = hashed
+    return renamed
+
+
+def is_variant(name: str, siblings: set[str]) -> bool:
+    """True si name es la variante .gz/.br de otro archivo del mismo directorio."""
+    return name.endswith((".gz", ".br")) and name[:-3] in siblings
+
+
+def is_compressible(name: str) -> bool:
+    return name.endswith(COMPRESSIBLE) or name in COMPRESSIBLE_NAMES
+
+
+def _write_if_smaller(path: str, data: bytes, original: int) -> bool:
+    if len(data) > original * (1 - MIN_SAVING):
+        if os.path.exists(path):
+            os.remove(path)
+        return False
+    with open(path, "wb") as f:
+        f.write(data)
+    return True
+
+
+def compress_file(path: str) -> tuple[int, int, int]:
+    """Escribe (o borra, si no conviene) path.gz y path.br. Regresa (crudo, gzip, brotli)."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    gz = gzip.compress(raw, compresslevel=9, mtime=0)
+    gz_size = len(gz) if _write_if_smaller(path + ".gz", gz, len(raw)) else len(raw)
+    br_size = len(raw)
+    if brotli is not None:
+        br = brotli.compress(raw, quality=11)
+        br_size = len(br) if _write_if_smaller(path + ".br", br, len(raw)) else len(raw)
+    return len(raw), gz_size, br_size
+
+
+def compress_all(dist_dir: str) -> dict:
+    """Escribe X.gz / X.br junto a cada X comprimible. Regresa totales en bytes."""
+    totals = {"files": 0, "raw": 0, "gz": 0, "br": 0}
+    for dirpath, _dirnames, filenames in os.walk(dist_dir):
+        names = set(filenames)
+        for name in sorted(filenames):
+            path = os.path.join(dirpath, name)
+            if is_variant(name, names):
+                continue
+            if name.endswith(".br") or (name.endswith(".gz") and not name.endswith(".tar.gz")):
+                os.remove(path)  # variante huérfana (su original ya no existe)
+                continue
+            if not is_compressible(name):
+                continue
+            raw, gz, br = compress_file(path)
+            totals["files"] += 1
+            totals["raw"] += raw
+            totals["gz"] += gz
+            totals["br"] += br
+    return totals
+
+
+def build(dist_dir: str, verbose: bool = True) -> dict:
+    renamed = hash_names(dist_dir)
+    totals = compress_all(dist_dir)
+    if verbose:
+        for name, hashed in renamed.items():
+            print(f"[compress] {name} -> {hashed}")
+        print(f"[compress] {totals['files']} comprimibles: {totals['raw'] / 1024:.1f} KB -> "
+              f"gzip {totals['gz'] / 1024:.1f} KB"
+              + (f", brotli {totals['br'] / 1024:.1f} KB" if brotli else " (sin brotli: pip install brotli)"))
+    return {"renamed": renamed, "totals": totals}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Nombres con hash y variantes .gz/.br de dist/")
+    ap.add_argument("--dist", default=os.path.join(ROOT, "dist"))
+    args = ap.parse_args()
+    build(args.dist)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# tools/precache_manifest.py
+"""
+Paso de build después de `flet publish` (y de tools/web_bundle.py y
+tools/compress_dist.py):
+
+  1. Calcula el hash de contenido de cada archivo de dist/ y escribe
+     dist/precache-manifest.json = {"version": ..., "files": {"/ruta": "hash"}}.
+  2. Genera dist/service_worker.js a partir de web/service_worker.js con el
+     manifiesto incrustado: cualquier cambio en dist/ cambia el script, el navegador
+     instala la versión nueva y esta solo baja las entradas cuyo hash cambió.
+  3. Apunta flutter_bootstrap.js a ese service worker (en vez del
+     flutter_service_worker.js que genera Flutter: solo puede haber uno por scope).
+
+Uso (desde la raíz del repo):
+    python tools/precache_manifest.py [--dist dist]
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tools.compress_dist import compress_file, is_variant  # noqa: E402
+
+MANIFEST_NAME = "precache-manifest.json"
+SW_NAME = "service_worker.js"
+SW_TEMPLATE = os.path.join(ROOT, "web", SW_NAME)
+# Lo que no se precachea: los propios service workers (el navegador los revisa
+# siempre con la red), el manifiesto y archivos del build que nadie pide
+EXCLUDE = {SW_NAME, "flutter_service_worker.js", MANIFEST_NAME, ".last_build_id"}
+EXCLUDE_SUFFIXES = (".map", ".part")
+HASH_LEN = 16
+
+
+def file_hash(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()[:HASH_LEN]
+
+
+def build_manifest(dist_dir: str) -> dict:
+    files = {}
+    for dirpath, dirnames, filenames in os.walk(dist_dir):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        siblings = set(filenames)
+        for name in sorted(filenames):
+            rel = os.path.relpath(os.path.join(dirpath, name), dist_dir).replace(os.sep, "/")
+            if rel in EXCLUDE or name.startswith(".") or name.endswith(EXCLUDE_SUFFIXES):
+                continue
+            if is_variant(name, siblings):
+                continue  # .gz/.br de tools/compress_dist.py: el navegador negocia la codificación
+            files["/" + rel] = file_hash(os.path.join(dirpath, name))
+    return {"version": manifest_version(files), "files": files}
+
+
+def manifest_version(files: dict) -> str:
+    return hashlib.sha256(json.dumps(files, sort_keys=True).encode("utf-8")).hexdigest()[:HASH_LEN]
+
+
+def diff_manifests(old: dict | None, new: dict) -> tuple[list[str], list[str]]:
+    """(rutas nuevas o cambiadas, rutas que ya no existen) entre dos manifiestos."""
+    old_files = (old or {}).get("files", {})
+    changed = [p for p, h in new["files"].items() if old_files.get(p) != h]
+    removed = [p for p in old_files if p not in new["files"]]
+    return changed, removed
+
+
+def write_service_worker(dist_dir: str, manifest: dict):
+    with open(SW_TEMPLATE, "r", encoding="utf-8") as f:
+        template = f.read()
+    header = (
+        "// Generado por tools/precache_manifest.py: no editar aquí, sino en web/service_worker.js\n"
+        f"self.PRECACHE_MANIFEST = {json.dumps(manifest, sort_keys=True)};\n\n"
+    )
+    with open(os.path.join(dist_dir, SW_NAME), "w", encoding="utf-8") as f:
+        f.write(header + template)
+
+
+def point_bootstrap(dist_dir: str, version: str) -> bool:
+    """serviceWorkerSettings de flutter_bootstrap.js -> nuestro SW con ?v=<versión>."""
+    path = os.path.join(dist_dir, "flutter_bootstrap.js")
+    if not os.path.exists(path):
+        return False
+    with open(path, "r", encoding="utf-8") as f:
+        js = f.read()
+    settings = (
+        "serviceWorkerSettings: {\n"
+        f'        serviceWorkerVersion: "{version}",\n'
+        f'        serviceWorkerUrl: "{SW_NAME}?v={version}",\n'
+        "    }"
+    )
+    js, n = re.subn(r"serviceWorkerSettings:\s*\{[^}]*\}", settings, js, count=1)
+    if n:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(js)
+    return bool(n)
+
+
+def build(dist_dir: str, verbose: bool = True) -> dict:
+    manifest_path = os.path.join(dist_dir, MANIFEST_NAME)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            old = json.load(f)
+    except (OSError, ValueError):
+        old = None
+
+    # flutter_bootstrap.js entra al manifiesto: se reescribe antes de hashear.
+    # La versión que lleva dentro sale de los demás archivos (si no, nunca converge).
+    files = build_manifest(dist_dir)["files"]
+    files.pop("/flutter_bootstrap.js", None)
+    version = manifest_version(files)
+    pointed = point_bootstrap(dist_dir, version)
+
+    manifest = build_manifest(dist_dir)
+    manifest["version"] = version
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=1, sort_keys=True)
+    write_service_worker(dist_dir, manifest)
+    # Lo que se acaba de reescribir deja viejas sus variantes .gz/.br (si había)
+    for name in (SW_NAME, MANIFEST_NAME, "flutter_bootstrap.js"):
+        path = os.path.join(dist_dir, name)
+        if os.path.exists(path) and (os.path.exists(path + ".gz") or os.path.exists(path + ".br")):
+            compress_file(path)
+
+    changed, removed = diff_manifests(old, manifest)
+    if verbose:
+        total = sum(os.path.getsize(os.path.join(dist_dir, p.lstrip("/"))) for p in manifest["files"])
+        print(f"[precache] versión {version}: {len(manifest['files'])} archivos, {total / 1024:.1f} KB")
+        print(f"[precache] cambiaron {len(changed)}, se quitaron {len(removed)} respecto al build anterior")
+        if not pointed:
+            print("[precache] aviso: no encontré serviceWorkerSettings en flutter_bootstrap.js")
+    return {"manifest": manifest, "changed": changed, "removed": removed}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Genera el manifiesto de precache y el service worker de dist/")
+    ap.add_argument("--dist", default=os.path.join(ROOT, "dist"))
+    args = ap.parse_args()
+    build(args.dist)
+
+
+if __name__ == "__main__":
+    main()
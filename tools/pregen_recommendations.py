@@ -0,0 +1,44 @@
+# tools/pregen_recommendations.py
+"""
+Pre-genera la recomendación del día de los usuarios con actividad (notas o
+diagnósticos) en esa fecha; los que no cambiaron desde la última generación se
+omiten. Misma pasada que el programador de services.recommendation_pregen, para
+correrla a mano o desde cron fuera de horas pico.
+
+Uso (desde la raíz del repo):
+    python tools/pregen_recommendations.py [--date 2026-10-19] [--uid UID ...]
+                                           [--workers 4] [--rpm 30] [--dry-run]
+"""
+import argparse
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from dotenv import load_dotenv  # noqa: E402
+
+from services import recommendation_pregen  # noqa: E402
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--date", help="YYYY-MM-DD (hora de CDMX); por defecto, hoy")
+    ap.add_argument("--uid", action="append", help="solo estos usuarios (repetible)")
+    ap.add_argument("--workers", type=int, default=recommendation_pregen.WORKERS)
+    ap.add_argument("--rpm", type=float, default=recommendation_pregen.RPM, help="llamadas a Gemini por minuto")
+    ap.add_argument("--dry-run", action="store_true", help="solo cuenta a quién habría que generar")
+    args = ap.parse_args()
+
+    load_dotenv()
+    os.chdir(ROOT)  # keys.json y el service account se buscan relativos a la raíz
+    report = recommendation_pregen.run_batch(
+        date_key=args.date, uids=args.uid, workers=args.workers, rpm=args.rpm, dry_run=args.dry_run,
+    )
+    print(json.dumps(report, indent=2))
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
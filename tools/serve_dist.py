@@ -0,0 +1,176 @@
+# tools/serve_dist.py
+"""
+Servidor estático de dist/ para probar el build web y el service worker en local.
+
+- Cuenta cada petición que llega a la red (lo que el service worker no atendió) y
+  la imprime como "[serve_dist] 200 /ruta". GET /__stats regresa los conteos y los
+  bytes enviados en JSON; GET /__stats?reset=1 los pone en cero (para medir una visita).
+- Negocia Accept-Encoding con las variantes .br / .gz de tools/compress_dist.py
+  (Content-Encoding + Vary). --no-compress sirve todo sin comprimir.
+- Caché: nombres con hash (python.<h>.js, app.<h>.tar.gz) -> immutable por un año;
+  service_worker.js, index.html y el manifiesto -> no-cache; el resto se revalida
+  con ETag (304 si no cambió).
+- Rutas de la SPA sin extensión (/home, /notes…) regresan index.html.
+
+Uso (desde la raíz del repo):
+    python tools/serve_dist.py [--port 8550] [--dist dist] [--quiet] [--no-compress]
+"""
+import argparse
+import json
+import mimetypes
+import os
+import shutil
+import sys
+import threading
+from collections import Counter
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from tools.compress_dist import HASHED_RE  # noqa: E402
+
+NO_CACHE = {"/service_worker.js", "/index.html", "/precache-manifest.json"}
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "public, max-age=0, must-revalidate"
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+TYPES = {
+    ".wasm": "application/wasm",
+    ".mjs": "text/javascript",
+    ".js": "text/javascript",
+    ".json": "application/json",
+    ".gz": "application/gzip",
+    ".frag": "application/octet-stream",
+}
+
+
+def cache_control(path: str) -> str:
+    if path in NO_CACHE:
+        return "no-cache"
+    return IMMUTABLE if HASHED_RE.search(path) else REVALIDATE
+
+
+class DistHandler(SimpleHTTPRequestHandler):
+    counts = Counter()
+    sent = Counter()
+    lock = threading.Lock()
+    quiet = False
+    compress = True
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        if parts.path == "/__stats":
+            self._stats(bool(parse_qs(parts.query).get("reset")))
+            return
+
+        path = unquote(parts.path)
+        local = os.path.join(self.directory, path.lstrip("/"))
+        if path == "/" or ("." not in os.path.basename(path) and not os.path.isfile(local)):
+            path, local = "/index.html", os.path.join(self.directory, "index.html")  # SPA
+        if not os.path.isfile(local) or ".." in path.split("/"):
+            self._count(parts.path, 0)
+            self.send_error(404, "No existe")
+            return
+
+        # Variante comprimida según Accept-Encoding
+        accepted = {e.split(";")[0].strip() for e in self.headers.get("Accept-Encoding", "").split(",")}
+        encoding, body_path = None, local
+        if self.compress:
+            for name, suffix in ENCODINGS:
+                if name in accepted and os.path.isfile(local + suffix):
+                    encoding, body_path = name, local + suffix
+                    break
+
+        st = os.stat(body_path)
+        etag = f'"{int(st.st_mtime)}-{st.st_size}{"-" + encoding if encoding else ""}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self._common_headers(path, etag, encoding)
+            self.end_headers()
+            self._count(parts.path, 0)
+            return
+
+        self.send_response(200)
+        ext = ".tar.gz" if path.endswith(".tar.gz") else os.path.splitext(path)[1]
+        self.send_header("Content-Type", TYPES.get(ext) or mimetypes.guess_type(path)[0] or "application/octet-stream")
+        self.send_header("Content-Length", str(st.st_size))
+        self._common_headers(path, etag, encoding)
+        self.end_headers()
+        with open(body_path, "rb") as f:
+            shutil.copyfileobj(f, self.wfile)
+        self._count(parts.path, st.st_size)
+
+    def _common_headers(self, path: str, etag: str, encoding: str | None):
+        self.send_header("Cache-Control", cache_control(path))
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+
+    def _count(self, path: str, size: int):
+        with self.lock:
+            self.counts[path] += 1
+            self.sent[path] += size
+
+    def _stats(self, reset: bool):
+        with self.lock:
+            body = json.dumps({
+                "total": sum(self.counts.values()),
+                "bytes": sum(self.sent.values()),
+                "paths": dict(self.counts),
+            }).encode("utf-8")
+            if reset:
+                self.counts.clear()
+                self.sent.clear()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_request(self, code="-", size="-"):
+        if not self.quiet:
+            print(f"[serve_dist] {code} {self.path}")
+
+    def log_message(self, fmt, *args):
+        if not self.quiet:
+            super().log_message(fmt, *args)
+
+
+def make_server(dist_dir: str, host: str = "127.0.0.1", port: int = 8550,
+                quiet: bool = False, compress: bool = True) -> ThreadingHTTPServer:
+    handler = partial(
+        type("Handler", (DistHandler,), {"quiet": quiet, "compress": compress, "counts": Counter(), "sent": Counter()}),
+        directory=os.path.abspath(dist_dir),
+    )
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Sirve dist/ y cuenta las peticiones que llegan a la red")
+    ap.add_argument("--dist", default=os.path.join(ROOT, "dist"))
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8550)
+    ap.add_argument("--quiet", action="store_true")
+    ap.add_argument("--no-compress", action="store_true", help="ignorar las variantes .gz/.br")
+    args = ap.parse_args()
+
+    server = make_server(args.dist, args.host, args.port, args.quiet, compress=not args.no_compress)
+    handler = server.RequestHandlerClass.func
+    print(f"[serve_dist] http://{args.host}:{args.port}  ({args.dist})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"[serve_dist] peticiones: {sum(handler.counts.values())}, {sum(handler.sent.values()) / 1024:.1f} KB")
+        for path, n in handler.counts.most_common(20):
+            print(f"  {n:4d}  {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+# tools/web_bundle.py
+"""
+Empaqueta dist/app.tar.gz (el código que descarga el cliente Pyodide) solo con lo
+necesario:
+
+  - módulos locales alcanzables desde main.py (imports del AST, también los diferidos
+    dentro de funciones, y las cadenas "modulo:fabrica" de routes.py),
+  - sin módulos de servidor (firebase_admin, matplotlib/estadísticas, Pillow, FastAPI…),
+  - sin secretos: nunca entra keys/, .env ni JSON; y se aborta si algún módulo
+    incluido trae algo con forma de llave,
+  - opcional (--bytecode): .pyc sin fuente para la versión de Python del Pyodide
+    de dist/python-worker.js. Un .pyc de otra versión Pyodide no lo carga, así que
+    solo se compila si hay un intérprete de esa versión. Ojo: comprimido pesa ~2.5x
+    lo que la fuente y a 2-10 Mbps la descarga extra cuesta más que compilar los
+    módulos del arranque (benchmarks/web_bundle.py); por eso no es el default.
+
+Uso (desde la raíz del repo):
+    python tools/web_bundle.py [--out dist/app.tar.gz] [--bytecode [--python python3.12]]
+"""
+import argparse
+import ast
+import glob
+import gzip
+import io
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tarfile
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+ENTRY = "main"
+# Solo tienen sentido en el servidor (asgi.py, CLIs, procesamiento de imágenes, gráficas)
+SERVER_ONLY_MODULES = {
+    "asgi",
+    "serve",
+    "pages.stats_page",
+    "services.account_cleanup",
+    "services.journal_io",
+    "services.image_cache",
+    "services.photo_pipeline",
+}
+SERVER_ONLY_PREFIXES = ("benchmarks", "tools")
+SERVER_ONLY_PACKAGES = {
+    "firebase_admin", "google", "grpc", "matplotlib", "numpy", "PIL",
+    "fastapi", "starlette", "uvicorn",
+}
+# Nombre de import -> nombre en requirements.txt (cuando no coinciden)
+DIST_NAMES = {"dotenv": "python-dotenv"}
+# Cosas con forma de credencial que nunca deben viajar al navegador
+SECRET_PATTERNS = [
+    re.compile(rb"-----BEGIN [A-Z ]*PRIVATE KEY-----"),
+    re.compile(rb"AIza[0-9A-Za-z_\-]{35}"),
+    re.compile(rb'"private_key_id"\s*:'),
+]
+# Versión de Pyodide -> versión de CPython que trae
+PYODIDE_PYTHON = {"0.25": "3.11", "0.26": "3.12", "0.27": "3.12", "0.28": "3.13"}
+
+
+# ---------- alcance ----------
+def module_path(name: str) -> str | None:
+    base = os.path.join(ROOT, *name.split("."))
+    if os.path.isfile(base + ".py"):
+        return base + ".py"
+    if os.path.isfile(os.path.join(base, "__init__.py")):
+        return os.path.join(base, "__init__.py")
+    return None
+
+
+def is_server_only(name: str) -> bool:
+    return name in SERVER_ONLY_MODULES or name.split(".")[0] in SERVER_ONLY_PREFIXES
+
+
+def _imports(name: str, path: str) -> tuple[set[str], set[str]]:
+    """(imports de cualquier nivel, imports de nivel de módulo) de un archivo."""
+    with open(path, "rb") as f:
+        tree = ast.parse(f.read(), filename=path)
+    package = name if path.endswith("__init__.py") else name.rpartition(".")[0]
+
+    def names_of(node) -> list[str]:
+        if isinstance(node, ast.Import):
+            return [a.name for a in node.names]
+        if isinstance(node, ast.ImportFrom):
+            mod = node.module or ""
+            if node.level:
+                parts = package.split(".") if package else []
+                parts = parts[: len(parts) - node.level + 1]
+                mod = ".".join(p for p in parts + [mod] if p)
+            # "from services import offline_queue" también puede ser un submódulo
+            return [mod] + [f"{mod}.{a.name}" for a in node.names if a.name != "*"]
+        return []
+
+    everything = {n for node in ast.walk(tree) for n in names_of(node)}
+    top = {n for node in tree.body for n in names_of(node)}
+    # Destinos "paquete.modulo:fabrica" (tabla de rutas)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Constant) and isinstance(node.value, str):
+            m = re.fullmatch(r"([A-Za-z_][\w.]*):[A-Za-z_]\w*", node.value)
+            if m and module_path(m.group(1)) is not None:
+                everything.add(m.group(1))
+    return everything, top
+
+
+def find_modules(entry: str = ENTRY) -> dict:
+    """
+    Recorre los imports desde `entry`. Regresa:
+      local:     {modulo: ruta} a empaquetar
+      packages:  paquetes de terceros que usa el cliente
+      excluded:  módulos locales de servidor que se alcanzaron
+      needs_server: {modulo: [paquetes de servidor importados al cargar el módulo]}
+    """
+    local, packages, excluded, needs_server = {}, set(), set(), {}
+    pending = [entry]
+    while pending:
+        name = pending.pop()
+        if name in local or name in excluded:
+            continue
+        if is_server_only(name):
+            excluded.add(name)
+            continue
+        path = module_path(name)
+        if path is None:
+            continue
+        local[name] = path
+        # Los paquetes padres también tienen que existir en el bundle
+        if "." in name:
+            pending.append(name.rpartition(".")[0])
+        everything, top = _imports(name, path)
+        for imp in everything:
+            if module_path(imp) is not None or is_server_only(imp):
+                pending.append(imp)
+                continue
+            head = imp.split(".")[0]
+            local_head = module_path(head) is not None or os.path.isdir(os.path.join(ROOT, head))
+            if not head or local_head or head in sys.stdlib_module_names:
+                continue
+            if head in SERVER_ONLY_PACKAGES:
+                if imp in top or any(t.split(".")[0] == head for t in top):
+                    needs_server.setdefault(name, set()).add(head)
+            else:
+                packages.add(head)
+    return {"local": local, "packages": packages, "excluded": excluded, "needs_server": needs_server}
+
+
+# ---------- requirements ----------
+def client_requirements(packages: set[str]) -> list[str]:
+    wanted = {DIST_NAMES.get(p, p).lower().replace("_", "-") for p in packages}
+    lines = []
+    req = os.path.join(ROOT, "requirements.txt")
+    if os.path.exists(req):
+        with open(req, "r", encoding="utf-8") as f:
+            for line in f:
+                spec = line.strip()
+                dist = re.split(r"[<>=!~\[; ]", spec, maxsplit=1)[0].lower().replace("_", "-")
+                if dist in wanted:
+                    lines.append(spec)
+                    wanted.discard(dist)
+    return lines + sorted(wanted)
+
+
+# ---------- compilación ----------
+def pyodide_python_version(worker_js: str) -> str | None:
+    try:
+        with open(worker_js, "r", encoding="utf-8") as f:
+            m = re.search(r"pyodide/v(\d+\.\d+)", f.read())
+    except OSError:
+        return None
+    return PYODIDE_PYTHON.get(m.group(1)) if m else None
+
+
+def interpreter_version(python: str) -> str | None:
+    try:
+        out = subprocess.run(
+            [python, "-c", "import sys; print('%d.%d' % sys.version_info[:2])"],
+            capture_output=True, text=True, timeout=30,
+        )
+    except OSError:
+        return None
+    return out.stdout.strip() if out.returncode == 0 else None
+
+
+def find_interpreter(version: str, explicit: str | None) -> str | None:
+    """Intérprete que compile para `version` (el explícito se usa aunque no coincida)."""
+    if explicit:
+        found = interpreter_version(explicit)
+        if found != version:
+            print(f"[web_bundle] aviso: {explicit} es Python {found}, Pyodide trae {version}")
+        return explicit if found else None
+    if f"{sys.version_info.major}.{sys.version_info.minor}" == version:
+        return sys.executable
+    candidate = shutil.which(f"python{version}")
+    # Los shims de pyenv existen aunque esa versión no esté activa
+    return candidate if candidate and interpreter_version(candidate) == version else None
+
+
+_COMPILE_SCRIPT = """
+import py_compile, sys
+for line in sys.stdin.read().splitlines():
+    src, dst, rel = line.split("\\t")
+    py_compile.compile(src, cfile=dst, dfile=rel, doraise=True, optimize=2,
+                       invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH)
+"""
+
+
+def compile_modules(local: dict, out_dir: str, python: str) -> dict:
+    """Compila cada módulo a <out_dir>/<ruta>.pyc (sin fuente). Regresa {arcname: archivo}."""
+    files, jobs = {}, []
+    for name, path in sorted(local.items()):
+        rel = os.path.relpath(path, ROOT)
+        arc = rel[:-3] + ".pyc"
+        dst = os.path.join(out_dir, arc)
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        jobs.append(f"{path}\t{dst}\t{rel}")
+        files[arc] = dst
+    subprocess.run([python, "-c", _COMPILE_SCRIPT], input="\n".join(jobs), text=True, check=True)
+    return files
+
+
+# ---------- bundle ----------
+def check_secrets(files: dict):
+    leaks = []
+    for arc, path in files.items():
+        with open(path, "rb") as f:
+            data = f.read()
+        if any(p.search(data) for p in SECRET_PATTERNS):
+            leaks.append(arc)
+    if leaks:
+        raise SystemExit(f"[web_bundle] posibles secretos en: {', '.join(leaks)}")
+
+
+def write_tar(files: dict, requirements: list[str], out_path: str):
+    """tar.gz reproducible: orden fijo, mtime 0, sin dueño."""
+    tmp = out_path + ".part"
+    # gzip aparte: "w:gz" pone la hora actual (y el nombre) en el encabezado gzip,
+    # y compress_dist nombra el archivo con el hash de esos bytes
+    with open(tmp, "wb") as raw, gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=9, mtime=0) as gz, \
+            tarfile.open(fileobj=gz, mode="w") as tar:
+        def add_bytes(arc: str, data: bytes):
+            info = tarfile.TarInfo(arc)
+            info.size, info.mtime, info.mode = len(data), 0, 0o644
+            tar.addfile(info, io.BytesIO(data))
+
+        for arc in sorted(files):
+            with open(files[arc], "rb") as f:
+                add_bytes(arc, f.read())
+        add_bytes("requirements.txt", ("\n".join(requirements) + "\n").encode("utf-8"))
+    os.replace(tmp, out_path)
+
+
+def build(out_path: str, bytecode: bool = False, python: str | None = None, verbose: bool = True) -> dict:
+    found = find_modules()
+    requirements = client_requirements(found["packages"])
+    # python-worker.js o python-worker.<hash>.js (tools/compress_dist.py)
+    workers = sorted(glob.glob(os.path.join(ROOT, "dist", "python-worker*.js")))
+    version = pyodide_python_version(workers[0]) if workers else None
+    interpreter = None if not bytecode else find_interpreter(version or "", python)
+    compiled_for = interpreter_version(interpreter) if interpreter else None
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if interpreter:
+            files = compile_modules(found["local"], tmp, interpreter)
+        else:
+            if bytecode and verbose:
+                print(f"[web_bundle] sin intérprete Python {version}: se empaquetan los .py (--python para compilar)")
+            files = {os.path.relpath(p, ROOT): p for p in found["local"].values()}
+        check_secrets(files)
+        write_tar(files, requirements, out_path)
+
+    report = {
+        "modules": len(found["local"]),
+        "compiled": compiled_for,
+        "python": version,
+        "requirements": requirements,
+        "excluded": sorted(found["excluded"]),
+        "needs_server": {k: sorted(v) for k, v in sorted(found["needs_server"].items())},
+        "bytes": os.path.getsize(out_path),
+    }
+    if verbose:
+        print(f"[web_bundle] {out_path}: {report['modules']} módulos, {report['bytes'] / 1024:.1f} KB, "
+              f"{'bytecode ' + compiled_for if compiled_for else 'fuente'}")
+        print(f"[web_bundle] requirements: {', '.join(requirements)}")
+        print(f"[web_bundle] fuera (servidor): {', '.join(report['excluded'])}")
+        for mod, pkgs in report["needs_server"].items():
+            print(f"[web_bundle] aviso: {mod} importa {', '.join(pkgs)} al cargarse")
+    return report
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Arma el bundle mínimo del cliente Pyodide")
+    ap.add_argument("--out", default=os.path.join(ROOT, "dist", "app.tar.gz"))
+    ap.add_argument("--bytecode", action="store_true", help="mandar .pyc sin fuente en vez de .py")
+    ap.add_argument("--python", help="intérprete con la versión de Pyodide para compilar")
+    args = ap.parse_args()
+
+    before = os.path.getsize(args.out) if os.path.exists(args.out) else 0
+    report = build(args.out, bytecode=args.bytecode, python=args.python)
+    if before:
+        print(f"[web_bundle] antes {before / 1024:.1f} KB -> ahora {report['bytes'] / 1024:.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,6 @@
 
+import asyncio
+import threading
 import flet as ft
 from theme import BG, INK, MUTED, rounded_card
 
@@ -68,3 +70,198 @@ def date_scroller(active_key: str, start_date: datetime, end_date: datetime, on_
         )
     row = ft.Row(chips, scroll=ft.ScrollMode.AUTO)
     return row
+
+
+# ---------- Animaciones del lado del cliente ----------
+# Con animate_opacity / animate_scale, Flutter interpola el cambio en el navegador:
+# el servidor manda UN solo update y no hay bucles de page.update().
+
+ANIM_FAST = 180
+ANIM_SLOW = 900
+
+
+def animated(control: ft.Control, duration: int = ANIM_FAST,
+             curve: ft.AnimationCurve = ft.AnimationCurve.EASE_IN_OUT,
+             opacity: bool = True, scale: bool = True):
+    """Activa animaciones implícitas de opacidad/escala en el control."""
+    anim = ft.Animation(duration, curve)
+    if opacity:
+        control.animate_opacity = anim
+    if scale:
+        control.animate_scale = anim
+    return control
+
+
+def fade_in(control: ft.Control, duration: int = ANIM_SLOW):
+    """Deja el control invisible; reveal() lo hace aparecer con un fundido."""
+    control.opacity = 0
+    return animated(control, duration, scale=False)
+
+
+def pulse_in(control: ft.Control, duration: int = ANIM_SLOW,
+             from_opacity: float = 0.6, from_scale: float = 0.92):
+    """Pulso de entrada de una sola vez (crece y se ilumina); se dispara con reveal()."""
+    control.opacity = from_opacity
+    control.scale = from_scale
+    return animated(control, duration, curve=ft.AnimationCurve.EASE_OUT_BACK)
+
+
+def reveal(page: ft.Page, *controls: ft.Control):
+    """Lleva los controles a su estado final: un update, la animación corre en el cliente."""
+    for c in controls:
+        c.opacity = 1.0
+        if c.animate_scale is not None:
+            c.scale = 1.0
+    page.update()
+
+
+def shimmer_bar(width: int | None = None, color: str = "#8B75F3", bgcolor: str = "#EDE7FF"):
+    """Barra indeterminada: se anima sola en el cliente, sin mensajes del servidor."""
+    return ft.ProgressBar(width=width, color=color, bgcolor=bgcolor, bar_height=3, border_radius=2)
+
+
+def skeleton_block(width: int | None = None, height: int = 14, radius: int = 8, expand: bool = False):
+    """Rectángulo gris del tamaño del contenido que falta."""
+    return ft.Container(width=width, height=height, border_radius=radius, bgcolor="#ECE8F7", expand=expand)
+
+
+def skeleton_card(lines: int = 3, avatar: int | None = None):
+    """Tarjeta de carga: avatar opcional, líneas de texto y barra animada en el cliente."""
+    rows: list[ft.Control] = [shimmer_bar()]
+    if avatar:
+        rows.append(ft.Container(alignment=ft.alignment.center,
+                                 content=skeleton_block(avatar, avatar, radius=avatar // 2)))
+    rows.append(skeleton_block(height=20, width=220))
+    rows += [skeleton_block() for _ in range(lines)]
+    return ft.Container(
+        content=ft.Column(rows, spacing=12, horizontal_alignment=ft.CrossAxisAlignment.STRETCH),
+        padding=18,
+        bgcolor="#FFFFFF",
+        border_radius=18,
+    )
+
+
+# ---------- Updates coalescidos por sesión ----------
+# Los handlers marcan qué cambió; un solo flush por tick manda los cambios.
+# Si solo cambió un subárbol se actualiza ese control (diff más chico que page.update()).
+
+_SCHEDULER_KEY = "__mindful_update_scheduler__"
+UPDATE_TICK = 0.016  # ~1 frame
+
+
+class UpdateScheduler:
+    def __init__(self, page: ft.Page):
+        self.page = page
+        self._lock = threading.Lock()
+        self._dirty: list[ft.Control] = []
+        self._full = False
+        self._scheduled = False
+        # contadores: cuántos updates se pidieron vs. cuántos mensajes salieron
+        self.requested = 0
+        self.flushed = 0
+
+    def mark(self, *controls: ft.Control):
+        """Marca controles como sucios; sin argumentos = toda la página (overlay, snack_bar…)."""
+        with self._lock:
+            self.requested += 1
+            if not controls:
+                self._full = True
+            for c in controls:
+                if not any(c is d for d in self._dirty):
+                    self._dirty.append(c)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        try:
+            self.page.run_task(self._flush_soon)
+        except Exception:
+            self.flush()
+
+    async def _flush_soon(self):
+        await asyncio.sleep(UPDATE_TICK)
+        self.flush()
+
+    def flush(self):
+        with self._lock:
+            full, dirty = self._full, self._dirty
+            self._full, self._dirty, self._scheduled = False, [], False
+        if not full and not dirty:
+            return
+        self.flushed += 1
+        if full:
+            self.page.update()
+            return
+        # Los controles de una vista que ya se desmontó (navegación) se ignoran
+        mounted = [c for c in dirty if c.page is not None]
+        if len(mounted) == 1:
+            mounted[0].update()
+        elif mounted:
+            self.page.update(*mounted)
+
+
+def get_scheduler(page: ft.Page) -> UpdateScheduler:
+    sched = getattr(page, _SCHEDULER_KEY, None)
+    if sched is None:
+        sched = UpdateScheduler(page)
+        setattr(page, _SCHEDULER_KEY, sched)
+    return sched
+
+
+def schedule_update(page: ft.Page, *controls: ft.Control):
+    """Reemplazo de page.update() / control.update() que se agrupa por tick."""
+    get_scheduler(page).mark(*controls)
+
+
+def flush_updates(page: ft.Page):
+    """Manda ya lo pendiente (p. ej. antes de un trabajo largo y bloqueante)."""
+    get_scheduler(page).flush()
+
+
+# ---------- Listas con clave (reconciliación) ----------
+
+class KeyedList:
+    """
+    Mantiene los hijos de un Column/ListView indexados por clave (id del documento).
+    render() reutiliza el control de cada clave cuya firma no cambió; Flet compara
+    los hijos por identidad, así que solo viajan altas, bajas, movimientos y las
+    tarjetas que sí cambiaron, no la lista completa.
+    """
+
+    def __init__(self, container: ft.Control, key_fn, build_fn, signature_fn=None):
+        self.container = container
+        self.key_fn = key_fn
+        self.build_fn = build_fn
+        self.signature_fn = signature_fn or (lambda item: item)
+        self._rendered: dict = {}  # clave -> (firma, control)
+        # contadores de churn (útiles para medir)
+        self.built = 0
+        self.reused = 0
+        self.removed = 0
+
+    def render(self, items, empty: ft.Control | None = None):
+        rendered = {}
+        controls = []
+        for item in items:
+            key = self.key_fn(item)
+            if key in rendered:  # clave repetida: nos quedamos con la primera
+                continue
+            sig = self.signature_fn(item)
+            prev = self._rendered.get(key)
+            if prev is not None and prev[0] == sig:
+                ctrl = prev[1]
+                self.reused += 1
+            else:
+                ctrl = self.build_fn(item)
+                self.built += 1
+            rendered[key] = (sig, ctrl)
+            controls.append(ctrl)
+        self.removed += sum(1 for k in self._rendered if k not in rendered)
+        self._rendered = rendered
+        if not controls and empty is not None:
+            controls = [empty]
+        self.container.controls[:] = controls
+        return self.container
+
+    def clear(self):
+        self._rendered = {}
+        self.container.controls.clear()
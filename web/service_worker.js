@@ -1,95 +1,190 @@
 // web/service_worker.js
+//
+// Plantilla: tools/precache_manifest.py la copia a dist/service_worker.js y le
+// antepone PRECACHE_MANIFEST = {version, files: {"/ruta": "hash"}} con todo dist/.
+// Al cambiar cualquier archivo cambia el script, el navegador instala la versión
+// nueva y solo se descargan las entradas cuyo hash cambió.
 
-const CACHE_NAME = "mindful-cache-v5";
+const PRECACHE = self.PRECACHE_MANIFEST || { version: "dev", files: {} };
+const PRECACHE_CACHE = "mindful-precache";
+const STAGING_CACHE = "mindful-precache-staging";
+const RUNTIME_CACHE = "mindful-runtime";
+const INDEX_KEY = "/__precache_index__";   // {ruta: hash} de lo que hay en PRECACHE_CACHE
 const OFFLINE_FALLBACK = "/index.html";
 
-// Archivos base de tu app (ajusta rutas si algo cambia)
-const CORE_ASSETS = [
-  "/",
-  "/index.html",
-  "/manifest.json",
-  "/assets/logo.png",
-];
+// El bundle de Python cambia seguido: se sirve de caché y se revalida en segundo plano,
+// como mucho una vez por REVALIDATE_AFTER_MS (visitas seguidas no tocan la red)
+// (app.tar.gz o app.<hash>.tar.gz si se corrió tools/compress_dist.py)
+const STALE_WHILE_REVALIDATE = /^\/app(\.[0-9a-f]+)?\.tar\.gz$/;
+const REVALIDATE_AFTER_MS = 60 * 60 * 1000;
+
+// Terceros versionados en la URL (nunca cambian): Pyodide, CanvasKit, wheels de PyPI
+const IMMUTABLE_HOSTS = ["cdn.jsdelivr.net", "www.gstatic.com", "files.pythonhosted.org"];
 
 // Helpers
-async function cacheFirst(req) {
-  const cache = await caches.open(CACHE_NAME);
+function precachePath(url) {
+  if (url.origin !== self.location.origin) return null;
+  const path = url.pathname === "/" ? "/index.html" : url.pathname;
+  return path in PRECACHE.files ? path : null;
+}
+
+async function readIndex(cache) {
+  const res = await cache.match(INDEX_KEY);
+  return res ? res.json() : {};
+}
+
+function writeIndex(cache, index) {
+  return cache.put(INDEX_KEY, new Response(JSON.stringify(index), {
+    headers: { "Content-Type": "application/json" },
+  }));
+}
+
+async function cacheFirst(req, cacheName) {
+  const cache = await caches.open(cacheName);
   const cached = await cache.match(req);
   if (cached) return cached;
 
   const res = await fetch(req);
-  cache.put(req, res.clone());
+  if (res.ok || res.type === "opaque") cache.put(req, res.clone());
   return res;
 }
 
+// Copia de la respuesta con la hora en que se bajó (para saber cuándo revalidar)
+function stamped(res) {
+  const headers = new Headers(res.headers);
+  headers.set("X-SW-Fetched", String(Date.now()));
+  return new Response(res.body, { status: res.status, statusText: res.statusText, headers });
+}
+
+async function staleWhileRevalidate(path) {
+  const cache = await caches.open(PRECACHE_CACHE);
+  const cached = await cache.match(path);
+  const fetchedAt = cached ? Number(cached.headers.get("X-SW-Fetched") || 0) : 0;
+  if (cached && Date.now() - fetchedAt < REVALIDATE_AFTER_MS) return cached;
+
+  const refresh = fetch(path, { cache: "no-cache" }).then((res) => {
+    if (res.ok) cache.put(path, stamped(res.clone()));
+    return res;
+  });
+  if (cached) {
+    refresh.catch(() => {});   // sin red: nos quedamos con lo que había
+    return cached;
+  }
+  return refresh;
+}
+
 async function networkFirst(req) {
-  const cache = await caches.open(CACHE_NAME);
+  const cache = await caches.open(RUNTIME_CACHE);
   try {
     const res = await fetch(req);
-    cache.put(req, res.clone());
+    if (res.ok) cache.put(req, res.clone());
     return res;
   } catch (e) {
     const cached = await cache.match(req);
     if (cached) return cached;
     if (req.mode === "navigate") {
-      return cache.match(OFFLINE_FALLBACK);
+      return (await caches.open(PRECACHE_CACHE)).match(OFFLINE_FALLBACK);
     }
     throw e;
   }
 }
 
+// install: baja solo lo que cambió respecto a lo ya precacheado, a un caché aparte
+// (la versión activa sigue sirviendo el suyo hasta que esta se active)
 self.addEventListener("install", (event) => {
-  event.waitUntil(
-    caches.open(CACHE_NAME).then((cache) => cache.addAll(CORE_ASSETS))
-  );
+  event.waitUntil((async () => {
+    const current = await readIndex(await caches.open(PRECACHE_CACHE));
+    const staging = await caches.open(STAGING_CACHE);
+    const changed = Object.keys(PRECACHE.files).filter((p) => current[p] !== PRECACHE.files[p]);
+    await Promise.all(changed.map(async (path) => {
+      const res = await fetch(path, { cache: "reload" });
+      if (!res.ok) throw new Error(`precache ${path}: ${res.status}`);
+      await staging.put(path, stamped(res));
+    }));
+    console.log(`[SW] ${PRECACHE.version}: ${changed.length} de ${Object.keys(PRECACHE.files).length} archivos nuevos`);
+  })());
   self.skipWaiting();
 });
 
+// activate: pasa lo nuevo al caché principal y borra solo lo que ya no existe
 self.addEventListener("activate", (event) => {
-  event.waitUntil(
-    caches.keys().then((keys) =>
-      Promise.all(
-        keys
-          .filter((k) => k !== CACHE_NAME)
-          .map((k) => caches.delete(k))
-      )
-    )
-  );
+  event.waitUntil((async () => {
+    const cache = await caches.open(PRECACHE_CACHE);
+    const staging = await caches.open(STAGING_CACHE);
+    const index = await readIndex(cache);
+    for (const req of await staging.keys()) {
+      const path = new URL(req.url).pathname;
+      await cache.put(path, await staging.match(req));
+      index[path] = PRECACHE.files[path];
+    }
+    for (const path of Object.keys(index)) {
+      if (!(path in PRECACHE.files)) {
+        await cache.delete(path);
+        delete index[path];
+      }
+    }
+    await writeIndex(cache, index);
+    await caches.delete(STAGING_CACHE);
+
+    // Cachés de versiones anteriores de este SW (mindful-cache-v5, etc.)
+    const keep = [PRECACHE_CACHE, RUNTIME_CACHE];
+    const keys = await caches.keys();
+    await Promise.all(keys.filter((k) => !keep.includes(k)).map((k) => caches.delete(k)));
+  })());
   self.clients.claim();
 });
 
+self.addEventListener("message", (event) => {
+  if (event.data && event.data.type === "SKIP_WAITING") self.skipWaiting();
+});
+
 self.addEventListener("fetch", (event) => {
   const req = event.request;
   if (req.method !== "GET") return;
 
   const url = new URL(req.url);
 
-  // 1) Navegación: SPA offline
-  if (req.mode === "navigate") {
-    event.respondWith(networkFirst(req));
+  // 1) No cachear llamadas a Gemini / chat (solo online)
+  if (url.href.includes("generativelanguage.googleapis.com")) {
+    // No usamos cache; si falla, el código Python mostrará mensaje de offline
     return;
   }
 
-  // 2) No cachear llamadas a Gemini / chat (solo online)
-  if (url.href.includes("generativelanguage.googleapis.com")) {
-    // No usamos cache; si falla, el código Python mostrará mensaje de offline
+  // 2) Archivos de dist/ precacheados
+  const path = precachePath(url);
+  if (path) {
+    if (STALE_WHILE_REVALIDATE.test(path)) {
+      event.respondWith(staleWhileRevalidate(path));
+    } else {
+      event.respondWith(
+        caches.open(PRECACHE_CACHE)
+          .then((cache) => cache.match(path))
+          .then((cached) => cached || networkFirst(req))
+      );
+    }
+    return;
+  }
+
+  // 3) Navegación a rutas de la SPA (/home, /notes…): el index precacheado
+  if (req.mode === "navigate") {
+    event.respondWith(
+      caches.open(PRECACHE_CACHE)
+        .then((cache) => cache.match(OFFLINE_FALLBACK))
+        .then((cached) => cached || networkFirst(req))
+    );
     return;
   }
 
-  // 3) Archivos estáticos: cache-first
+  // 4) Terceros versionados, miniaturas y fotos (inmutables): cache-first
   if (
-    url.pathname.startsWith("/assets/") ||
-    url.pathname.endsWith(".js") ||
-    url.pathname.endsWith(".css") ||
-    url.pathname.endsWith(".png") ||
-    url.pathname.endsWith(".jpg") ||
-    url.pathname.endsWith(".webp") ||
-    url.pathname.endsWith(".ico")
+    IMMUTABLE_HOSTS.includes(url.hostname) ||
+    url.pathname.startsWith("/img/") ||
+    url.pathname.startsWith("/media/")
   ) {
-    event.respondWith(cacheFirst(req));
+    event.respondWith(cacheFirst(req, RUNTIME_CACHE));
     return;
   }
 
-  // 4) Resto: network-first con fallback
+  // 5) Resto: network-first con fallback
   event.respondWith(networkFirst(req));
 });